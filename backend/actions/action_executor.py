@@ -1,6 +1,7 @@
 """Central action executor that routes actions to appropriate handlers."""
-from typing import Dict, Any
-from .base_action import ActionResult
+import copy
+from typing import Dict, Any, Callable, List, Optional
+from .base_action import ActionResult, CancellationToken
 from .url_action import URLAction
 from .program_action import ProgramAction
 from .command_action import CommandAction
@@ -14,6 +15,8 @@ from .navigation_action import NavigationAction
 from .time_action import TimeAction
 from .weather_action import WeatherAction
 from .ui_control_action import UIControlAction
+from .result_cache import ActionResultCache, make_action_key
+from .action_plans import ActionPlan, ActionPlanCache
 
 
 class ActionExecutor:
@@ -36,6 +39,8 @@ class ActionExecutor:
         'metric_network': MetricAction,
         'metric_temperature': MetricAction,
         'metric_battery': MetricAction,
+        'metric_internet_speed': MetricAction,
+        'metric_harddisk': MetricAction,
         'time_world_clock': TimeAction,
         'weather': WeatherAction,
         'next_page': NavigationAction,
@@ -43,11 +48,31 @@ class ActionExecutor:
         'ui_control': UIControlAction
     }
     
-    def execute_action(self, action_data: Dict[str, Any]) -> ActionResult:
+    # Shared by every executor so cached reads are reused across requests and clients
+    result_cache = ActionResultCache()
+    
+    # Validated, prepared action instances keyed like the result cache
+    plan_cache = ActionPlanCache()
+    
+    def execute_action(
+        self,
+        action_data: Dict[str, Any],
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        key: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        output_callback: Optional[Callable[[List[Dict[str, str]]], None]] = None
+    ) -> ActionResult:
         """Execute an action based on its configuration.
         
         Args:
             action_data: Dictionary with 'type' and 'config' keys
+            progress_callback: Optional callable receiving progress dicts
+                from multi-step actions
+            key: Precomputed ``make_action_key`` for this action, if known
+            cancel_token: Token checked between steps of multi-step actions
+                and by running commands
+            output_callback: Optional callable receiving batches of command
+                output lines while a command runs
             
         Returns:
             ActionResult from the executed action
@@ -62,35 +87,70 @@ class ActionExecutor:
             return ActionResult(False, f'Unknown action type: {action_type}')
         
         try:
-            # Create action instance
-            action_class = self.ACTION_CLASSES[action_type]
-            
-            # For metric actions, add the metric type to config
-            if action_type.startswith('metric_'):
-                config = config.copy()
-                config['metric_type'] = action_type
-            
-            # For time actions, add the action type to config
-            if action_type.startswith('time_'):
-                config = config.copy()
-                config['action_type'] = action_type.replace('time_', '')
-            
-            # For navigation actions, add the action type to config
-            if action_type in ['next_page', 'previous_page']:
-                config = config.copy()
-                config['action_type'] = action_type
-            
-            action = action_class(config)
+            key = key or make_action_key(action_type, config)
+            plan = self.plan_cache.get_or_compile(
+                key, lambda: self.compile_action(key, action_type, config)
+            )
+            if plan is None:
+                return ActionResult(False, f'Invalid configuration for {action_type} action')
             
-            # For multi-actions, set the executor reference
-            if action_type == 'multi_action':
-                action.executor = self
+            # Plans are shared, so per-call state goes on a shallow copy
+            action = plan.action
+            if progress_callback or cancel_token or output_callback:
+                action = copy.copy(action)
+                action.progress_callback = progress_callback
+                action.cancel_token = cancel_token
+                action.output_callback = output_callback
             
-            # Validate and execute
-            if not action.validate():
-                return ActionResult(False, f'Invalid configuration for {action_type} action')
+            # Pure reads (metrics, clocks, weather) are served from the shared cache
+            if plan.cache_ttl:
+                return self.result_cache.get_or_compute(key, plan.cache_ttl, action.execute)
             
             return action.execute()
         except Exception as e:
             return ActionResult(False, f'Error executing action: {str(e)}')
-
+    
+    def compile_action(
+        self,
+        key: str,
+        action_type: str,
+        config: Dict[str, Any]
+    ) -> Optional[ActionPlan]:
+        """Build, validate and prepare an action instance.
+        
+        Args:
+            key: Canonical action key
+            action_type: Action type
+            config: Action configuration
+            
+        Returns:
+            ActionPlan, or None if the configuration is invalid
+        """
+        action_class = self.ACTION_CLASSES[action_type]
+        
+        # Plans outlive the request, so don't keep a reference to the caller's dict
+        config = copy.deepcopy(config)
+        
+        # For metric actions, add the metric type to config
+        if action_type.startswith('metric_'):
+            config['metric_type'] = action_type
+        
+        # For time actions, add the action type to config
+        if action_type.startswith('time_'):
+            config['action_type'] = action_type.replace('time_', '')
+        
+        # For navigation actions, add the action type to config
+        if action_type in ['next_page', 'previous_page']:
+            config['action_type'] = action_type
+        
+        action = action_class(config)
+        
+        # For multi-actions, set the executor reference
+        if action_type == 'multi_action':
+            action.executor = self
+        
+        if not action.validate():
+            return None
+        
+        action.prepare()
+        return ActionPlan(key, action_type, action, action.get_cache_ttl())
@@ -0,0 +1,86 @@
+"""Cache of compiled action plans so repeated presses skip construction and validation."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from .base_action import BaseAction
+
+
+@dataclass
+class ActionPlan:
+    """A validated, prepared action ready to execute."""
+    key: str
+    action_type: str
+    action: BaseAction
+    cache_ttl: Optional[float] = None
+
+
+class ActionPlanCache:
+    """LRU cache of ActionPlans keyed by the canonical action key.
+
+    Plans hold prepared action instances that are shared between presses and
+    threads, so actions must not mutate themselves in ``execute``. The cache
+    is cleared whenever profiles change.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the plan cache.
+
+        Args:
+            max_entries: Plans kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._plans: 'OrderedDict[str, ActionPlan]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compile(
+        self,
+        key: str,
+        compile_plan: Callable[[], Optional[ActionPlan]]
+    ) -> Optional[ActionPlan]:
+        """Return the cached plan for a key, compiling it on a miss.
+
+        Args:
+            key: Canonical action key, see ``make_action_key``
+            compile_plan: Builds the plan; returning None means the action is
+                invalid and nothing is cached
+
+        Returns:
+            The ActionPlan, or None if the action could not be compiled
+        """
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        # Compiling outside the lock; two racing misses just build the same plan twice
+        plan = compile_plan()
+        if plan is None:
+            return None
+
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self):
+        """Drop every compiled plan."""
+        with self._lock:
+            self._plans.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                'entries': len(self._plans),
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -1,6 +1,32 @@
 """Base action class."""
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Callable
+
+
+class CancellationToken:
+    """Cooperative cancellation flag shared by a job and the actions it runs."""
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """Request cancellation."""
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested."""
+        return self._event.is_set()
+    
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds, waking early on cancellation.
+        
+        Returns:
+            True if cancelled
+        """
+        return self._event.wait(max(0.0, timeout))
 
 
 class ActionResult:
@@ -40,6 +66,18 @@ class ActionResult:
 class BaseAction(ABC):
     """Base class for all actions."""
     
+    # Read-only actions whose results may be shared between presses and clients
+    cacheable = False
+    
+    # Set by the executor when the caller wants step-by-step progress
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    
+    # Set by the executor for cancellable jobs; checked between steps
+    cancel_token: Optional[CancellationToken] = None
+    
+    # Set by the executor when the caller wants command output as it is produced
+    output_callback: Optional[Callable[[List[Dict[str, str]]], None]] = None
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize action with configuration.
         
@@ -66,6 +104,62 @@ class BaseAction(ABC):
         """
         pass
     
+    def prepare(self):
+        """Pre-compute whatever execute() needs from the configuration.
+        
+        Called once after validation when the action is compiled into a
+        cached plan; the instance is then shared between presses and threads,
+        so execute() must not modify it.
+        """
+        pass
+    
+    def report_progress(self, **progress):
+        """Report progress of a long-running action to whoever started it.
+        
+        Args:
+            **progress: Progress fields, e.g. ``step`` and ``total``
+        """
+        if self.progress_callback:
+            self.progress_callback(progress)
+    
+    def report_output(self, lines: List[Dict[str, str]]):
+        """Forward output lines of a running command to whoever started it.
+        
+        Args:
+            lines: Lines as ``{'stream': 'stdout' | 'stderr', 'line': ...}``
+        """
+        if self.output_callback:
+            self.output_callback(lines)
+    
+    def is_cancelled(self) -> bool:
+        """Whether the job running this action has been cancelled."""
+        return self.cancel_token is not None and self.cancel_token.cancelled
+    
+    def sleep(self, seconds: float) -> bool:
+        """Sleep between steps, waking early if the job is cancelled.
+        
+        Returns:
+            True if cancelled
+        """
+        if self.cancel_token is not None:
+            return self.cancel_token.wait(seconds)
+        time.sleep(max(0.0, seconds))
+        return False
+    
+    def get_cache_ttl(self) -> Optional[float]:
+        """Get how long a result of this action may be reused.
+        
+        Returns:
+            Seconds to cache a successful result, or None to never cache
+        """
+        if not self.cacheable:
+            return None
+        refresh_interval = self.config.get('refresh_interval')
+        try:
+            return float(refresh_interval) if refresh_interval is not None else None
+        except (TypeError, ValueError):
+            return None
+    
     def get_description(self) -> str:
         """Get human-readable description of the action.
         
@@ -1,13 +1,19 @@
 """Shell command execution action."""
-import subprocess
 import shlex
 from typing import Dict, Any
 from .base_action import BaseAction, ActionResult
+from .command_runner import run_command
 from config import Config
 
 
 class CommandAction(BaseAction):
-    """Executes a shell command with security restrictions."""
+    """Executes a shell command with security restrictions.
+    
+    Output is read while the command runs: when started as a job, lines are
+    pushed to the client as they arrive and cancelling the job kills the
+    process. ``timeout`` (seconds) overrides ``COMMAND_TIMEOUT`` up to
+    ``COMMAND_MAX_TIMEOUT``.
+    """
     
     def validate(self) -> bool:
         """Validate that command is provided and allowed."""
@@ -52,29 +58,46 @@ class CommandAction(BaseAction):
             # Use shlex.split for safer command parsing (avoid shell injection)
             # Note: For predefined commands, this is safer than shell=True
             cmd_args = shlex.split(command)
+            timeout = float(self.config.get('timeout', Config.COMMAND_TIMEOUT))
+            if timeout <= 0:
+                # run_command treats 0 as no timeout, which would bypass the maximum
+                timeout = Config.COMMAND_TIMEOUT
+            timeout = min(timeout, Config.COMMAND_MAX_TIMEOUT)
             
             # Execute command without shell=True for better security
-            result = subprocess.run(
+            result = run_command(
                 cmd_args,
-                capture_output=True,
-                text=True,
-                timeout=30  # 30 second timeout
+                timeout=timeout,
+                on_output=self.report_output,
+                cancel_token=self.cancel_token,
+                max_output=Config.COMMAND_OUTPUT_LIMIT
             )
             
+            details = {'truncated': result.truncated, 'duration_ms': result.duration_ms}
+            if result.cancelled:
+                return ActionResult(
+                    False,
+                    'Command cancelled',
+                    {'stdout': result.stdout, 'cancelled': True, **details}
+                )
+            if result.timed_out:
+                return ActionResult(
+                    False,
+                    'Command execution timed out',
+                    {'stdout': result.stdout, **details}
+                )
             if result.returncode == 0:
                 return ActionResult(
                     True,
                     f'Command executed successfully',
-                    {'stdout': result.stdout, 'returncode': result.returncode}
+                    {'stdout': result.stdout, 'returncode': result.returncode, **details}
                 )
             else:
                 return ActionResult(
                     False,
                     f'Command failed with code {result.returncode}',
-                    {'stderr': result.stderr, 'returncode': result.returncode}
+                    {'stderr': result.stderr, 'returncode': result.returncode, **details}
                 )
-        except subprocess.TimeoutExpired:
-            return ActionResult(False, 'Command execution timed out')
         except Exception as e:
             return ActionResult(False, f'Failed to execute command: {str(e)}')
     
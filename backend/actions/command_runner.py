@@ -0,0 +1,172 @@
+"""Run subprocesses while streaming their output line by line."""
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+from .base_action import CancellationToken
+from utils.process_supervisor import get_process_supervisor
+
+# Called with the lines read since the last call, each {'stream': ..., 'line': ...}
+OutputCallback = Callable[[List[Dict[str, str]]], None]
+
+# How often the runner checks for cancellation and forwards buffered lines
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class CommandOutput:
+    """Outcome of a command run by ``run_command``."""
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    truncated: bool = False
+    timed_out: bool = False
+    cancelled: bool = False
+    duration_ms: float = 0.0
+
+
+class _TailBuffer:
+    """Keeps the last ``limit`` characters of a stream, in whole lines.
+
+    A single line longer than ``limit`` is cut to its last ``limit`` characters.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.lines: Deque[str] = deque()
+        self.size = 0
+        self.truncated = False
+
+    def append(self, line: str):
+        if len(line) > self.limit:
+            # Keep the end of a line too long to fit on its own
+            line = line[len(line) - self.limit:]
+            self.truncated = True
+        self.lines.append(line)
+        self.size += len(line)
+        while self.size > self.limit and self.lines:
+            self.size -= len(self.lines.popleft())
+            self.truncated = True
+
+    def text(self) -> str:
+        return ''.join(self.lines)
+
+
+def _pump(pipe, stream: str, lines: 'queue.Queue'):
+    """Reader thread: forward each line of a pipe until EOF."""
+    try:
+        for line in iter(pipe.readline, ''):
+            lines.put((stream, line))
+    finally:
+        pipe.close()
+
+
+def run_command(
+    command: Union[str, List[str]],
+    shell: bool = False,
+    timeout: Optional[float] = 30,
+    on_output: Optional[OutputCallback] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    max_output: int = 65536,
+    category: str = 'command'
+) -> CommandOutput:
+    """Run a command, reading stdout and stderr as they are produced.
+
+    Unlike ``subprocess.run(capture_output=True)`` output is forwarded to
+    ``on_output`` while the command runs, and only the last ``max_output``
+    characters of each stream are kept for the result.
+
+    Args:
+        command: Argument list, or a string when ``shell`` is True
+        shell: Run through the system shell
+        timeout: Seconds before the process is killed, or None to wait forever
+        on_output: Receives batches of output lines as they arrive
+        cancel_token: Kills the process when cancelled
+        max_output: Characters of each stream retained for the result
+        category: Process supervisor category the command counts against
+
+    Returns:
+        CommandOutput; ``returncode`` is None if the process was killed
+
+    Raises:
+        ProcessLimitReached: If too many commands of the category are running
+    """
+    supervisor = get_process_supervisor()
+    started = time.perf_counter()
+    process = supervisor.spawn(
+        command,
+        category=category,
+        shell=shell,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        errors='replace',
+        bufsize=1
+    )
+
+    lines: 'queue.Queue' = queue.Queue()
+    readers = [
+        threading.Thread(target=_pump, args=(process.stdout, 'stdout', lines), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, 'stderr', lines), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+
+    buffers = {'stdout': _TailBuffer(max_output), 'stderr': _TailBuffer(max_output)}
+
+    def drain():
+        batch = []
+        while True:
+            try:
+                stream, line = lines.get_nowait()
+            except queue.Empty:
+                break
+            buffers[stream].append(line)
+            batch.append({'stream': stream, 'line': line.rstrip('\r\n')})
+        if batch and on_output:
+            on_output(batch)
+
+    deadline = started + timeout if timeout else None
+    timed_out = cancelled = False
+    try:
+        while process.poll() is None:
+            if cancel_token is not None and cancel_token.cancelled:
+                cancelled = True
+            elif deadline is not None and time.perf_counter() >= deadline:
+                timed_out = True
+            if cancelled or timed_out:
+                # Kills the whole process group, including anything a shell started
+                supervisor.kill(process, timed_out=timed_out)
+                break
+            try:
+                process.wait(POLL_INTERVAL)
+            except subprocess.TimeoutExpired:
+                pass
+            drain()
+    except BaseException:
+        supervisor.kill(process)
+        raise
+    finally:
+        process.wait()
+        supervisor.release(process)
+
+    # Background children that escaped the group may still hold the pipes open
+    join_deadline = time.perf_counter() + 1.0
+    for reader in readers:
+        reader.join(max(0.0, join_deadline - time.perf_counter()))
+    drain()
+
+    return CommandOutput(
+        returncode=None if (cancelled or timed_out) else process.returncode,
+        stdout=buffers['stdout'].text(),
+        stderr=buffers['stderr'].text(),
+        truncated=buffers['stdout'].truncated or buffers['stderr'].truncated,
+        timed_out=timed_out,
+        cancelled=cancelled,
+        duration_ms=round((time.perf_counter() - started) * 1000, 2)
+    )
@@ -5,6 +5,8 @@ import os
 import sys
 from typing import Dict, Any, Optional
 from .base_action import BaseAction, ActionResult
+from .command_runner import run_command
+from config import Config
 
 # Platform detection
 _SYSTEM = platform.system()
@@ -125,15 +127,21 @@ class CrossPlatformAction(BaseAction):
             return ActionResult(False, f'Error executing {action}: {str(e)}')
 
     def _run_command(self, command: str, shell: bool = True) -> ActionResult:
-        """Run a system command safely."""
+        """Run a system command safely, streaming its output to the job."""
         try:
-            result = subprocess.run(
+            result = run_command(
                 command,
                 shell=shell,
-                capture_output=True,
-                text=True,
-                timeout=30
+                timeout=Config.COMMAND_TIMEOUT,
+                on_output=self.report_output,
+                cancel_token=self.cancel_token,
+                max_output=Config.COMMAND_OUTPUT_LIMIT,
+                category='system'
             )
+            if result.cancelled:
+                return ActionResult(False, 'Command cancelled', {'cancelled': True})
+            if result.timed_out:
+                return ActionResult(False, 'Command timed out')
             if result.returncode == 0:
                 return ActionResult(True, f'Command executed successfully')
             else:
@@ -141,19 +149,27 @@ class CrossPlatformAction(BaseAction):
                     False,
                     f'Command failed: {result.stderr or result.stdout}'
                 )
-        except subprocess.TimeoutExpired:
-            return ActionResult(False, 'Command timed out')
         except Exception as e:
             return ActionResult(False, f'Command error: {str(e)}')
 
+    def _probe(self, command, shell: bool = False, timeout: float = 5):
+        """Run a short helper command and return its captured output.
+        
+        Used for availability checks and reading current values; raises
+        ``subprocess.TimeoutExpired`` like ``subprocess.run`` did.
+        """
+        result = run_command(command, shell=shell, timeout=timeout, category='system')
+        if result.timed_out:
+            raise subprocess.TimeoutExpired(command, timeout)
+        return result
+
     def _check_nircmd(self) -> bool:
         """Check if NirCmd is available on Windows."""
         if _SYSTEM != 'Windows':
             return False
         try:
-            result = subprocess.run(
+            result = self._probe(
                 'nircmd.exe',
-                capture_output=True,
                 timeout=5
             )
             return result.returncode != 9009  # Command not found error
@@ -315,10 +331,8 @@ class CrossPlatformAction(BaseAction):
             if self._check_nircmd():
                 # Get current brightness and increase
                 try:
-                    result = subprocess.run(
+                    result = self._probe(
                         'nircmd.exe getbrightness',
-                        capture_output=True,
-                        text=True,
                         timeout=5
                     )
                     if result.returncode == 0:
@@ -350,9 +364,8 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Darwin':  # macOS
             # Check if brightness tool is available
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'brightness',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -363,11 +376,9 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             # Try to get current brightness and increase
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'xrandr --verbose | grep -i brightness',
                     shell=True,
-                    capture_output=True,
-                    text=True,
                     timeout=5
                 )
                 if result.returncode == 0:
@@ -378,11 +389,9 @@ class CrossPlatformAction(BaseAction):
                             current = float(line.split(':')[1].strip())
                             new_brightness = min(1.0, current + 0.1)
                             # Get display name
-                            display_result = subprocess.run(
+                            display_result = self._probe(
                                 'xrandr | grep " connected" | head -1 | cut -d" " -f1',
                                 shell=True,
-                                capture_output=True,
-                                text=True,
                                 timeout=5
                             )
                             if display_result.returncode == 0:
@@ -402,10 +411,8 @@ class CrossPlatformAction(BaseAction):
             if self._check_nircmd():
                 # Get current brightness and decrease
                 try:
-                    result = subprocess.run(
+                    result = self._probe(
                         'nircmd.exe getbrightness',
-                        capture_output=True,
-                        text=True,
                         timeout=5
                     )
                     if result.returncode == 0:
@@ -437,9 +444,8 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Darwin':  # macOS
             # Check if brightness tool is available
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'brightness',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -450,11 +456,9 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             # Try to get current brightness and decrease
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'xrandr --verbose | grep -i brightness',
                     shell=True,
-                    capture_output=True,
-                    text=True,
                     timeout=5
                 )
                 if result.returncode == 0:
@@ -465,11 +469,9 @@ class CrossPlatformAction(BaseAction):
                             current = float(line.split(':')[1].strip())
                             new_brightness = max(0.1, current - 0.1)
                             # Get display name
-                            display_result = subprocess.run(
+                            display_result = self._probe(
                                 'xrandr | grep " connected" | head -1 | cut -d" " -f1',
                                 shell=True,
-                                capture_output=True,
-                                text=True,
                                 timeout=5
                             )
                             if display_result.returncode == 0:
@@ -494,9 +496,8 @@ class CrossPlatformAction(BaseAction):
                 return self._run_command(f'powershell -Command "{ps_script}"')
         elif _SYSTEM == 'Darwin':  # macOS
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'brightness',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -508,11 +509,9 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             try:
                 # Get display name
-                display_result = subprocess.run(
+                display_result = self._probe(
                     'xrandr | grep " connected" | head -1 | cut -d" " -f1',
                     shell=True,
-                    capture_output=True,
-                    text=True,
                     timeout=5
                 )
                 if display_result.returncode == 0:
@@ -540,9 +539,8 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             # Check if playerctl is available
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'playerctl',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -551,10 +549,8 @@ class CrossPlatformAction(BaseAction):
                 pass
             # Fallback to PowerShell SendKeys
             ps_script = "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait('{MEDIA_PLAY_PAUSE}')"
-            result = subprocess.run(
+            result = self._probe(
                 ['powershell', '-Command', ps_script],
-                capture_output=True,
-                text=True,
                 timeout=5
             )
             if result.returncode == 0:
@@ -577,9 +573,8 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             # Check if playerctl is available
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'playerctl',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -588,10 +583,8 @@ class CrossPlatformAction(BaseAction):
                 pass
             # Fallback to PowerShell SendKeys
             ps_script = "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait('{MEDIA_NEXT_TRACK}')"
-            result = subprocess.run(
+            result = self._probe(
                 ['powershell', '-Command', ps_script],
-                capture_output=True,
-                text=True,
                 timeout=5
             )
             if result.returncode == 0:
@@ -614,9 +607,8 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             # Check if playerctl is available
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'playerctl',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -625,10 +617,8 @@ class CrossPlatformAction(BaseAction):
                 pass
             # Fallback to PowerShell SendKeys
             ps_script = "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait('{MEDIA_PREV_TRACK}')"
-            result = subprocess.run(
+            result = self._probe(
                 ['powershell', '-Command', ps_script],
-                capture_output=True,
-                text=True,
                 timeout=5
             )
             if result.returncode == 0:
@@ -651,9 +641,8 @@ class CrossPlatformAction(BaseAction):
         elif _SYSTEM == 'Linux':
             # Check if playerctl is available
             try:
-                result = subprocess.run(
+                result = self._probe(
                     'playerctl',
-                    capture_output=True,
                     timeout=5
                 )
                 if result.returncode != 127:  # Command exists
@@ -662,10 +651,8 @@ class CrossPlatformAction(BaseAction):
                 pass
             # Fallback to PowerShell SendKeys
             ps_script = "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait('{MEDIA_STOP}')"
-            result = subprocess.run(
+            result = self._probe(
                 ['powershell', '-Command', ps_script],
-                capture_output=True,
-                text=True,
                 timeout=5
             )
             if result.returncode == 0:
@@ -0,0 +1,442 @@
+"""Background action execution with job ids, priorities and progress events."""
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .base_action import ActionResult, CancellationToken
+
+logger = logging.getLogger(__name__)
+
+# Called as callback(event, payload, job) for action_accepted / action_progress /
+# action_output / action_result
+JobCallback = Callable[[str, Dict[str, Any], 'ActionJob'], None]
+
+# Lower values run first
+PRIORITIES = {'user': 0, 'scheduled': 1, 'background': 2}
+
+# Share of the queue each priority may fill before it is rejected, so
+# background work saturates first and user presses are refused last
+_QUEUE_SHARE = {'user': 1.0, 'scheduled': 0.75, 'background': 0.5}
+
+
+class ActionQueueFull(RuntimeError):
+    """Raised when the action queue has no room for a job of that priority."""
+
+
+@dataclass
+class ActionJob:
+    """One submitted action and its lifecycle."""
+    id: str
+    action: Dict[str, Any]
+    sid: Optional[str] = None
+    request_id: Optional[str] = None
+    key: Optional[str] = None
+    priority: str = 'user'
+    status: str = 'queued'
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[ActionResult] = None
+    token: CancellationToken = field(default_factory=CancellationToken, repr=False)
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'action_type': self.action.get('type'),
+            'priority': self.priority,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.request_id is not None:
+            data['request_id'] = self.request_id
+        if self.result is not None:
+            data['result'] = self.result.to_dict()
+        return data
+
+
+class ActionExecutionService:
+    """Runs actions from a priority queue on a bounded set of workers.
+
+    Submitting returns immediately with a job; listeners receive
+    ``action_accepted`` right away, ``action_progress`` (and, for commands,
+    ``action_output``) events while it runs and one ``action_result`` event
+    when it finishes, each tagged with the job id so clients can keep many
+    actions in flight and match results reliably.
+
+    Jobs of priority ``user`` are picked before ``scheduled`` and
+    ``background`` ones, first in first out within a priority. A job can be
+    cancelled while queued or running; running macros and multi-actions stop
+    at their next step and running commands are killed. Once the queue is
+    full new work is rejected with ``ActionQueueFull`` instead of waiting.
+    """
+
+    BATCH_MODES = ('sequential', 'parallel', 'fire_and_forget')
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, executor=None, max_workers: int = 8, history_size: int = 500,
+                 max_queued: int = 100):
+        """Initialize the execution service.
+
+        Args:
+            executor: ActionExecutor used to run actions
+            max_workers: Maximum actions running at the same time
+            history_size: Finished jobs kept for status lookups
+            max_queued: Jobs waiting for a worker before new ones are rejected
+        """
+        if executor is None:
+            from .action_executor import ActionExecutor
+            executor = ActionExecutor()
+        self.executor = executor
+        self.max_workers = max_workers
+        self.history_size = history_size
+        self.max_queued = max_queued
+        self.callbacks: List[JobCallback] = []
+        self._queue: 'queue.PriorityQueue' = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs: 'OrderedDict[str, ActionJob]' = OrderedDict()
+        self._queued: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self._running: Dict[str, ActionJob] = {}
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._workers = []
+        for index in range(max_workers):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f'action-worker-{index}', daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def register_callback(self, callback: JobCallback):
+        """Register a callback for job events."""
+        self.callbacks.append(callback)
+
+    def unregister_callback(self, callback: JobCallback):
+        """Unregister a job event callback."""
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    def _emit(self, event: str, payload: Dict[str, Any], job: ActionJob):
+        for callback in list(self.callbacks):
+            try:
+                callback(event, payload, job)
+            except Exception as e:
+                logger.error(f"Error in action job callback: {e}")
+
+    def submit(
+        self,
+        action_data: Dict[str, Any],
+        sid: Optional[str] = None,
+        request_id: Optional[str] = None,
+        key: Optional[str] = None,
+        priority: str = 'user'
+    ) -> ActionJob:
+        """Queue an action and return its job without waiting.
+
+        Args:
+            action_data: Dictionary with 'type' and 'config' keys
+            sid: Socket.IO session that should receive the job events
+            request_id: Client correlation id echoed back in every event
+            key: Precomputed action key, see ``ActionExecutor.execute_action``
+            priority: ``user``, ``scheduled`` or ``background``
+
+        Returns:
+            The queued ActionJob
+
+        Raises:
+            ValueError: If the priority is unknown
+            ActionQueueFull: If the queue has no room for this priority
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}; expected one of {', '.join(PRIORITIES)}")
+
+        job = ActionJob(
+            id=uuid.uuid4().hex, action=action_data, sid=sid, request_id=request_id, key=key,
+            priority=priority
+        )
+        with self._lock:
+            limit = max(1, int(self.max_queued * _QUEUE_SHARE[priority]))
+            if sum(self._queued.values()) >= limit:
+                self._rejected += 1
+                raise ActionQueueFull(f'Action queue is full ({limit} {priority} jobs waiting)')
+            self._queued[priority] += 1
+            self._jobs[job.id] = job
+            self._trim()
+        # Announce before queueing so the ack always precedes progress events
+        self._emit('action_accepted', self._event_payload(job, success=True), job)
+        self._queue.put((PRIORITIES[priority], next(self._sequence), job))
+        return job
+
+    def run(self, action_data: Dict[str, Any], key: Optional[str] = None, priority: str = 'user') -> ActionJob:
+        """Queue an action and wait for it to finish.
+
+        Lets request/response callers go through the same queue limits,
+        priorities and cancellation as WebSocket jobs. Must not be called
+        from the service's own workers.
+
+        Args:
+            action_data: Dictionary with 'type' and 'config' keys
+            key: Precomputed action key, see ``ActionExecutor.execute_action``
+            priority: ``user``, ``scheduled`` or ``background``
+
+        Returns:
+            The finished ActionJob, with its result
+
+        Raises:
+            ValueError: If the priority is unknown
+            ActionQueueFull: If the queue has no room for this priority
+        """
+        job = self.submit(action_data, key=key, priority=priority)
+        job.done.wait()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[ActionJob]:
+        """Cancel a queued or running job.
+
+        A queued job never starts. A running job is asked to stop: macros and
+        multi-actions check between steps, single actions run to completion.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            The job, or None if it is unknown
+
+        Raises:
+            ValueError: If the job has already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.finished_at is not None:
+                raise ValueError(f'Job already {job.status}')
+            job.token.cancel()
+            if job.status != 'queued':
+                return job
+            # Finish it here; the worker drops it when it reaches the front
+            self._queued[job.priority] -= 1
+            self._finish(job, ActionResult(False, 'Cancelled', {'cancelled': True}), 'cancelled')
+        self._emit('action_result', self._event_payload(job, **job.result.to_dict()), job)
+        return job
+
+    def _finish(self, job: ActionJob, result: ActionResult, status: str):
+        job.result = result
+        job.status = status
+        job.finished_at = time.time()
+        job.done.set()
+
+    def _trim(self):
+        """Drop the oldest finished jobs beyond the history size."""
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at is not None][:excess]:
+            del self._jobs[job_id]
+
+    def _event_payload(self, job: ActionJob, **data) -> Dict[str, Any]:
+        payload = {'job_id': job.id, **data}
+        if job.request_id is not None:
+            payload['request_id'] = job.request_id
+        return payload
+
+    def _worker_loop(self):
+        """Take jobs off the queue until shut down."""
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != 'queued':
+                    # Cancelled while waiting
+                    continue
+                self._queued[job.priority] -= 1
+                job.status = 'running'
+                job.started_at = time.time()
+                self._running[job.id] = job
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running.pop(job.id, None)
+
+    def _run(self, job: ActionJob):
+        """Execute one job that a worker has taken off the queue."""
+        self._emit('action_progress', self._event_payload(job, status='running'), job)
+
+        def report_progress(progress: Dict[str, Any]):
+            self._emit('action_progress', self._event_payload(job, status='running', **progress), job)
+
+        def report_output(lines: List[Dict[str, str]]):
+            self._emit('action_output', self._event_payload(job, lines=lines), job)
+
+        try:
+            result = self.executor.execute_action(
+                job.action, progress_callback=report_progress, key=job.key, cancel_token=job.token,
+                output_callback=report_output
+            )
+        except Exception as e:
+            result = ActionResult(False, f'Error executing action: {str(e)}')
+
+        if job.token.cancelled:
+            status = 'cancelled'
+        else:
+            status = 'completed' if result.success else 'failed'
+        with self._lock:
+            self._finish(job, result, status)
+        self._emit('action_result', self._event_payload(job, **result.to_dict()), job)
+
+    def execute_batch(
+        self,
+        actions: List[Dict[str, Any]],
+        mode: str = 'sequential',
+        stop_on_error: bool = False,
+        sid: Optional[str] = None,
+        request_id: Optional[str] = None,
+        priority: str = 'user'
+    ) -> Dict[str, Any]:
+        """Run several actions in one call.
+
+        Args:
+            actions: Action dictionaries with 'type' and 'config' keys
+            mode: ``sequential`` (in order, in the calling thread),
+                ``parallel`` (concurrently on the workers, waiting for all) or
+                ``fire_and_forget`` (queued as jobs, returns their ids at once)
+            stop_on_error: In sequential mode, skip the rest after a failure
+            sid: Socket.IO session for fire-and-forget job events
+            request_id: Client correlation id for fire-and-forget job events
+            priority: Queue priority for parallel and fire-and-forget items
+
+        Returns:
+            Dict with per-item ``results`` and ``wall_time_ms``, or ``jobs``
+            for fire-and-forget
+
+        Raises:
+            ValueError: If the mode or priority is unknown or the batch is empty or too large
+            ActionQueueFull: If the queue cannot take every item; none of them run
+        """
+        if mode not in self.BATCH_MODES:
+            raise ValueError(f"Unknown batch mode: {mode}; expected one of {', '.join(self.BATCH_MODES)}")
+        if not isinstance(actions, list) or not actions:
+            raise ValueError('actions must be a non-empty list')
+        if len(actions) > self.MAX_BATCH_SIZE:
+            raise ValueError(f'A batch may contain at most {self.MAX_BATCH_SIZE} actions')
+
+        if mode == 'fire_and_forget':
+            jobs = self._submit_all(actions, sid=sid, request_id=request_id, priority=priority)
+            return {'mode': mode, 'jobs': [job.id for job in jobs]}
+
+        started = time.perf_counter()
+        results: List[Optional[ActionResult]] = [None] * len(actions)
+
+        if mode == 'parallel':
+            # Callers wait here, so this must not run on the service's own workers
+            jobs = self._submit_all(actions, priority=priority)
+            for index, job in enumerate(jobs):
+                job.done.wait()
+                results[index] = job.result
+        else:
+            for index, action in enumerate(actions):
+                results[index] = self._execute_safely(action)
+                if stop_on_error and not results[index].success:
+                    break
+
+        items = [
+            {'index': index, **result.to_dict()} if result is not None
+            else {'index': index, 'success': False, 'message': 'Skipped after earlier failure', 'skipped': True}
+            for index, result in enumerate(results)
+        ]
+        return {
+            'mode': mode,
+            'results': items,
+            'wall_time_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _submit_all(self, actions: List[Dict[str, Any]], **kwargs) -> List[ActionJob]:
+        """Submit every action or, if the queue fills up part way, none."""
+        jobs: List[ActionJob] = []
+        try:
+            for action in actions:
+                jobs.append(self.submit(action, **kwargs))
+        except ActionQueueFull:
+            for job in jobs:
+                try:
+                    self.cancel(job.id)
+                except ValueError:
+                    pass
+            raise
+        return jobs
+
+    def _execute_safely(self, action_data: Dict[str, Any]) -> ActionResult:
+        try:
+            return self.executor.execute_action(action_data)
+        except Exception as e:
+            return ActionResult(False, f'Error executing action: {str(e)}')
+
+    def get_job(self, job_id: str) -> Optional[ActionJob]:
+        """Get a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counts of jobs by status."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'max_workers': self.max_workers, 'jobs': counts}
+
+    def get_queue(self) -> Dict[str, Any]:
+        """Get queue depth by priority and the jobs currently running."""
+        with self._lock:
+            depth = dict(self._queued)
+            running = [job.to_dict() for job in self._running.values()]
+            rejected = self._rejected
+        total = sum(depth.values())
+        return {
+            'depth': total,
+            'by_priority': depth,
+            'max_queued': self.max_queued,
+            'saturated': total >= self.max_queued,
+            'rejected': rejected,
+            'max_workers': self.max_workers,
+            'running': running
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers once queued jobs ahead of them have run."""
+        for _ in self._workers:
+            # Sorts after every real priority
+            self._queue.put((len(PRIORITIES), next(self._sequence), None))
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+# Global singleton instance
+_service_instance: Optional[ActionExecutionService] = None
+_service_lock = threading.Lock()
+
+
+def get_execution_service() -> ActionExecutionService:
+    """Get the global ActionExecutionService singleton instance."""
+    global _service_instance
+
+    if _service_instance is None:
+        with _service_lock:
+            if _service_instance is None:
+                from config import Config
+                _service_instance = ActionExecutionService(
+                    max_workers=Config.ACTION_WORKERS, max_queued=Config.ACTION_QUEUE_MAX
+                )
+
+    return _service_instance
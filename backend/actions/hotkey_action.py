@@ -1,6 +1,7 @@
 """Hotkey sending action."""
+import threading
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from .base_action import BaseAction, ActionResult
 
 try:
@@ -49,6 +50,26 @@ except ImportError:
         media_previous = 'media_previous'
 
 
+_keyboard_controller = None
+_keyboard_lock = threading.Lock()
+
+
+def get_keyboard_controller():
+    """Get the process-wide pynput keyboard Controller.
+
+    Creating a Controller opens a connection to the display server (or loads
+    platform hooks), so one instance is shared by every hotkey action.
+    """
+    global _keyboard_controller
+
+    if _keyboard_controller is None and PYNPUT_AVAILABLE:
+        with _keyboard_lock:
+            if _keyboard_controller is None:
+                _keyboard_controller = Controller()
+
+    return _keyboard_controller
+
+
 class HotkeyAction(BaseAction):
     """Sends keyboard hotkey combinations."""
 
@@ -97,7 +118,8 @@ class HotkeyAction(BaseAction):
     def __init__(self, config: Dict[str, Any]):
         """Initialize hotkey action."""
         super().__init__(config)
-        self.keyboard = Controller() if PYNPUT_AVAILABLE else None
+        self.keyboard = get_keyboard_controller()
+        self._prepared: Optional[Tuple[List[str], list]] = None
 
     def validate(self) -> bool:
         """Validate that hotkey is provided."""
@@ -121,6 +143,23 @@ class HotkeyAction(BaseAction):
             return self.KEY_MAP[key_lower]
         return key_str  # Return as character if not a special key
 
+    def _resolve_keys(self) -> Optional[Tuple[List[str], list]]:
+        """Get the configured key names and their parsed pynput keys."""
+        # Support both 'keys' array and 'hotkey' string formats
+        if 'keys' in self.config:
+            keys = self.config['keys']
+        elif 'hotkey' in self.config:
+            # Parse hotkey string (e.g., "Ctrl+Shift+P" -> ["Ctrl", "Shift", "P"])
+            hotkey_str = self.config['hotkey']
+            keys = [k.strip() for k in hotkey_str.split('+')]
+        else:
+            return None
+        return keys, [self._parse_key(k) for k in keys]
+
+    def prepare(self):
+        """Parse the key combination once for cached plans."""
+        self._prepared = self._resolve_keys()
+
     def execute(self) -> ActionResult:
         """Send the hotkey combination."""
         if not PYNPUT_AVAILABLE:
@@ -132,23 +171,15 @@ class HotkeyAction(BaseAction):
                 'Invalid configuration: Keys are required'
             )
 
-        # Support both 'keys' array and 'hotkey' string formats
-        if 'keys' in self.config:
-            keys = self.config['keys']
-        elif 'hotkey' in self.config:
-            # Parse hotkey string (e.g., "Ctrl+Shift+P" -> ["Ctrl", "Shift", "P"])
-            hotkey_str = self.config['hotkey']
-            keys = [k.strip() for k in hotkey_str.split('+')]
-        else:
+        resolved = self._prepared or self._resolve_keys()
+        if resolved is None:
             return ActionResult(False, 'No keys or hotkey specified')
+        keys, parsed_keys = resolved
 
         # Small delay between key presses
         delay = self.config.get('delay', 0.05)
 
         try:
-            # Parse all keys
-            parsed_keys = [self._parse_key(k) for k in keys]
-
             # Press all keys in order
             for key in parsed_keys:
                 self.keyboard.press(key)
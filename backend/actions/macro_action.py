@@ -5,24 +5,58 @@ Supports: hotkey, delay, text, click, clipboard operations
 """
 import time
 import logging
+import platform
+import threading
 import pyperclip
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .base_action import BaseAction, ActionResult
 from .hotkey_action import HotkeyAction
 from .command_action import CommandAction
+from .macro_scheduler import DeadlineScheduler
 
 logger = logging.getLogger(__name__)
 
+_clipboard_lock = threading.Lock()
+
 
 class MacroAction(BaseAction):
     """
     Execute a macro (sequence of actions) with timing control
     """
 
+    TEXT_METHODS = ('typewrite', 'fast', 'paste')
+    # Longest text "auto" types with the classic per-key interval
+    TYPEWRITE_MAX_LENGTH = 20
+    # Longest text "auto" types without pauses before switching to paste
+    FAST_TEXT_MAX_LENGTH = 200
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
-        self.hotkey_action = HotkeyAction({'combo': ''})  # Initialize with empty config
         self.command_action = CommandAction({'command': ''})  # Initialize with empty config
+        # Hotkey actions for hotkey steps by step index, filled in by prepare()
+        self._hotkeys: Dict[int, HotkeyAction] = {}
+
+    @staticmethod
+    def _make_hotkey(keys: List[str], delay: Optional[float] = None) -> HotkeyAction:
+        """Build a prepared HotkeyAction for a key list."""
+        config = {'keys': keys}
+        if delay is not None:
+            config['delay'] = delay
+        action = HotkeyAction(config)
+        action.prepare()
+        return action
+
+    def prepare(self):
+        """Build the hotkey actions for every hotkey step up front.
+
+        The macro instance may be shared between concurrent presses, so steps
+        never reconfigure a shared HotkeyAction at execution time.
+        """
+        self._hotkeys = {
+            i: self._make_hotkey(step['keys'])
+            for i, step in enumerate(self.config.get('steps', []))
+            if step.get('type') == 'hotkey' and step.get('keys')
+        }
 
     def execute(self) -> ActionResult:
         """
@@ -36,21 +70,44 @@ class MacroAction(BaseAction):
                 {"type": "hotkey", "keys": ["ctrl", "v"]},
                 {"type": "text", "text": "Hello World"},
                 {"type": "delay", "delay": 1000}
-            ]
+            ],
+            "timing": "relative"
         }
+
+        "relative" timing (the default) sleeps for each delay after the
+        previous step finishes. With "deadline" timing delays are measured
+        from the start of the macro, so the time a step takes is absorbed by
+        the next delay instead of shifting every later step.
         """
         try:
             steps = self.config.get('steps', [])
             if not steps:
                 return ActionResult(False, 'No macro steps defined')
             
+            scheduler = None
+            if self.config.get('timing', 'relative') == 'deadline':
+                scheduler = DeadlineScheduler(
+                    spin_threshold=float(self.config.get('spin_threshold_ms', 2)) / 1000,
+                    cancel_token=self.cancel_token
+                )
+                scheduler.start()
+            
             results = []
             for i, step in enumerate(steps):
+                if self.is_cancelled():
+                    return ActionResult(
+                        False,
+                        f'Macro cancelled before step {i + 1}',
+                        {'steps_executed': len(results), 'results': results, 'cancelled': True}
+                    )
                 step_type = step.get('type')
+                timing = scheduler.mark() if scheduler and step_type != 'delay' else {}
                 
                 try:
                     if step_type == 'hotkey':
-                        result = self._execute_hotkey(step)
+                        result = self._execute_hotkey(step, self._hotkeys.get(i))
+                    elif step_type == 'delay' and scheduler:
+                        result = self._execute_scheduled_delay(step, scheduler)
                     elif step_type == 'delay':
                         result = self._execute_delay(step)
                     elif step_type == 'text':
@@ -69,8 +126,12 @@ class MacroAction(BaseAction):
                     results.append({
                         'step': i + 1,
                         'type': step_type,
-                        'result': result.to_dict() if hasattr(result, 'to_dict') else result
+                        'result': result.to_dict() if hasattr(result, 'to_dict') else result,
+                        **timing
                     })
+                    self.report_progress(
+                        step=i + 1, total=len(steps), type=step_type, success=result.success
+                    )
 
                     # If any step fails, log it but continue
                     if not result.success:
@@ -89,7 +150,10 @@ class MacroAction(BaseAction):
                 message=f'Macro executed with {len(results)} steps',
                 data={
                     'steps_executed': len(results),
-                    'results': results
+                    'results': results,
+                    'timing': {
+                        'mode': 'deadline', **scheduler.get_stats()
+                    } if scheduler else {'mode': 'relative'}
                 }
             )
 
@@ -97,38 +161,98 @@ class MacroAction(BaseAction):
             logger.error(f"Macro execution error: {e}")
             return ActionResult(False, f'Macro execution failed: {str(e)}')
     
-    def _execute_hotkey(self, step: Dict[str, Any]) -> ActionResult:
+    def _execute_hotkey(
+        self,
+        step: Dict[str, Any],
+        hotkey: Optional[HotkeyAction] = None
+    ) -> ActionResult:
         """Execute a hotkey step"""
         keys = step.get('keys', [])
         if not keys:
             return ActionResult(False, 'No keys specified')
 
-        # Convert keys list to combo string for HotkeyAction
-        combo = '+'.join(keys)
-        self.hotkey_action.config = {'combo': combo}
-        return self.hotkey_action.execute()
+        return (hotkey or self._make_hotkey(keys)).execute()
     
     def _execute_delay(self, step: Dict[str, Any]) -> ActionResult:
         """Execute a delay step"""
         delay_ms = step.get('delay', 100)
-        time.sleep(delay_ms / 1000.0)  # Convert ms to seconds
+        self.sleep(delay_ms / 1000.0)  # Convert ms to seconds
         return ActionResult(True, f'Delayed {delay_ms}ms')
     
+    def _execute_scheduled_delay(self, step: Dict[str, Any], scheduler: DeadlineScheduler) -> ActionResult:
+        """Wait until the delay's deadline on the macro timeline"""
+        delay_ms = step.get('delay', 100)
+        scheduler.advance(delay_ms / 1000.0)
+        scheduler.wait()
+        return ActionResult(True, f'Delayed {delay_ms}ms')
+
+    def _select_text_method(self, step: Dict[str, Any], text: str) -> str:
+        """Pick how to inject a text step.
+
+        ``auto`` types short ASCII text the classic way, types medium text
+        without per-key pauses and pastes long or non-ASCII text (which
+        typewrite cannot produce).
+        """
+        method = step.get('method', self.config.get('text_method', 'auto'))
+        if method != 'auto':
+            return method
+        if not text.isascii() or len(text) > self.FAST_TEXT_MAX_LENGTH:
+            return 'paste'
+        if len(text) > self.TYPEWRITE_MAX_LENGTH:
+            return 'fast'
+        return 'typewrite'
+
     def _execute_text(self, step: Dict[str, Any]) -> ActionResult:
         """Execute a text typing step"""
         text = step.get('text', '')
         if not text:
             return ActionResult(False, 'No text specified')
 
+        method = self._select_text_method(step, text)
+        if method not in self.TEXT_METHODS:
+            return ActionResult(False, f'Unknown text method: {method}')
+
         try:
-            import pyautogui
-            pyautogui.typewrite(text, interval=0.05)
+            if method == 'paste':
+                result = self._paste_text(text, step)
+                if not result.success:
+                    return result
+            else:
+                import pyautogui
+                interval = float(step.get('interval', 0.05)) if method == 'typewrite' else 0
+                pyautogui.typewrite(text, interval=interval)
             message = f'Typed text: {text[:50]}...' if len(text) > 50 else f'Typed text: {text}'
-            return ActionResult(True, message)
+            return ActionResult(True, message, {'method': method, 'length': len(text)})
         except Exception as e:
             logger.error(f"Text typing error: {e}")
             return ActionResult(False, f'Text typing failed: {str(e)}')
-    
+
+    def _paste_text(self, text: str, step: Dict[str, Any]) -> ActionResult:
+        """Inject text by swapping it through the clipboard.
+
+        The previous clipboard contents are restored after a short pause
+        that gives the target application time to read the pasted text.
+        """
+        restore_delay = float(step.get('restore_delay_ms', 50)) / 1000
+        paste_keys = ['cmd', 'v'] if platform.system() == 'Darwin' else ['ctrl', 'v']
+
+        # Concurrent pastes would otherwise restore each other's text
+        with _clipboard_lock:
+            try:
+                previous = pyperclip.paste()
+            except Exception:
+                previous = None
+
+            pyperclip.copy(text)
+            try:
+                result = self._make_hotkey(paste_keys, delay=0.005).execute()
+                time.sleep(restore_delay)
+            finally:
+                if previous is not None:
+                    pyperclip.copy(previous)
+
+        return result
+
     def _execute_click(self, step: Dict[str, Any]) -> ActionResult:
         """Execute a mouse click step"""
         position = step.get('position', {})
@@ -137,11 +261,12 @@ class MacroAction(BaseAction):
 
         try:
             import pyautogui
+            button = step.get('button', 'left')
             if x is not None and y is not None:
-                pyautogui.click(x, y)
+                pyautogui.click(x, y, button=button)
                 return ActionResult(True, f'Clicked at ({x}, {y})')
             else:
-                pyautogui.click()
+                pyautogui.click(button=button)
                 return ActionResult(True, 'Clicked at current position')
         except Exception as e:
             logger.error(f"Click error: {e}")
@@ -151,8 +276,7 @@ class MacroAction(BaseAction):
         """Execute clipboard copy (Ctrl+C equivalent)"""
         try:
             # Simulate Ctrl+C
-            self.hotkey_action.config = {'combo': 'ctrl+c'}
-            self.hotkey_action.execute()
+            self._make_hotkey(['ctrl', 'c']).execute()
             time.sleep(0.1)  # Wait for clipboard to update
 
             # Try to read clipboard to verify
@@ -175,8 +299,7 @@ class MacroAction(BaseAction):
         """Execute clipboard paste (Ctrl+V equivalent)"""
         try:
             # Simulate Ctrl+V
-            self.hotkey_action.config = {'combo': 'ctrl+v'}
-            self.hotkey_action.execute()
+            self._make_hotkey(['ctrl', 'v']).execute()
 
             # Try to read what was pasted
             try:
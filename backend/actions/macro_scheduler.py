@@ -0,0 +1,90 @@
+"""Deadline-based timing for macro steps."""
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class DeadlineScheduler:
+    """Schedules macro steps against absolute monotonic deadlines.
+
+    Delays advance a planned timeline instead of sleeping relative to "now",
+    so time spent executing steps (typing, launching) is absorbed by the
+    following delay rather than pushing every later step back. Waiting
+    sleeps until shortly before the deadline and then spins, which keeps
+    wake-ups within a fraction of a millisecond of the plan.
+    """
+
+    def __init__(
+        self,
+        spin_threshold: float = 0.002,
+        clock: Callable[[], float] = time.monotonic,
+        cancel_token: Optional[Any] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            spin_threshold: Seconds before a deadline to stop sleeping and spin
+            clock: Monotonic clock in seconds
+            cancel_token: CancellationToken that interrupts waits
+        """
+        self.spin_threshold = max(0.0, spin_threshold)
+        self.cancel_token = cancel_token
+        self.clock = clock
+        self.origin = clock()
+        self.deadline = self.origin
+        self._jitter: List[float] = []
+
+    def start(self):
+        """Start the timeline now."""
+        self.origin = self.deadline = self.clock()
+        self._jitter = []
+
+    def advance(self, seconds: float):
+        """Move the next deadline forward by a planned delay."""
+        self.deadline += max(0.0, seconds)
+
+    def wait(self) -> bool:
+        """Block until the current deadline.
+
+        Returns:
+            True if the wait was cut short by cancellation
+        """
+        remaining = self.deadline - self.clock()
+        if remaining > self.spin_threshold:
+            if self.cancel_token is not None:
+                if self.cancel_token.wait(remaining - self.spin_threshold):
+                    return True
+            else:
+                time.sleep(remaining - self.spin_threshold)
+        while self.clock() < self.deadline:
+            pass
+        return False
+
+    def mark(self) -> Dict[str, float]:
+        """Record the start of a step against its planned time.
+
+        Returns:
+            Planned and actual offsets from the start of the macro, in ms
+        """
+        now = self.clock()
+        jitter = max(0.0, now - self.deadline)
+        self._jitter.append(jitter)
+        return {
+            'scheduled_ms': round((self.deadline - self.origin) * 1000, 3),
+            'actual_ms': round((now - self.origin) * 1000, 3)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lateness statistics of step starts versus their deadlines, in ms."""
+        if not self._jitter:
+            return {'steps': 0}
+        ordered = sorted(self._jitter)
+        p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        return {
+            'steps': len(ordered),
+            'mean_jitter_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+            'p95_jitter_ms': round(p95 * 1000, 3),
+            'max_jitter_ms': round(ordered[-1] * 1000, 3),
+            'drift_ms': round(max(0.0, self.clock() - self.deadline) * 1000, 3)
+        }
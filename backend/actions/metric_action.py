@@ -1,21 +1,30 @@
 """Metric action for displaying system metrics on buttons."""
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_action import BaseAction, ActionResult
-from utils.system_metrics import SystemMetrics
+from utils.system_metrics import get_metrics_sampler
+from config import Config
 
 
 class MetricAction(BaseAction):
     """Action for fetching and displaying system metrics."""
 
+    cacheable = True
+
     VALID_METRICS = [
         'cpu_usage', 'memory', 'disk', 'network', 'temperature', 
-        'battery', 'processes', 'system_info', 'all'
+        'battery', 'processes', 'system_info', 'all',
+        'internet_speed', 'harddisk'
     ]
 
     def __init__(self, config: Dict[str, Any]):
         """Initialize metric action."""
         super().__init__(config)
 
+    def get_cache_ttl(self) -> Optional[float]:
+        """Cache for the button's refresh interval (seconds, default 2)."""
+        ttl = super().get_cache_ttl()
+        return ttl if ttl is not None else 2.0
+
     def validate(self) -> bool:
         """Validate that metric type is provided and valid."""
         metric_type = self.config.get('metric_type')
@@ -41,44 +50,67 @@ class MetricAction(BaseAction):
         base_type = metric_type.replace('metric_', '')
         
         try:
+            # Read from the shared background snapshot instead of sampling inline
+            sampler = get_metrics_sampler()
+            
             if base_type == 'cpu_usage':
-                data = SystemMetrics.get_cpu_metrics()
+                data = sampler.get_metric('cpu')
                 if 'error' in data:
                     return ActionResult(False, f'CPU metrics error: {data["error"]}')
                 
+                usage = data.get('usage_percent', 0)
+                status = data.get('status', 'normal')
+                
+                # Inside a CPU-limited container, report usage against the quota
+                container_cpu = self._get_container_metrics(sampler).get('cpu', {})
+                if container_cpu.get('quota_cores') and container_cpu.get('usage_percent') is not None:
+                    usage = container_cpu['usage_percent']
+                    status = self._status_for(usage)
+                    data = {**data, 'container': container_cpu}
+                
                 return ActionResult(
                     True,
-                    f'CPU: {data.get("usage_percent", 0)}%',
+                    f'CPU: {usage}%',
                     {
                         'metric_type': 'cpu',
-                        'value': data.get('usage_percent', 0),
+                        'value': usage,
                         'unit': '%',
-                        'status': data.get('status', 'normal'),
+                        'status': status,
                         'details': data,
                         'refresh_interval': refresh_interval
                     }
                 )
             
             elif base_type == 'memory':
-                data = SystemMetrics.get_memory_metrics()
+                data = sampler.get_metric('memory')
                 if 'error' in data:
                     return ActionResult(False, f'Memory metrics error: {data["error"]}')
                 
+                usage = data.get('usage_percent', 0)
+                status = data.get('status', 'normal')
+                
+                # Inside a memory-limited container, report usage against the limit
+                container_memory = self._get_container_metrics(sampler).get('memory', {})
+                if container_memory.get('limit_bytes') and container_memory.get('usage_percent') is not None:
+                    usage = container_memory['usage_percent']
+                    status = self._status_for(usage)
+                    data = {**data, 'container': container_memory}
+                
                 return ActionResult(
                     True,
-                    f'RAM: {data.get("usage_percent", 0)}%',
+                    f'RAM: {usage}%',
                     {
                         'metric_type': 'memory',
-                        'value': data.get('usage_percent', 0),
+                        'value': usage,
                         'unit': '%',
-                        'status': data.get('status', 'normal'),
+                        'status': status,
                         'details': data,
                         'refresh_interval': refresh_interval
                     }
                 )
             
             elif base_type == 'disk':
-                data = SystemMetrics.get_disk_metrics()
+                data = sampler.get_metric('disk')
                 if 'error' in data:
                     return ActionResult(False, f'Disk metrics error: {data["error"]}')
                 
@@ -101,25 +133,82 @@ class MetricAction(BaseAction):
                 )
             
             elif base_type == 'network':
-                data = SystemMetrics.get_network_metrics()
+                data = sampler.get_metric('network')
                 if 'error' in data:
                     return ActionResult(False, f'Network metrics error: {data["error"]}')
                 
+                rates = data.get('rates', {}).get('total', {})
+                recv_mb_per_sec = rates.get('recv_bytes_per_sec', 0) / (1024**2)
+                
                 return ActionResult(
                     True,
-                    f'Net: {data.get("bytes_recv_mb", 0):.1f}MB',
+                    f'Net: {recv_mb_per_sec:.1f}MB/s',
                     {
                         'metric_type': 'network',
-                        'value': data.get('bytes_recv_mb', 0),
-                        'unit': 'MB',
+                        'value': round(recv_mb_per_sec, 2),
+                        'unit': 'MB/s',
                         'status': data.get('status', 'normal'),
                         'details': data,
                         'refresh_interval': refresh_interval
                     }
                 )
             
+            elif base_type == 'internet_speed':
+                # Rates from the sampler's snapshot; reading counters here would feed the shared trackers
+                rates = sampler.get_metric('network').get('rates')
+                if not rates:
+                    return ActionResult(False, 'Network rates not available yet')
+                if 'error' in rates:
+                    return ActionResult(False, f'Network rates error: {rates["error"]}')
+                
+                total = rates.get('total', {})
+                down_mbps = total.get('recv_bytes_per_sec', 0) * 8 / 1_000_000
+                up_mbps = total.get('sent_bytes_per_sec', 0) * 8 / 1_000_000
+                
+                return ActionResult(
+                    True,
+                    f'↓ {down_mbps:.1f} ↑ {up_mbps:.1f} Mbps',
+                    {
+                        'metric_type': 'internet_speed',
+                        'value': round(down_mbps, 2),
+                        'upload': round(up_mbps, 2),
+                        'unit': 'Mbps',
+                        'status': 'normal',
+                        'details': rates,
+                        'refresh_interval': refresh_interval
+                    }
+                )
+            
+            elif base_type == 'harddisk':
+                # Rates from the sampler's snapshot; reading counters here would feed the shared trackers
+                rates = sampler.get_metric('disk').get('rates')
+                if not rates:
+                    return ActionResult(False, 'Disk rates not available yet')
+                if 'error' in rates:
+                    return ActionResult(False, f'Disk rates error: {rates["error"]}')
+                
+                total = rates.get('total', {})
+                read_mb = total.get('read_bytes_per_sec', 0) / (1024**2)
+                write_mb = total.get('write_bytes_per_sec', 0) / (1024**2)
+                
+                return ActionResult(
+                    True,
+                    f'Disk: R {read_mb:.1f} W {write_mb:.1f} MB/s',
+                    {
+                        'metric_type': 'harddisk',
+                        'value': round(read_mb + write_mb, 2),
+                        'read': round(read_mb, 2),
+                        'write': round(write_mb, 2),
+                        'iops': round(total.get('read_iops', 0) + total.get('write_iops', 0), 1),
+                        'unit': 'MB/s',
+                        'status': 'normal',
+                        'details': rates,
+                        'refresh_interval': refresh_interval
+                    }
+                )
+            
             elif base_type == 'temperature':
-                data = SystemMetrics.get_temperature_metrics()
+                data = sampler.get_metric('temperature')
                 if not data.get('available', False):
                     return ActionResult(False, 'Temperature sensors not available')
                 
@@ -142,7 +231,7 @@ class MetricAction(BaseAction):
                 )
             
             elif base_type == 'battery':
-                data = SystemMetrics.get_battery_metrics()
+                data = sampler.get_metric('battery')
                 if not data.get('available', False):
                     return ActionResult(False, 'Battery not available')
                 
@@ -165,6 +254,19 @@ class MetricAction(BaseAction):
         except Exception as e:
             return ActionResult(False, f'Error fetching {base_type} metrics: {str(e)}')
 
+    @staticmethod
+    def _get_container_metrics(sampler) -> Dict[str, Any]:
+        """Get cgroup metrics when container-aware reporting is enabled."""
+        if not Config.METRICS_CONTAINER_AWARE:
+            return {}
+        container = sampler.get_metric('container')
+        return container if container.get('limited') else {}
+
+    @staticmethod
+    def _status_for(percent: float) -> str:
+        """Map a usage percentage to a status level."""
+        return 'normal' if percent < 80 else 'warning' if percent < 95 else 'critical'
+
     def get_description(self) -> str:
         """Get action description."""
         metric_type = self.config.get('metric_type', 'unknown')
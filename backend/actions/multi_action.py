@@ -1,11 +1,24 @@
-"""Multi-action executor for sequential actions."""
+"""Multi-action executor for sequential, parallel and dependency-ordered actions."""
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional
 from .base_action import BaseAction, ActionResult
 
 
 class MultiAction(BaseAction):
-    """Executes multiple actions in sequence."""
+    """Executes multiple actions in sequence, in parallel, or as a dependency graph.
+
+    ``mode`` selects how steps run:
+
+    - ``sequential`` (default): one after another with ``delay`` seconds between
+    - ``parallel``: all steps at once
+    - ``dag``: each step starts as soon as the steps named in its ``depends_on``
+      (step ``id`` values or indexes) have succeeded; steps whose dependencies
+      failed are skipped
+    """
+
+    MODES = ('sequential', 'parallel', 'dag')
+    DEFAULT_MAX_PARALLEL = 8
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize multi-action.
@@ -17,17 +30,89 @@ class MultiAction(BaseAction):
         self.executor = None  # Will be set by ActionExecutor
     
     def validate(self) -> bool:
-        """Validate that actions list is provided."""
-        return 'actions' in self.config and isinstance(self.config['actions'], list)
+        """Validate that actions list is provided and the mode's graph is sound."""
+        return self._validation_error() is None
+    
+    def _validation_error(self) -> Optional[str]:
+        """Describe what is wrong with the configuration, if anything."""
+        if not ('actions' in self.config and isinstance(self.config['actions'], list)):
+            return 'Actions list is required'
+        mode = self.config.get('mode', 'sequential')
+        if mode not in self.MODES:
+            return f"Unknown mode: {mode}; expected one of {', '.join(self.MODES)}"
+        if mode == 'dag':
+            return self._build_dependencies()[1]
+        return None
+    
+    def _build_dependencies(self):
+        """Resolve each step's ``depends_on`` to step indexes.
+        
+        Returns:
+            Tuple of (list of dependency index sets, error message or None)
+        """
+        actions = self.config.get('actions', [])
+        ids = {}
+        for i, step in enumerate(actions):
+            if isinstance(step, dict) and step.get('id') is not None:
+                ids[str(step['id'])] = i
+        
+        dependencies = []
+        for i, step in enumerate(actions):
+            depends_on = step.get('depends_on', []) if isinstance(step, dict) else []
+            if not isinstance(depends_on, list):
+                depends_on = [depends_on]
+            resolved = set()
+            for ref in depends_on:
+                if isinstance(ref, int) and 0 <= ref < len(actions):
+                    resolved.add(ref)
+                elif str(ref) in ids:
+                    resolved.add(ids[str(ref)])
+                else:
+                    return dependencies, f'Step {i + 1} depends on unknown step {ref!r}'
+            if i in resolved:
+                return dependencies, f'Step {i + 1} depends on itself'
+            dependencies.append(resolved)
+        
+        # Kahn's algorithm: anything left unvisited sits on a cycle
+        remaining = [len(deps) for deps in dependencies]
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        visited = 0
+        while ready:
+            done = ready.pop()
+            visited += 1
+            for i, deps in enumerate(dependencies):
+                if done in deps:
+                    remaining[i] -= 1
+                    if remaining[i] == 0:
+                        ready.append(i)
+        if visited != len(dependencies):
+            return dependencies, 'Step dependencies contain a cycle'
+        
+        return dependencies, None
     
     def execute(self) -> ActionResult:
-        """Execute all actions in sequence."""
-        if not self.validate():
-            return ActionResult(False, 'Invalid configuration: Actions list is required')
+        """Execute all actions according to the configured mode."""
+        error = self._validation_error()
+        if error:
+            return ActionResult(False, f'Invalid configuration: {error}')
         
         if not self.executor:
             return ActionResult(False, 'ActionExecutor not set for MultiAction')
         
+        started = time.perf_counter()
+        mode = self.config.get('mode', 'sequential')
+        if mode == 'sequential':
+            result = self._execute_sequential()
+        else:
+            dependencies = self._build_dependencies()[0] if mode == 'dag' else None
+            result = self._execute_concurrent(dependencies)
+        
+        result.data['mode'] = mode
+        result.data['wall_time_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+    
+    def _execute_sequential(self) -> ActionResult:
+        """Execute all actions in sequence."""
         actions = self.config['actions']
         delay_between = self.config.get('delay', 0.1)  # Default 100ms delay
         stop_on_error = self.config.get('stop_on_error', False)
@@ -35,14 +120,23 @@ class MultiAction(BaseAction):
         results = []
         
         for i, action_config in enumerate(actions):
+            if self.is_cancelled():
+                return ActionResult(
+                    False,
+                    f'Multi-action cancelled before step {i + 1}',
+                    {'results': results, 'cancelled': True}
+                )
             try:
                 # Execute action using the executor
-                result = self.executor.execute_action(action_config)
+                result = self.executor.execute_action(
+                    action_config, cancel_token=self.cancel_token, output_callback=self.output_callback
+                )
                 results.append({
                     'index': i,
                     'success': result.success,
                     'message': result.message
                 })
+                self.report_progress(step=i + 1, total=len(actions), success=result.success)
                 
                 if not result.success and stop_on_error:
                     return ActionResult(
@@ -53,7 +147,7 @@ class MultiAction(BaseAction):
                 
                 # Delay between actions (except after last one)
                 if i < len(actions) - 1:
-                    time.sleep(delay_between)
+                    self.sleep(delay_between)
             except Exception as e:
                 error_result = {
                     'index': i,
@@ -77,6 +171,84 @@ class MultiAction(BaseAction):
             {'results': results}
         )
     
+    def _run_step(self, index: int, action_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one step and describe its outcome."""
+        step_started = time.perf_counter()
+        try:
+            result = self.executor.execute_action(
+                action_config, cancel_token=self.cancel_token, output_callback=self.output_callback
+            )
+            outcome = {'index': index, 'success': result.success, 'message': result.message}
+        except Exception as e:
+            outcome = {'index': index, 'success': False, 'message': str(e)}
+        outcome['duration_ms'] = round((time.perf_counter() - step_started) * 1000, 2)
+        return outcome
+    
+    def _execute_concurrent(self, dependencies: Optional[List[set]]) -> ActionResult:
+        """Execute steps on a thread pool.
+        
+        Args:
+            dependencies: Per-step dependency index sets for ``dag`` mode, or
+                None to start every step at once
+        """
+        actions = self.config['actions']
+        total = len(actions)
+        if dependencies is None:
+            dependencies = [set() for _ in actions]
+        
+        outcomes: Dict[int, Dict[str, Any]] = {}
+        pending = set(range(total))
+        max_workers = max(1, min(total, int(self.config.get('max_parallel', self.DEFAULT_MAX_PARALLEL))))
+        
+        # A private pool: the multi-action may itself be running on a shared worker
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='multi-action') as pool:
+            running = {}
+            while pending or running:
+                for i in sorted(pending):
+                    deps = dependencies[i]
+                    failed = [d for d in sorted(deps) if d in outcomes and not outcomes[d]['success']]
+                    if self.is_cancelled():
+                        outcomes[i] = {
+                            'index': i,
+                            'success': False,
+                            'message': 'Skipped: cancelled',
+                            'skipped': True
+                        }
+                        pending.discard(i)
+                    elif failed:
+                        outcomes[i] = {
+                            'index': i,
+                            'success': False,
+                            'message': f'Skipped: step {failed[0] + 1} failed',
+                            'skipped': True
+                        }
+                        pending.discard(i)
+                        self.report_progress(step=len(outcomes), total=total, success=False)
+                    elif all(d in outcomes for d in deps):
+                        running[pool.submit(self._run_step, i, actions[i])] = i
+                        pending.discard(i)
+                
+                if not running:
+                    # Only skipped steps were resolved this round; look again
+                    continue
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    outcomes[i] = future.result()
+                    self.report_progress(step=len(outcomes), total=total, success=outcomes[i]['success'])
+        
+        results = [outcomes[i] for i in range(total)]
+        succeeded = sum(r['success'] for r in results)
+        data = {'results': results}
+        if self.is_cancelled():
+            data['cancelled'] = True
+        return ActionResult(
+            succeeded == total,
+            f'Executed {total} actions, {succeeded} succeeded',
+            data
+        )
+    
     def get_description(self) -> str:
         """Get action description."""
         action_count = len(self.config.get('actions', []))
@@ -4,10 +4,18 @@ import os
 from pathlib import Path
 from typing import Dict, Any
 from .base_action import BaseAction, ActionResult
+from utils.process_supervisor import get_process_supervisor
 
 
 class ProgramAction(BaseAction):
-    """Launches a program or opens a file."""
+    """Launches a program or opens a file.
+    
+    Launched programs are tracked by the process supervisor, which reaps
+    them when they exit. Only launches still starting count against the
+    program limit, so apps left open never block further launches. An
+    optional ``timeout`` (seconds) kills the program and its children after
+    that long, and such a launch counts against the limit until it exits.
+    """
     
     def validate(self) -> bool:
         """Validate that path is provided."""
@@ -29,20 +37,35 @@ class ProgramAction(BaseAction):
             
             # Build command
             cmd = [path] + (args if isinstance(args, list) else [])
+            supervisor = get_process_supervisor()
+            timeout = self.config.get('timeout')
+            if timeout is not None:
+                try:
+                    timeout = float(timeout)
+                except (TypeError, ValueError):
+                    return ActionResult(False, f'Invalid configuration: timeout must be a number, got {timeout!r}')
+                if timeout <= 0:
+                    return ActionResult(False, 'Invalid configuration: timeout must be positive')
             
             # Launch process
             if os.name == 'nt':  # Windows
                 # Use shell=True for Windows to handle file associations
-                subprocess.Popen(
+                supervisor.spawn(
                     cmd if Path(path).suffix == '.exe' else f'"{path}"',
+                    category='program',
+                    timeout=timeout,
+                    detached=True,
                     cwd=working_dir,
                     shell=True,
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
                 )
             else:
-                subprocess.Popen(
+                supervisor.spawn(
                     cmd,
+                    category='program',
+                    timeout=timeout,
+                    detached=True,
                     cwd=working_dir,
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
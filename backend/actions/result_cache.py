@@ -0,0 +1,133 @@
+"""Shared TTL cache for results of read-only actions."""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from .base_action import ActionResult
+
+# Reused so key building skips constructing an encoder on every call
+_KEY_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'), default=str)
+
+
+def make_action_key(action_type: str, config: Dict[str, Any]) -> str:
+    """Build a stable key from a normalised action type and its config.
+
+    Args:
+        action_type: Action type as sent by the client
+        config: Action configuration
+
+    Returns:
+        Canonical JSON string; equal actions produce equal keys
+    """
+    return _KEY_ENCODER.encode(
+        {'type': (action_type or '').strip().lower(), 'config': config or {}}
+    )
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[ActionResult] = None
+
+
+class ActionResultCache:
+    """TTL cache with single-flight coalescing.
+
+    Concurrent requests for the same key while a computation is running wait
+    for that computation instead of starting their own, so twenty clients
+    refreshing the same metric button cost one read. Only successful results
+    are kept past the flight.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(
+        self,
+        key: str,
+        ttl: float,
+        compute: Callable[[], ActionResult]
+    ) -> ActionResult:
+        """Return a fresh cached result or compute it once for all waiting callers.
+
+        Args:
+            key: Cache key, see ``make_action_key``
+            ttl: Seconds a successful result stays valid
+            compute: Function producing the result on a miss
+
+        Returns:
+            The cached or newly computed ActionResult
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            return flight.result
+
+        try:
+            result = compute()
+        except Exception as e:
+            result = ActionResult(False, f'Error executing action: {str(e)}')
+
+        with self._lock:
+            if result.success and ttl > 0:
+                self._entries[key] = (time.monotonic() + ttl, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            flight.result = result
+            del self._flights[key]
+        flight.done.set()
+        return result
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'in_flight': len(self._flights),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced
+            }
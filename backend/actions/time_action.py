@@ -1,5 +1,5 @@
 """Time and clock actions for displaying time information."""
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 import pytz
 from .base_action import BaseAction, ActionResult
@@ -8,6 +8,8 @@ from .base_action import BaseAction, ActionResult
 class TimeAction(BaseAction):
     """Action for displaying time and clock information."""
 
+    cacheable = True
+
     VALID_ACTIONS = [
         'world_clock', 'timer', 'countdown', 'stopwatch'
     ]
@@ -16,6 +18,13 @@ class TimeAction(BaseAction):
         """Initialize time action."""
         super().__init__(config)
 
+    def get_cache_ttl(self) -> Optional[float]:
+        """Clock faces show seconds, so share results for half a second at most."""
+        if self.config.get('action_type', 'world_clock') != 'world_clock':
+            return None
+        ttl = super().get_cache_ttl()
+        return min(ttl, 0.5) if ttl is not None else 0.5
+
     def validate(self) -> bool:
         """Validate that action type is provided and valid."""
         action_type = self.config.get('action_type')
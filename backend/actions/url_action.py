@@ -1,12 +1,29 @@
 """URL opening action."""
 import webbrowser
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_action import BaseAction, ActionResult
 
 
 class URLAction(BaseAction):
     """Opens a URL in the default browser."""
     
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize URL action."""
+        super().__init__(config)
+        self._url: Optional[str] = None
+    
+    def _normalise_url(self) -> str:
+        """Get the configured URL with a protocol."""
+        url = self.config['url']
+        # Ensure URL has a protocol
+        if not url.startswith(('http://', 'https://', 'file://')):
+            url = 'https://' + url
+        return url
+    
+    def prepare(self):
+        """Normalise the URL once for cached plans."""
+        self._url = self._normalise_url()
+    
     def validate(self) -> bool:
         """Validate that URL is provided."""
         return 'url' in self.config and isinstance(self.config['url'], str)
@@ -16,13 +33,8 @@ class URLAction(BaseAction):
         if not self.validate():
             return ActionResult(False, 'Invalid configuration: URL is required')
         
-        url = self.config['url']
-        
         try:
-            # Ensure URL has a protocol
-            if not url.startswith(('http://', 'https://', 'file://')):
-                url = 'https://' + url
-            
+            url = self._url or self._normalise_url()
             webbrowser.open(url)
             return ActionResult(True, f'Opened URL: {url}')
         except Exception as e:
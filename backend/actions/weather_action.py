@@ -4,7 +4,7 @@ Fetches weather data from WeatherAPI.com
 """
 import requests
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_action import BaseAction, ActionResult
 from config import Config
 
@@ -16,6 +16,8 @@ class WeatherAction(BaseAction):
     Fetch weather data and display it
     """
 
+    cacheable = True
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         # Get API key from environment variables
@@ -23,6 +25,11 @@ class WeatherAction(BaseAction):
         self.api_key = os.environ.get('WEATHERAPI_KEY', '')
         self.base_url = "https://api.weatherapi.com/v1/current.json"
 
+    def get_cache_ttl(self) -> Optional[float]:
+        """Weather refresh_interval is in minutes (default 15)"""
+        minutes = super().get_cache_ttl()
+        return (minutes if minutes is not None else 15) * 60
+
     def execute(self) -> ActionResult:
         """
         Execute weather fetch
@@ -6,6 +6,9 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from pathlib import Path
 import os
+import signal
+import sys
+import uuid
 import logging
 from dotenv import load_dotenv
 
@@ -16,8 +19,14 @@ from config import Config
 from auth import require_auth
 from models import BUILTIN_THEMES, Theme
 from actions import ActionExecutor
+from actions.execution_service import get_execution_service, ActionQueueFull
 from plugins import PluginManager
 from utils import FileManager, setup_logger
+from utils.system_metrics import get_metrics_sampler
+from utils.metrics_stream import MetricsSubscriptions
+from utils.process_table import get_process_table
+from utils.button_index import get_button_index
+from utils.profile_repository import get_profile_repository
 
 # Import route blueprints
 from routes.auth import auth_bp
@@ -31,6 +40,7 @@ from routes.app_monitor import app_monitor_bp
 from routes.system import system_bp
 from routes.templates import templates_bp
 from routes.weather import weather_bp
+from routes.macros import macros_bp
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -72,6 +82,32 @@ logger = setup_logger('vdock', log_file=Config.DATA_DIR / 'vdock.log')
 action_executor = ActionExecutor()
 plugin_manager = PluginManager()
 
+# Start background metrics sampling so metric endpoints never block
+metrics_sampler = get_metrics_sampler(Config.METRICS_SAMPLE_INTERVAL)
+metrics_subscriptions = MetricsSubscriptions(
+    metrics_sampler,
+    lambda event, payload, sid: socketio.emit(event, payload, to=sid)
+)
+
+# Actions sent over WebSocket run in the background and report back by job id
+execution_service = get_execution_service()
+
+
+def emit_job_event(event, payload, job):
+    """Send a job event to the client that submitted it."""
+    # Jobs started over HTTP have no session; their status is polled instead
+    if job.sid:
+        socketio.emit(event, payload, to=job.sid)
+
+
+execution_service.register_callback(emit_job_event)
+
+# Prime the process table so the first process listing has real CPU figures
+get_process_table().refresh()
+
+# Load (or rebuild) the profile summary index before the first listing
+get_profile_repository().list_summaries()
+
 # Load plugins on startup
 plugin_manager.load_plugins()
 
@@ -87,6 +123,7 @@ app.register_blueprint(app_monitor_bp)
 app.register_blueprint(system_bp)
 app.register_blueprint(templates_bp, url_prefix='/api/templates')
 app.register_blueprint(weather_bp, url_prefix='/api')
+app.register_blueprint(macros_bp)
 
 # Exempt critical endpoints from rate limiting
 limiter.exempt(profiles_bp)  # Profile saves are critical
@@ -210,22 +247,173 @@ def handle_connect(auth):
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection."""
+    metrics_subscriptions.unsubscribe(request.sid)
     logger.info(f"Client disconnected: {request.sid}")
 
 
 @socketio.on('execute_action')
 def handle_execute_action(data):
-    """Execute an action via WebSocket."""
-    if 'action' not in data:
+    """Queue an action via WebSocket and acknowledge it with a job id.
+
+    The action runs on the execution service's workers; progress and the
+    final result arrive as ``action_progress`` / ``action_result`` events
+    carrying the same ``job_id`` (and the client's ``request_id`` if given).
+    ``priority`` may be ``user`` (default), ``scheduled`` or ``background``.
+    """
+    if not data or 'action' not in data:
         emit('action_result', {
             'error': 'No action provided', 'success': False
         })
+        return {'success': False, 'error': 'No action provided'}
+
+    try:
+        job = execution_service.submit(
+            data['action'],
+            sid=request.sid,
+            request_id=data.get('request_id'),
+            priority=data.get('priority', 'user')
+        )
+    except (ValueError, ActionQueueFull) as e:
+        return {'success': False, 'error': str(e)}
+    accepted = {'success': True, 'job_id': job.id}
+    if job.request_id is not None:
+        accepted['request_id'] = job.request_id
+    return accepted
+
+
+@socketio.on('press_button')
+def handle_press_button(data):
+    """Queue a button's saved action by id; events match ``execute_action``."""
+    data = data or {}
+    button_id = data.get('button_id')
+    if not button_id:
+        emit('action_result', {'error': 'No button_id provided', 'success': False})
+        return {'success': False, 'error': 'No button_id provided'}
+
+    try:
+        entry = get_button_index().resolve(button_id, data.get('profile_id'))
+        if not entry:
+            raise ValueError('Button not found')
+    except ValueError as e:
+        emit('action_result', {'error': str(e), 'success': False, 'button_id': button_id})
+        return {'success': False, 'error': str(e)}
+
+    try:
+        job = execution_service.submit(
+            entry.action,
+            sid=request.sid,
+            request_id=data.get('request_id'),
+            key=entry.plan_key
+        )
+    except ActionQueueFull as e:
+        return {'success': False, 'error': str(e)}
+    accepted = {'success': True, 'job_id': job.id}
+    if job.request_id is not None:
+        accepted['request_id'] = job.request_id
+    return accepted
+
+
+@socketio.on('execute_batch')
+def handle_execute_batch(data):
+    """Run a list of actions and report all results in one ``batch_result`` event.
+
+    ``fire_and_forget`` batches are acknowledged with their job ids and then
+    report per job like ``execute_action``.
+    """
+    data = data or {}
+    actions = data.get('actions')
+    mode = data.get('mode', 'sequential')
+    request_id = data.get('request_id')
+    sid = request.sid
+
+    priority = data.get('priority', 'user')
+
+    if mode == 'fire_and_forget':
+        try:
+            batch = execution_service.execute_batch(
+                actions, mode, sid=sid, request_id=request_id, priority=priority
+            )
+        except (ValueError, ActionQueueFull) as e:
+            return {'success': False, 'error': str(e)}
+        return {'success': True, **batch}
+
+    batch_id = uuid.uuid4().hex
+
+    def run_batch():
+        try:
+            batch = execution_service.execute_batch(
+                actions, mode, stop_on_error=bool(data.get('stop_on_error', False)),
+                priority=priority
+            )
+            payload = {
+                'success': all(item['success'] for item in batch['results']),
+                **batch
+            }
+        except (ValueError, ActionQueueFull) as e:
+            payload = {'success': False, 'error': str(e)}
+        payload['batch_id'] = batch_id
+        if request_id is not None:
+            payload['request_id'] = request_id
+        socketio.emit('batch_result', payload, to=sid)
+
+    socketio.start_background_task(run_batch)
+    accepted = {'success': True, 'batch_id': batch_id}
+    if request_id is not None:
+        accepted['request_id'] = request_id
+    return accepted
+
+
+@socketio.on('cancel_action')
+def handle_cancel_action(data):
+    """Cancel a queued or running job; its ``action_result`` reports the outcome."""
+    job_id = (data or {}).get('job_id')
+    if not job_id:
+        return {'success': False, 'error': 'No job_id provided'}
+
+    try:
+        job = execution_service.cancel(job_id)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}
+    if not job:
+        return {'success': False, 'error': 'Job not found'}
+    return {'success': True, 'job_id': job.id, 'status': job.status}
+
+
+@socketio.on('subscribe_metrics')
+def handle_subscribe_metrics(data):
+    """Subscribe to pushed metric updates instead of polling /api/metrics."""
+    data = data or {}
+    metrics = data.get('metrics', [])
+    if isinstance(metrics, str):
+        metrics = [metrics]
+
+    try:
+        subscription = metrics_subscriptions.subscribe(
+            request.sid,
+            metrics,
+            interval=data.get('interval'),
+            threshold=data.get('threshold')
+        )
+    except (ValueError, TypeError) as e:
+        emit('metrics_subscribed', {'success': False, 'error': str(e)})
         return
 
-    action_data = data['action']
-    result = action_executor.execute_action(action_data)
+    emit('metrics_subscribed', {'success': True, **subscription.to_dict()})
+
 
-    emit('action_result', result.to_dict())
+@socketio.on('unsubscribe_metrics')
+def handle_unsubscribe_metrics(data=None):
+    """Stop some or all pushed metric updates for this client."""
+    metrics = (data or {}).get('metrics')
+    if isinstance(metrics, str):
+        metrics = [metrics]
+
+    metrics_subscriptions.unsubscribe(request.sid, metrics)
+    subscription = metrics_subscriptions.subscriptions.get(request.sid)
+    emit('metrics_unsubscribed', {
+        'success': True,
+        'metrics': subscription.metrics if subscription else []
+    })
 
 
 # ============================================================================
@@ -286,6 +474,9 @@ if __name__ == '__main__':
         logger.warning("Running in DEBUG mode - not suitable for production!")
         logger.info("To disable this warning, set DEBUG=False in your .env file")
 
+    # Exit normally on SIGTERM so atexit handlers flush pending profile writes
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     socketio.run(
         app,
         host=host,
@@ -0,0 +1,67 @@
+"""
+Metric Collector Benchmark
+Compares the per-sample cost of the psutil and /proc metric collectors.
+
+Run from the backend directory:
+    python -m benchmarks.metrics_backends [--samples 2000]
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+from utils.metric_collectors import ProcCollector, PsutilCollector
+
+OPERATIONS: Dict[str, Callable] = {
+    'cpu_usage': lambda c: c.cpu_usage(None),
+    'virtual_memory': lambda c: c.virtual_memory(),
+    'swap_memory': lambda c: c.swap_memory(),
+    'disk_io_counters': lambda c: c.disk_io_counters(),
+    'disk_io_counters(perdisk)': lambda c: c.disk_io_counters(perdisk=True),
+    'net_io_counters': lambda c: c.net_io_counters(),
+    'net_io_counters(pernic)': lambda c: c.net_io_counters(pernic=True),
+}
+
+
+def time_operation(operation: Callable, collector, samples: int) -> float:
+    """Get the mean cost of one call in microseconds."""
+    operation(collector)  # warm up caches and counters
+    started = time.perf_counter()
+    for _ in range(samples):
+        operation(collector)
+    return (time.perf_counter() - started) / samples * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=2000, help='calls per operation')
+    args = parser.parse_args()
+
+    collectors = [PsutilCollector()]
+    if ProcCollector.available():
+        collectors.append(ProcCollector())
+    else:
+        print('/proc collector not available on this platform; timing psutil only')
+
+    header = f"{'operation':<28}" + ''.join(f"{c.name + ' (us)':>14}" for c in collectors)
+    if len(collectors) > 1:
+        header += f"{'speedup':>10}"
+    print(header)
+    print('-' * len(header))
+
+    totals = [0.0] * len(collectors)
+    for name, operation in OPERATIONS.items():
+        costs = [time_operation(operation, c, args.samples) for c in collectors]
+        totals = [t + c for t, c in zip(totals, costs)]
+        row = f"{name:<28}" + ''.join(f"{cost:>14.1f}" for cost in costs)
+        if len(costs) > 1:
+            row += f"{costs[0] / costs[1]:>9.1f}x"
+        print(row)
+
+    row = f"{'full sample':<28}" + ''.join(f"{total:>14.1f}" for total in totals)
+    if len(totals) > 1:
+        row += f"{totals[0] / totals[1]:>9.1f}x"
+    print(row)
+
+
+if __name__ == '__main__':
+    main()
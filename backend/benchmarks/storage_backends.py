@@ -0,0 +1,116 @@
+"""
+Profile Storage Benchmark
+Compares listing, loading and updating profiles with the JSON and SQLite stores.
+
+Run from the backend directory:
+    python -m benchmarks.storage_backends [--profiles 50] [--buttons 300] [--samples 20]
+"""
+import argparse
+import copy
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from models import Profile
+from storage import JsonProfileStore, ProfileStore, SqliteProfileStore
+
+ACTION_TYPES = ['url', 'hotkey', 'command', 'program', 'macro']
+
+
+def make_profile(index: int, buttons: int) -> Dict[str, Any]:
+    """Build a normalised profile with 5 scenes of 2 pages sharing the buttons."""
+    per_page = max(1, buttons // 10)
+    scenes = []
+    for s in range(5):
+        pages = []
+        for p in range(2):
+            pages.append({
+                'id': f'page-{s}-{p}',
+                'name': f'Page {p + 1}',
+                'buttons': [
+                    {
+                        'id': f'button-{index}-{s}-{p}-{b}',
+                        'label': f'Button {b}',
+                        'position': {'row': b // 8, 'col': b % 8},
+                        'action': {
+                            'type': ACTION_TYPES[b % len(ACTION_TYPES)],
+                            'config': {'url': f'https://example.com/{b}'}
+                        }
+                    }
+                    for b in range(per_page)
+                ]
+            })
+        scenes.append({'id': f'scene-{s}', 'name': f'Scene {s + 1}', 'pages': pages})
+    return Profile.from_dict({'id': f'profile-{index}', 'name': f'Profile {index}', 'scenes': scenes}).to_dict()
+
+
+def time_operation(operation: Callable[[], Any], samples: int) -> float:
+    """Get the mean cost of one call in milliseconds."""
+    operation()  # warm up caches and connections
+    started = time.perf_counter()
+    for _ in range(samples):
+        operation()
+    return (time.perf_counter() - started) / samples * 1000
+
+
+def operations(store: ProfileStore, profiles: List[Dict[str, Any]]) -> Dict[str, Callable[[], Any]]:
+    """Build the timed operations for one store."""
+    edited = copy.deepcopy(profiles[0])
+    pointer = '/scenes/2/pages/1/buttons/0'
+    button = edited['scenes'][2]['pages'][1]['buttons'][0]
+    counter = iter(range(1_000_000))
+
+    def update_button():
+        button['label'] = f'Edited {next(counter)}'
+        store.write(edited, changed_buttons=[pointer])
+        store.flush()
+
+    def load_all():
+        for profile in profiles:
+            store.read(profile['id'])
+
+    return {
+        'list summaries': store.list_summaries,
+        'load one profile': lambda: store.read(profiles[-1]['id']),
+        'load every profile': load_all,
+        'update one button': update_button,
+        'find by action type': lambda: store.find_buttons(action_type='hotkey'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=50, help='profiles to store')
+    parser.add_argument('--buttons', type=int, default=300, help='buttons per profile')
+    parser.add_argument('--samples', type=int, default=20, help='calls per operation')
+    args = parser.parse_args()
+
+    profiles = [make_profile(i, args.buttons) for i in range(args.profiles)]
+    with tempfile.TemporaryDirectory() as directory:
+        stores = [
+            JsonProfileStore(Path(directory) / 'profiles'),
+            SqliteProfileStore(Path(directory) / 'profiles.db')
+        ]
+        stores[0].profiles_dir.mkdir()
+        for store in stores:
+            for profile in profiles:
+                store.write(profile)
+            store.flush()
+
+        print(f'{args.profiles} profiles of {args.buttons} buttons, {args.samples} samples')
+        header = f"{'operation':<22}" + ''.join(f"{s.name + ' (ms)':>14}" for s in stores) + f"{'speedup':>10}"
+        print(header)
+        print('-' * len(header))
+
+        timed = [operations(store, profiles) for store in stores]
+        for name in timed[0]:
+            costs = [time_operation(ops[name], args.samples) for ops in timed]
+            print(f"{name:<22}" + ''.join(f"{cost:>14.2f}" for cost in costs) + f"{costs[0] / costs[1]:>9.1f}x")
+
+        for store in stores:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -41,6 +41,16 @@ class Config:
     PROFILES_DIR = DATA_DIR / 'profiles'
     UPLOADS_DIR = DATA_DIR / 'uploads'
     PLUGINS_DIR = DATA_DIR / 'plugins'
+    # Profile storage backend: 'json' (one file per profile) or 'sqlite'
+    PROFILE_STORAGE = os.environ.get('PROFILE_STORAGE', 'json')
+    # SQLite database used when PROFILE_STORAGE is 'sqlite'
+    PROFILE_DB_PATH = Path(os.environ.get('PROFILE_DB_PATH', DATA_DIR / 'profiles.db'))
+    # Seconds a cached profile is served before its file is checked for outside edits
+    PROFILE_CACHE_REVALIDATE_INTERVAL = float(os.environ.get('PROFILE_CACHE_REVALIDATE_INTERVAL', 1.0))
+    # Seconds saves of a file are held so bursts of edits become one write (0 writes immediately)
+    WRITE_BEHIND_DELAY = float(os.environ.get('WRITE_BEHIND_DELAY', 0.5))
+    # Longest a file may stay unwritten while edits keep arriving
+    WRITE_BEHIND_MAX_DELAY = float(os.environ.get('WRITE_BEHIND_MAX_DELAY', 5.0))
     
     # Plugin settings
     ENABLE_PLUGINS = os.environ.get('ENABLE_PLUGINS', 'True').lower() == 'true'
@@ -54,6 +64,38 @@ class Config:
         'volume_up', 'volume_down', 'volume_mute',
         'media_play_pause', 'media_next', 'media_previous', 'media_stop'
     ]
+    # Seconds a command may run; actions may ask for up to COMMAND_MAX_TIMEOUT
+    COMMAND_TIMEOUT = float(os.environ.get('COMMAND_TIMEOUT', 30))
+    COMMAND_MAX_TIMEOUT = float(os.environ.get('COMMAND_MAX_TIMEOUT', 3600))
+    # Characters of stdout and of stderr kept in a command's result
+    COMMAND_OUTPUT_LIMIT = int(os.environ.get('COMMAND_OUTPUT_LIMIT', 65536))
+    
+    # Child processes allowed to run at once, per kind; further spawns are rejected
+    PROCESS_LIMIT_PROGRAM = int(os.environ.get('PROCESS_LIMIT_PROGRAM', 16))
+    PROCESS_LIMIT_COMMAND = int(os.environ.get('PROCESS_LIMIT_COMMAND', 4))
+    PROCESS_LIMIT_SYSTEM = int(os.environ.get('PROCESS_LIMIT_SYSTEM', 4))
+    # Seconds a launched program without a timeout counts against PROCESS_LIMIT_PROGRAM
+    PROCESS_STARTUP_SECONDS = float(os.environ.get('PROCESS_STARTUP_SECONDS', 5.0))
+    
+    # System metrics settings
+    # Seconds between background samples served by the /api/metrics endpoints
+    METRICS_SAMPLE_INTERVAL = float(os.environ.get('METRICS_SAMPLE_INTERVAL', 2.0))
+    # Counter source: 'auto' reads /proc directly on Linux and uses psutil elsewhere
+    METRICS_BACKEND = os.environ.get('METRICS_BACKEND', 'auto')
+    # Report CPU/RAM buttons against cgroup limits when running in a limited container
+    METRICS_CONTAINER_AWARE = os.environ.get('METRICS_CONTAINER_AWARE', 'True').lower() == 'true'
+    # Raw samples are kept for an hour, one-minute rollups for a day
+    METRICS_HISTORY_SECONDS = int(os.environ.get('METRICS_HISTORY_SECONDS', 3600))
+    METRICS_ROLLUP_INTERVAL = int(os.environ.get('METRICS_ROLLUP_INTERVAL', 60))
+    METRICS_ROLLUP_HISTORY_SECONDS = int(os.environ.get('METRICS_ROLLUP_HISTORY_SECONDS', 86400))
+    # Parallel collection used by /api/metrics/all
+    METRICS_COLLECTOR_WORKERS = int(os.environ.get('METRICS_COLLECTOR_WORKERS', 4))
+    METRICS_COLLECTOR_TIMEOUT = float(os.environ.get('METRICS_COLLECTOR_TIMEOUT', 3.0))
+    
+    # Action execution settings
+    ACTION_WORKERS = int(os.environ.get('ACTION_WORKERS', 8))
+    # Jobs waiting for a worker before new ones are rejected
+    ACTION_QUEUE_MAX = int(os.environ.get('ACTION_QUEUE_MAX', 100))
     
     # Weather API settings
     # Default demo key for immediate functionality (limited usage)
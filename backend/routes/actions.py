@@ -17,9 +17,126 @@ def execute_action():
     action_data = data['action']
     
     # Import here to avoid circular imports
-    from actions import ActionExecutor
-    action_executor = ActionExecutor()
-    
-    result = action_executor.execute_action(action_data)
+    from actions.execution_service import get_execution_service, ActionQueueFull
+    try:
+        # Queued like WebSocket actions, so limits and cancellation apply here too
+        job = get_execution_service().run(action_data, priority='user')
+    except ActionQueueFull as e:
+        return jsonify({'error': str(e), 'success': False}), 503
     
-    return jsonify(result.to_dict())
+    return jsonify({**job.result.to_dict(), 'job_id': job.id})
+
+
+@actions_bp.route('/api/actions/execute-batch', methods=['POST'])
+@require_auth
+def execute_batch():
+    """Execute several actions in one request."""
+    data = request.get_json(silent=True)
+
+    if not data or 'actions' not in data:
+        return jsonify({'error': 'No actions provided', 'success': False}), 400
+
+    from actions.execution_service import get_execution_service, ActionQueueFull
+    try:
+        batch = get_execution_service().execute_batch(
+            data['actions'],
+            mode=data.get('mode', 'sequential'),
+            stop_on_error=bool(data.get('stop_on_error', False)),
+            priority=data.get('priority', 'user')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e), 'success': False}), 400
+    except ActionQueueFull as e:
+        return jsonify({'error': str(e), 'success': False}), 503
+
+    success = all(item['success'] for item in batch.get('results', []))
+    return jsonify({'success': success, **batch})
+
+
+@actions_bp.route('/api/buttons/<button_id>/press', methods=['POST'])
+@require_auth
+def press_button(button_id):
+    """Execute a button's saved action by button id."""
+    data = request.get_json(silent=True) or {}
+
+    from utils.button_index import get_button_index
+    try:
+        entry = get_button_index().resolve(button_id, data.get('profile_id'))
+    except ValueError as e:
+        return jsonify({'error': str(e), 'success': False}), 409
+
+    if not entry:
+        return jsonify({'error': 'Button not found', 'success': False}), 404
+
+    from actions.execution_service import get_execution_service, ActionQueueFull
+    try:
+        job = get_execution_service().run(entry.action, key=entry.plan_key, priority='user')
+    except ActionQueueFull as e:
+        return jsonify({'error': str(e), 'success': False}), 503
+
+    return jsonify({
+        **job.result.to_dict(), 'job_id': job.id, 'button_id': button_id, 'profile_id': entry.profile_id
+    })
+
+
+@actions_bp.route('/api/actions/cache', methods=['GET'])
+@require_auth
+def get_action_cache_stats():
+    """Get hit/miss statistics for the shared action result and plan caches."""
+    from actions import ActionExecutor
+    return jsonify({
+        'success': True,
+        'data': {
+            **ActionExecutor.result_cache.get_stats(),
+            'plans': ActionExecutor.plan_cache.get_stats()
+        }
+    })
+
+
+@actions_bp.route('/api/actions/jobs', methods=['GET'])
+@require_auth
+def get_action_job_stats():
+    """Get counts of background action jobs by status."""
+    from actions.execution_service import get_execution_service
+    return jsonify({'success': True, 'data': get_execution_service().get_stats()})
+
+
+@actions_bp.route('/api/actions/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_action_job(job_id):
+    """Get the status (and result, once finished) of a background action job."""
+    from actions.execution_service import get_execution_service
+    job = get_execution_service().get_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'data': job.to_dict()})
+
+
+@actions_bp.route('/api/actions/jobs/<job_id>', methods=['DELETE'])
+@require_auth
+def cancel_action_job(job_id):
+    """Cancel a queued or running background action job."""
+    from actions.execution_service import get_execution_service
+    try:
+        job = get_execution_service().cancel(job_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'data': job.to_dict()})
+
+
+@actions_bp.route('/api/actions/queue', methods=['GET'])
+@require_auth
+def get_action_queue():
+    """Get action queue depth by priority and the jobs currently running."""
+    from actions.execution_service import get_execution_service
+    return jsonify({'success': True, 'data': get_execution_service().get_queue()})
+
+
+@actions_bp.route('/api/actions/processes', methods=['GET'])
+@require_auth
+def get_action_processes():
+    """Get child process counters, limits and the processes still running."""
+    from utils.process_supervisor import get_process_supervisor
+    return jsonify({'success': True, 'data': get_process_supervisor().get_stats()})
@@ -0,0 +1,58 @@
+"""
+API routes for recording macros from live keyboard and mouse input.
+"""
+
+from flask import Blueprint, jsonify, request
+from auth import require_auth
+from utils.macro_recorder import get_macro_recorder, PYNPUT_AVAILABLE
+
+macros_bp = Blueprint('macros', __name__, url_prefix='/api/macros')
+
+
+@macros_bp.route('/record/status', methods=['GET'])
+@require_auth
+def recording_status():
+    """Get the status of the macro recorder."""
+    return jsonify({'success': True, 'data': get_macro_recorder().get_status()})
+
+
+@macros_bp.route('/record/start', methods=['POST'])
+@require_auth
+def start_recording():
+    """Start recording keyboard and mouse input."""
+    data = request.get_json(silent=True) or {}
+
+    if not PYNPUT_AVAILABLE:
+        return jsonify({'success': False, 'error': 'pynput library not available'}), 503
+
+    try:
+        get_macro_recorder().start(
+            record_keyboard=bool(data.get('keyboard', True)),
+            record_mouse=bool(data.get('mouse', True)),
+            min_delay_ms=int(data.get('min_delay_ms', 50)),
+            max_text_gap_ms=int(data.get('max_text_gap_ms', 1000))
+        )
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    return jsonify({
+        'success': True,
+        'message': 'Macro recording started',
+        'data': get_macro_recorder().get_status()
+    })
+
+
+@macros_bp.route('/record/stop', methods=['POST'])
+@require_auth
+def stop_recording():
+    """Stop recording and return the recorded macro steps."""
+    try:
+        recording = get_macro_recorder().stop()
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+
+    return jsonify({'success': True, 'data': recording})
@@ -1,11 +1,13 @@
 """Profile management routes."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 import uuid
 import logging
 
-from config import Config
 from models import Profile, Page, ProfileSettings, Scene, Button
 from utils import FileManager
+from utils.json_patch import JsonPatchError, JsonPatchTestFailed
+from utils.profile_repository import ProfileVersionConflict, get_profile_repository
+from utils.write_behind import get_write_behind
 from auth import require_auth
 
 logger = logging.getLogger('vdock')
@@ -13,54 +15,56 @@ logger = logging.getLogger('vdock')
 profiles_bp = Blueprint('profiles', __name__)
 
 
+def _on_profile_saved(profile_dict):
+    """Refresh state derived from profile contents after a profile is written."""
+    from actions import ActionExecutor
+    from utils.button_index import get_button_index
+    ActionExecutor.plan_cache.invalidate()
+    get_button_index().update_profile(profile_dict)
+
+
+def _on_profile_deleted(profile_id):
+    """Drop state derived from a profile after it is deleted."""
+    from actions import ActionExecutor
+    from utils.button_index import get_button_index
+    ActionExecutor.plan_cache.invalidate()
+    get_button_index().remove_profile(profile_id)
+
+
+def _cached_json(body, etag):
+    """Respond with a pre-serialised JSON body, honouring If-None-Match."""
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
 @profiles_bp.route('/api/profiles', methods=['GET'])
 def get_profiles():
     """Get all profiles."""
-    profile_files = FileManager.list_files(Config.PROFILES_DIR, '*.json')
-    profiles = []
-    
-    for file_path in profile_files:
-        profile_data = FileManager.load_json(file_path)
-        if profile_data:
-            try:
-                profile = Profile.from_dict(profile_data)
-                profile_data = {
-                    'id': profile.id,
-                    'name': profile.name,
-                    'description': profile.description,
-                    'theme': profile.theme,
-                    'page_count': len(profile.pages)
-                }
-                
-                # Only include optional fields if they have values
-                if profile.icon is not None:
-                    profile_data['icon'] = profile.icon
-                if profile.avatar is not None:
-                    profile_data['avatar'] = profile.avatar
-                    
-                profiles.append(profile_data)
-            except Exception as e:
-                from utils import setup_logger
-                logger = setup_logger('vdock')
-                logger.error(f"Error loading profile {file_path}: {e}")
-    
-    return jsonify({'profiles': profiles})
+    return _cached_json(*get_profile_repository().get_list_body())
+
+
+@profiles_bp.route('/api/profiles/cache', methods=['GET'])
+@require_auth
+def get_profile_cache_stats():
+    """Get profile repository cache and write-behind statistics."""
+    stats = get_profile_repository().get_stats()
+    stats['write_behind'] = get_write_behind().get_stats()
+    return jsonify({'success': True, 'data': stats})
 
 
 @profiles_bp.route('/api/profiles/<profile_id>', methods=['GET'])
 def get_profile(profile_id):
     """Get a specific profile."""
-    file_path = Config.PROFILES_DIR / f"{profile_id}.json"
-    profile_data = FileManager.load_json(file_path)
-    
-    if not profile_data:
-        return jsonify({'error': 'Profile not found'}), 404
-    
     try:
-        profile = Profile.from_dict(profile_data)
-        return jsonify({'profile': profile.to_dict()})
+        cached = get_profile_repository().get_body(profile_id)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    
+    if not cached:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    return _cached_json(*cached)
 
 
 @profiles_bp.route('/api/profiles', methods=['POST'])
@@ -107,9 +111,10 @@ def create_profile():
         updated_at=timestamp
     )
     
-    file_path = Config.PROFILES_DIR / f"{profile_id}.json"
-    if FileManager.save_json(file_path, profile.to_dict()):
-        return jsonify({'profile': profile.to_dict(), 'success': True}), 201
+    profile_dict = get_profile_repository().save(profile)
+    if profile_dict:
+        _on_profile_saved(profile_dict)
+        return jsonify({'profile': profile_dict, 'success': True}), 201
     
     return jsonify({
         'error': 'Failed to create profile',
@@ -130,15 +135,14 @@ def update_profile(profile_id):
     if 'dockedButtons' in data:
         logger.info(f"dockedButtons count: {len(data['dockedButtons'])}")
     
-    file_path = Config.PROFILES_DIR / f"{profile_id}.json"
-    
-    # Load existing profile
-    profile_data = FileManager.load_json(file_path)
-    if not profile_data:
-        return jsonify({'error': 'Profile not found'}), 404
+    repository = get_profile_repository()
     
     try:
-        profile = Profile.from_dict(profile_data)
+        # Load existing profile
+        profile = repository.load(profile_id)
+        if not profile:
+            return jsonify({'error': 'Profile not found'}), 404
+        
         logger.info(
             f"Loaded profile, existing dockedButtons: "
             f"{len(profile.dockedButtons)}"
@@ -171,14 +175,15 @@ def update_profile(profile_id):
             )
         
         # Save
-        profile_dict = profile.to_dict()
-        docked_count = len(profile_dict.get('dockedButtons', []))
-        scenes_count = len(profile_dict.get('scenes', []))
-        logger.info(f"Profile dict dockedButtons count: {docked_count}")
-        logger.info(f"Profile dict scenes count: {scenes_count}")
+        profile_dict = repository.save(profile)
         
-        if FileManager.save_json(file_path, profile_dict):
+        if profile_dict:
+            docked_count = len(profile_dict.get('dockedButtons', []))
+            scenes_count = len(profile_dict.get('scenes', []))
+            logger.info(f"Profile dict dockedButtons count: {docked_count}")
+            logger.info(f"Profile dict scenes count: {scenes_count}")
             logger.info("Profile saved successfully")
+            _on_profile_saved(profile_dict)
             return jsonify({
                 'profile': profile_dict,
                 'success': True
@@ -193,13 +198,86 @@ def update_profile(profile_id):
         return jsonify({'error': str(e), 'success': False}), 500
 
 
+def _if_match():
+    """ETags from the If-Match header, or None when any version is acceptable."""
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    return request.if_match.as_set()
+
+
+def _patch_error(e):
+    """Map a failed patch to a JSON error response."""
+    if isinstance(e, JsonPatchTestFailed):
+        return jsonify({'error': str(e), 'success': False}), 409
+    if isinstance(e, JsonPatchError):
+        return jsonify({'error': str(e), 'success': False}), 400
+    if isinstance(e, ProfileVersionConflict):
+        return jsonify({'error': str(e), 'success': False}), 412
+    logger.error(f"Error patching profile: {e}")
+    return jsonify({'error': str(e), 'success': False}), 500
+
+
+@profiles_bp.route('/api/profiles/<profile_id>', methods=['PATCH'])
+@require_auth
+def patch_profile(profile_id):
+    """Apply an RFC 6902 JSON Patch to a profile."""
+    operations = request.get_json(force=True, silent=True)
+    if isinstance(operations, dict):
+        operations = operations.get('operations')
+    if not isinstance(operations, list):
+        return jsonify({'error': 'Expected a list of patch operations', 'success': False}), 400
+    
+    try:
+        patched = get_profile_repository().patch(profile_id, operations, if_match=_if_match())
+    except Exception as e:
+        return _patch_error(e)
+    
+    if not patched:
+        return jsonify({'error': 'Profile not found', 'success': False}), 404
+    
+    profile_dict, etag = patched
+    _on_profile_saved(profile_dict)
+    response = jsonify({'success': True, 'updated_at': profile_dict['updated_at']})
+    response.set_etag(etag)
+    return response
+
+
+@profiles_bp.route(
+    '/api/profiles/<profile_id>/scenes/<scene_id>/pages/<page_id>/buttons/<button_id>',
+    methods=['PATCH']
+)
+@require_auth
+def patch_button(profile_id, scene_id, page_id, button_id):
+    """Update fields of one button without resending the profile."""
+    changes = request.get_json(silent=True)
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({'error': 'No changes provided', 'success': False}), 400
+    
+    try:
+        updated = get_profile_repository().update_button(
+            profile_id, scene_id, page_id, button_id, changes, if_match=_if_match()
+        )
+    except LookupError as e:
+        return jsonify({'error': str(e), 'success': False}), 404
+    except Exception as e:
+        return _patch_error(e)
+    
+    if not updated:
+        return jsonify({'error': 'Profile not found', 'success': False}), 404
+    
+    profile_dict, button, etag = updated
+    _on_profile_saved(profile_dict)
+    response = jsonify({'success': True, 'button': button, 'updated_at': profile_dict['updated_at']})
+    response.set_etag(etag)
+    return response
+
+
 @profiles_bp.route('/api/profiles/<profile_id>', methods=['DELETE'])
 @require_auth
 def delete_profile(profile_id):
     """Delete a profile."""
-    file_path = Config.PROFILES_DIR / f"{profile_id}.json"
-    
-    if FileManager.delete_file(file_path):
+    if get_profile_repository().delete(profile_id):
+        _on_profile_deleted(profile_id)
         return jsonify({'success': True})
     
     return jsonify({'error': 'Failed to delete profile', 'success': False}), 500
@@ -209,14 +287,12 @@ def delete_profile(profile_id):
 @require_auth
 def duplicate_profile(profile_id):
     """Duplicate an existing profile."""
-    src_file = Config.PROFILES_DIR / f"{profile_id}.json"
-    profile_data = FileManager.load_json(src_file)
-    
-    if not profile_data:
-        return jsonify({'error': 'Profile not found'}), 404
+    repository = get_profile_repository()
     
     try:
-        profile = Profile.from_dict(profile_data)
+        profile = repository.load(profile_id)
+        if not profile:
+            return jsonify({'error': 'Profile not found'}), 404
         
         # Create new profile with new ID
         new_id = str(uuid.uuid4())
@@ -231,9 +307,10 @@ def duplicate_profile(profile_id):
             for button in page.buttons:
                 button.id = str(uuid.uuid4())
         
-        dst_file = Config.PROFILES_DIR / f"{new_id}.json"
-        if FileManager.save_json(dst_file, profile.to_dict()):
-            return jsonify({'profile': profile.to_dict(), 'success': True}), 201
+        profile_dict = repository.save(profile)
+        if profile_dict:
+            _on_profile_saved(profile_dict)
+            return jsonify({'profile': profile_dict, 'success': True}), 201
         
         return jsonify({'error': 'Failed to duplicate profile', 'success': False}), 500
     except Exception as e:
@@ -244,13 +321,11 @@ def duplicate_profile(profile_id):
 @require_auth
 def export_profile(profile_id):
     """Export a profile as JSON."""
-    file_path = Config.PROFILES_DIR / f"{profile_id}.json"
-    
-    if not file_path.exists():
-        return jsonify({'error': 'Profile not found'}), 404
-    
     try:
-        profile_data = FileManager.load_json(file_path)
+        # From the repository: the file may not have caught up with recent edits
+        profile_data = get_profile_repository().get_dict(profile_id)
+        if profile_data is None:
+            return jsonify({'error': 'Profile not found'}), 404
         return jsonify({'profile': profile_data, 'success': True})
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
@@ -276,9 +351,10 @@ def import_profile():
         profile = Profile.from_dict(data)
         
         # Save imported profile
-        file_path = Config.PROFILES_DIR / f"{new_id}.json"
-        if FileManager.save_json(file_path, profile.to_dict()):
-            return jsonify({'profile': profile.to_dict(), 'success': True}), 201
+        profile_dict = get_profile_repository().save(profile)
+        if profile_dict:
+            _on_profile_saved(profile_dict)
+            return jsonify({'profile': profile_dict, 'success': True}), 201
         
         return jsonify({'error': 'Failed to save imported profile', 'success': False}), 500
     except Exception as e:
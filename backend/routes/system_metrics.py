@@ -4,7 +4,8 @@ Endpoints for fetching real-time system metrics
 """
 import logging
 from flask import Blueprint, jsonify, request
-from utils.system_metrics import SystemMetrics
+from utils.system_metrics import SystemMetrics, get_metrics_sampler
+from utils.metrics_history import parse_window
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,7 @@ system_metrics_bp = Blueprint(
 def get_cpu_metrics():
     """Get CPU metrics"""
     try:
-        metrics = SystemMetrics.get_cpu_metrics()
+        metrics = get_metrics_sampler().get_metric('cpu')
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching CPU metrics: {e}")
@@ -28,7 +29,7 @@ def get_cpu_metrics():
 def get_memory_metrics():
     """Get memory/RAM metrics"""
     try:
-        metrics = SystemMetrics.get_memory_metrics()
+        metrics = get_metrics_sampler().get_metric('memory')
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching memory metrics: {e}")
@@ -39,7 +40,7 @@ def get_memory_metrics():
 def get_disk_metrics():
     """Get disk usage metrics"""
     try:
-        metrics = SystemMetrics.get_disk_metrics()
+        metrics = get_metrics_sampler().get_metric('disk')
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching disk metrics: {e}")
@@ -50,7 +51,7 @@ def get_disk_metrics():
 def get_network_metrics():
     """Get network statistics"""
     try:
-        metrics = SystemMetrics.get_network_metrics()
+        metrics = get_metrics_sampler().get_metric('network')
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching network metrics: {e}")
@@ -61,7 +62,7 @@ def get_network_metrics():
 def get_temperature_metrics():
     """Get temperature sensors data"""
     try:
-        metrics = SystemMetrics.get_temperature_metrics()
+        metrics = get_metrics_sampler().get_metric('temperature')
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching temperature metrics: {e}")
@@ -72,13 +73,24 @@ def get_temperature_metrics():
 def get_battery_metrics():
     """Get battery information"""
     try:
-        metrics = SystemMetrics.get_battery_metrics()
+        metrics = get_metrics_sampler().get_metric('battery')
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching battery metrics: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@system_metrics_bp.route('/container', methods=['GET'])
+def get_container_metrics():
+    """Get container (cgroup) CPU quota, memory limit and pressure"""
+    try:
+        metrics = get_metrics_sampler().get_metric('container')
+        return jsonify({'success': True, 'data': metrics})
+    except Exception as e:
+        logger.error(f"Error fetching container metrics: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @system_metrics_bp.route('/processes', methods=['GET'])
 def get_process_metrics():
     """Get top processes by CPU and memory"""
@@ -106,13 +118,53 @@ def get_system_info():
 def get_all_metrics():
     """Get all metrics at once"""
     try:
-        metrics = SystemMetrics.get_all_metrics()
+        timeout = request.args.get('timeout', default=None, type=float)
+        partial = request.args.get('partial', default='true').lower() != 'false'
+
+        metrics = SystemMetrics.get_all_metrics(timeout=timeout, partial=partial)
         return jsonify({'success': True, 'data': metrics})
     except Exception as e:
         logger.error(f"Error fetching all metrics: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@system_metrics_bp.route('/history', methods=['GET'])
+def get_metric_history():
+    """Get downsampled min/max/avg history for a metric series"""
+    try:
+        metric = request.args.get('metric', default='cpu')
+        window = parse_window(request.args.get('window', default='1h'))
+        points = request.args.get('points', default=120, type=int)
+
+        if window is None:
+            return jsonify({'success': False, 'error': 'Invalid window, use e.g. 90s, 15m, 1h or 1d'}), 400
+        if not points or points < 1 or points > 1000:
+            return jsonify({'success': False, 'error': 'points must be between 1 and 1000'}), 400
+
+        history = get_metrics_sampler().history
+        data = history.query(metric, window=window, points=points)
+        if 'error' in data:
+            return jsonify({
+                'success': False,
+                'error': data['error'],
+                'available': history.get_series_names()
+            }), 400
+        return jsonify({'success': True, 'data': data})
+    except Exception as e:
+        logger.error(f"Error fetching metric history: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@system_metrics_bp.route('/sampler', methods=['GET'])
+def get_sampler_status():
+    """Get background metrics sampler status"""
+    try:
+        return jsonify({'success': True, 'data': get_metrics_sampler().get_status()})
+    except Exception as e:
+        logger.error(f"Error fetching sampler status: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @system_metrics_bp.route('/running-apps', methods=['GET'])
 def get_running_apps():
     """Get list of currently running applications"""
@@ -154,7 +206,12 @@ def get_running_apps():
 def get_metric_by_type(metric_type):
     """Get specific metric by type"""
     try:
-        metrics = SystemMetrics.get_metric_by_type(metric_type)
+        sampler = get_metrics_sampler()
+        sampled_type = 'memory' if metric_type.lower() == 'ram' else metric_type.lower()
+        if sampled_type in sampler.COLLECTORS:
+            metrics = sampler.get_metric(sampled_type)
+        else:
+            metrics = SystemMetrics.get_metric_by_type(metric_type)
         if 'error' in metrics:
             return jsonify({'success': False, 'error': metrics['error']}), 400
         return jsonify({'success': True, 'data': metrics})
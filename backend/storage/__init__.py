@@ -0,0 +1,30 @@
+"""Profile storage backends."""
+from .base import ProfileStore, Stamp, StorageConflict, StorageError, summarize
+from .json_store import JsonProfileStore
+from .sqlite_store import SqliteProfileStore
+
+BACKENDS = {
+    JsonProfileStore.name: JsonProfileStore,
+    SqliteProfileStore.name: SqliteProfileStore
+}
+
+
+def create_store(backend: str = 'json') -> ProfileStore:
+    """Create the profile store for the requested backend.
+
+    Args:
+        backend: ``json`` (one file per profile) or ``sqlite``
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    store_class = BACKENDS.get((backend or 'json').lower())
+    if store_class is None:
+        raise ValueError(f"Unknown profile storage backend: {backend}; expected one of {', '.join(BACKENDS)}")
+    return store_class()
+
+
+__all__ = [
+    'ProfileStore', 'Stamp', 'StorageConflict', 'StorageError', 'summarize',
+    'JsonProfileStore', 'SqliteProfileStore', 'BACKENDS', 'create_store'
+]
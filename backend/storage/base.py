@@ -0,0 +1,161 @@
+"""Profile storage interface shared by every backend."""
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Version of a stored profile that changes whenever it is written
+Stamp = Tuple[int, ...]
+
+# Called once a deferred write lands, with its stamp, or None if it failed
+WrittenCallback = Callable[[Optional[Stamp]], None]
+
+
+class StorageConflict(Exception):
+    """Raised when a profile changed in storage since the stamp a write expected."""
+
+
+class StorageError(Exception):
+    """Raised when a store could not write a profile."""
+
+
+def summarize(profile_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a profile shown in the profile list."""
+    summary = {
+        'id': profile_dict['id'],
+        'name': profile_dict['name'],
+        'description': profile_dict.get('description', ''),
+        'theme': profile_dict.get('theme', 'default'),
+        'page_count': len(profile_dict.get('pages', []))
+    }
+    # Only include optional fields if they have values
+    if profile_dict.get('icon') is not None:
+        summary['icon'] = profile_dict['icon']
+    if profile_dict.get('avatar') is not None:
+        summary['avatar'] = profile_dict['avatar']
+    return summary
+
+
+class ProfileStore(ABC):
+    """Base class for profile storage backends.
+
+    Stores take and return normalised profile dicts (``Profile.to_dict()``
+    output) and give each stored profile a stamp that changes on every
+    write, so callers can check for changes without reading the profile.
+    Caching and validation are left to ``ProfileRepository``.
+    """
+
+    # Backend name used by Config.PROFILE_STORAGE
+    name = 'base'
+
+    @abstractmethod
+    def stamp(self, profile_id: str) -> Optional[Stamp]:
+        """Get the current stamp of a profile.
+
+        Returns:
+            The stamp, or None if the profile does not exist
+        """
+        pass
+
+    @abstractmethod
+    def read(self, profile_id: str) -> Optional[Tuple[Stamp, Dict[str, Any]]]:
+        """Read a profile.
+
+        Returns:
+            Tuple of (stamp, profile dict), or None if the profile does not exist
+
+        Raises:
+            ValueError: If the stored profile is not a valid profile
+        """
+        pass
+
+    @abstractmethod
+    def write(
+        self,
+        profile_dict: Dict[str, Any],
+        changed_buttons: Optional[List[str]] = None,
+        expected: Optional[Stamp] = None,
+        on_written: Optional[WrittenCallback] = None
+    ) -> Optional[Stamp]:
+        """Create or replace a profile.
+
+        Args:
+            profile_dict: Normalised profile; must not be modified afterwards
+            changed_buttons: When given, only these buttons (JSON pointers such
+                as ``/scenes/0/pages/1/buttons/2``) and the profile's own
+                fields differ from the stored profile, and no button was
+                added, removed or moved. Backends may use it to update less.
+            expected: Stamp the stored profile must still have
+            on_written: Called when a deferred write lands
+
+        Returns:
+            The new stamp, or None if the write was deferred, in which case
+            ``on_written`` receives it later
+
+        Raises:
+            StorageConflict: If ``expected`` no longer matches
+            StorageError: If a write that was not deferred failed
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, profile_id: str) -> bool:
+        """Delete a profile.
+
+        Returns:
+            True if successful (including when it did not exist), False otherwise
+        """
+        pass
+
+    @abstractmethod
+    def list_summaries(self) -> List[Dict[str, Any]]:
+        """Get the summary of every readable profile, see ``summarize``."""
+        pass
+
+    @abstractmethod
+    def list_ids(self) -> List[str]:
+        """Get the id of every stored profile."""
+        pass
+
+    def find_buttons(self, button_id: Optional[str] = None, action_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find buttons across every profile by id and/or action type.
+
+        This default reads every profile; backends with an index override it.
+
+        Returns:
+            ``{'profile_id': ..., 'button': {...}}`` for each match
+        """
+        matches = []
+        for profile_id in self.list_ids():
+            try:
+                stored = self.read(profile_id)
+            except ValueError:
+                continue
+            if stored is None:
+                continue
+            profile = stored[1]
+            pages = profile.get('pages', []) + [
+                page for scene in profile.get('scenes', []) for page in scene.get('pages', [])
+            ]
+            buttons = [b for page in pages for b in page.get('buttons', [])] + profile.get('dockedButtons', [])
+            for button in buttons:
+                action = button.get('action') or {}
+                if (button_id is None or button.get('id') == button_id) \
+                        and (action_type is None or action.get('type') == action_type):
+                    matches.append({'profile_id': profile_id, 'button': button})
+        return matches
+
+    def flush(self) -> bool:
+        """Make every write so far durable.
+
+        Returns:
+            True if all pending writes succeeded
+        """
+        return True
+
+    def close(self):
+        """Release connections and other resources."""
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend-specific counters."""
+        pass
@@ -0,0 +1,280 @@
+"""
+JSON File Storage
+One JSON file per profile, written behind, with a persistent summary index
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.file_manager import FileManager
+from utils.write_behind import get_write_behind
+from .base import ProfileStore, Stamp, StorageError, WrittenCallback, summarize
+
+logger = logging.getLogger('vdock')
+
+# Summary index kept next to the profiles; '_'-prefixed files are not profiles
+INDEX_FILE = '_index.json'
+INDEX_FORMAT = 1
+
+
+class JsonProfileStore(ProfileStore):
+    """Stores each profile as ``<id>.json`` in a directory.
+
+    A profile's stamp is the (mtime, size) of its file. Writes go through
+    the write-behind writer, so they are deferred and coalesced; until a
+    write lands, the saved profile's summary is listed in place of the
+    older file.
+
+    Listing is served from ``_index.json``, which holds every profile's
+    summary with the stamp it was taken from. Each listing only stats the
+    files; a profile is parsed again only if its file no longer matches its
+    index entry, and the whole index is rebuilt if it is missing or
+    unreadable. The index is rewritten, debounced like the profiles,
+    whenever it changes.
+    """
+
+    name = 'json'
+
+    def __init__(self, profiles_dir: Optional[Path] = None):
+        """
+        Initialize the store.
+
+        Args:
+            profiles_dir: Directory of profile JSON files, defaults to Config.PROFILES_DIR
+        """
+        if profiles_dir is None:
+            from config import Config
+            profiles_dir = Config.PROFILES_DIR
+        self.profiles_dir = Path(profiles_dir)
+        # Profile id -> {'stamp': [mtime_ns, size], 'summary': {...}}; None until loaded
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._index_dirty = False
+        self._index_status: Dict[str, Any] = {}
+        # Profile id -> (write token, summary) for saves that have not reached disk
+        self._unwritten: Dict[str, Tuple[object, Dict[str, Any]]] = {}
+        self._stats = {'reads': 0, 'writes': 0, 'index_writes': 0}
+        self._lock = threading.RLock()
+
+    def _path(self, profile_id: str) -> Path:
+        return self.profiles_dir / f"{profile_id}.json"
+
+    @property
+    def index_path(self) -> Path:
+        return self.profiles_dir / INDEX_FILE
+
+    @staticmethod
+    def _file_stamp(path: Path) -> Optional[Stamp]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _parse(path: Path) -> Dict[str, Any]:
+        """Read and normalise a profile file.
+
+        Raises:
+            ValueError: If the file is not a valid profile
+        """
+        from models import Profile
+
+        profile_data = FileManager.load_json(path)
+        if not profile_data:
+            raise ValueError(f'Could not read profile file {path.name}')
+        # Normalise through the model, as the routes always have
+        return Profile.from_dict(profile_data).to_dict()
+
+    def stamp(self, profile_id: str) -> Optional[Stamp]:
+        return self._file_stamp(self._path(profile_id))
+
+    def read(self, profile_id: str) -> Optional[Tuple[Stamp, Dict[str, Any]]]:
+        path = self._path(profile_id)
+        stamp = self._file_stamp(path)
+        if stamp is None:
+            return None
+        profile_dict = self._parse(path)
+        with self._lock:
+            self._stats['reads'] += 1
+            self._index_entry(profile_id, stamp, summarize(profile_dict))
+        return stamp, profile_dict
+
+    def write(
+        self,
+        profile_dict: Dict[str, Any],
+        changed_buttons: Optional[List[str]] = None,
+        expected: Optional[Stamp] = None,
+        on_written: Optional[WrittenCallback] = None
+    ) -> Optional[Stamp]:
+        """Schedule writing a profile's file.
+
+        The whole file is always rewritten, so ``changed_buttons`` is unused.
+        ``expected`` is not checked either: the files belong to this process,
+        whose repository already serialises writes.
+
+        Raises:
+            StorageError: If write-behind is disabled and the write failed
+        """
+        profile_id = profile_dict['id']
+        token = object()
+        with self._lock:
+            self._unwritten[profile_id] = (token, summarize(profile_dict))
+            self._stats['writes'] += 1
+        # Compact: indented output is several times slower to encode for big profiles
+        scheduled = FileManager.save_json_deferred(
+            self._path(profile_id), profile_dict, indent=None,
+            on_written=lambda ok: self._written(profile_id, token, ok, on_written)
+        )
+        if not scheduled:
+            # Written synchronously and failed; nothing will retry it
+            with self._lock:
+                if self._unwritten.get(profile_id, (None,))[0] is token:
+                    del self._unwritten[profile_id]
+            raise StorageError(f'Failed to write profile {profile_id}')
+        return None
+
+    def _written(self, profile_id: str, token: object, ok: bool, on_written: Optional[WrittenCallback]):
+        """Index a profile once its deferred write lands."""
+        stamp = self.stamp(profile_id) if ok else None
+        with self._lock:
+            unwritten = self._unwritten.get(profile_id)
+            # A newer save has its own write still to come
+            if stamp is not None and unwritten is not None and unwritten[0] is token:
+                del self._unwritten[profile_id]
+                self._index_entry(profile_id, stamp, unwritten[1])
+                self._write_index()
+        if not ok:
+            logger.error(f"Failed to write profile {profile_id}")
+        if on_written:
+            on_written(stamp)
+
+    def delete(self, profile_id: str) -> bool:
+        with self._lock:
+            path = self._path(profile_id)
+            get_write_behind().discard(path)
+            if not FileManager.delete_file(path):
+                return False
+            self._unwritten.pop(profile_id, None)
+            if self._index is not None and self._index.pop(profile_id, None) is not None:
+                self._index_dirty = True
+            self._write_index()
+        return True
+
+    def _index_entry(self, profile_id: str, stamp: Stamp, summary: Dict[str, Any]):
+        if self._index is not None:
+            self._index[profile_id] = {'stamp': list(stamp), 'summary': summary}
+            self._index_dirty = True
+
+    def _load_index(self):
+        """Read the summary index from disk, starting empty if it is missing or invalid."""
+        exists = self.index_path.exists()
+        data = FileManager.load_json(self.index_path) if exists else None
+        if isinstance(data, dict) and data.get('format') == INDEX_FORMAT \
+                and isinstance(data.get('profiles'), dict):
+            self._index = data['profiles']
+            self._index_status = {'source': 'index', 'entries_loaded': len(self._index)}
+        else:
+            self._index = {}
+            self._index_dirty = True
+            self._index_status = {'source': 'rebuilt_invalid' if exists else 'rebuilt_missing'}
+
+    def _write_index(self):
+        """Schedule an atomic rewrite of the index file if it changed."""
+        if not self._index_dirty or self._index is None:
+            return
+        # Entries are replaced, never modified, so a shallow copy is a stable snapshot
+        snapshot = {'format': INDEX_FORMAT, 'profiles': dict(self._index)}
+        FileManager.save_json_deferred(self.index_path, snapshot, indent=None)
+        self._index_dirty = False
+        self._stats['index_writes'] += 1
+
+    def list_summaries(self) -> List[Dict[str, Any]]:
+        """Get the summary of every readable profile.
+
+        Only profiles whose files changed since they were indexed are parsed.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            first = self._index is None
+            if first:
+                self._load_index()
+
+            summaries = []
+            seen = set()
+            parsed = 0
+            for path in FileManager.list_files(self.profiles_dir, '*.json'):
+                profile_id = path.stem
+                if profile_id.startswith('_'):
+                    continue
+                seen.add(profile_id)
+                unwritten = self._unwritten.get(profile_id)
+                if unwritten is not None:
+                    # Written behind; the file is older than the saved profile
+                    summaries.append(unwritten[1])
+                    continue
+                stamp = self._file_stamp(path)
+                if stamp is None:
+                    continue
+                indexed = self._index.get(profile_id)
+                if indexed is not None and tuple(indexed['stamp']) == stamp:
+                    summaries.append(indexed['summary'])
+                    continue
+                try:
+                    summary = summarize(self._parse(path))
+                except Exception as e:
+                    logger.error(f"Error loading profile {path}: {e}")
+                    continue
+                parsed += 1
+                self._index_entry(profile_id, stamp, summary)
+                summaries.append(summary)
+
+            for profile_id, (_, summary) in self._unwritten.items():
+                if profile_id not in seen:
+                    # Created but not written yet
+                    seen.add(profile_id)
+                    summaries.append(summary)
+
+            for profile_id in [p for p in self._index if p not in seen]:
+                del self._index[profile_id]
+                self._index_dirty = True
+            self._write_index()
+
+            if first:
+                elapsed = time.perf_counter() - started
+                self._index_status.update({
+                    'startup_ms': round(elapsed * 1000, 2),
+                    'profiles': len(summaries),
+                    'parsed': parsed
+                })
+                logger.info(
+                    f"Profile index ready: {len(summaries)} profiles, {parsed} parsed, "
+                    f"{self._index_status['source']} in {elapsed * 1000:.1f} ms"
+                )
+            return summaries
+
+    def list_ids(self) -> List[str]:
+        with self._lock:
+            ids = [
+                path.stem for path in FileManager.list_files(self.profiles_dir, '*.json')
+                if not path.stem.startswith('_')
+            ]
+            on_disk = set(ids)
+            return ids + [p for p in self._unwritten if p not in on_disk]
+
+    def flush(self) -> bool:
+        return FileManager.flush_writes()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': self.name,
+                'directory': str(self.profiles_dir),
+                **self._stats,
+                'unwritten': len(self._unwritten),
+                'index': {
+                    **self._index_status,
+                    'entries': len(self._index) if self._index is not None else None
+                }
+            }
@@ -0,0 +1,87 @@
+"""
+Profile Storage Migration
+Copies every profile from one storage backend to another and checks the copies.
+
+Run from the backend directory, with the server stopped:
+    python -m storage.migrate --to sqlite [--from json] [--db data/profiles.db]
+
+The source is left untouched, so switching PROFILE_STORAGE back undoes the
+migration. Profiles already in the target are replaced.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from . import BACKENDS, JsonProfileStore, ProfileStore, SqliteProfileStore, StorageError
+
+
+def open_store(backend: str, profiles_dir: Optional[str] = None, db_path: Optional[str] = None) -> ProfileStore:
+    """Open a store, overriding its configured location if given."""
+    if backend == JsonProfileStore.name:
+        return JsonProfileStore(profiles_dir)
+    if backend == SqliteProfileStore.name:
+        return SqliteProfileStore(db_path)
+    raise ValueError(f"Unknown profile storage backend: {backend}; expected one of {', '.join(BACKENDS)}")
+
+
+def migrate(source: ProfileStore, target: ProfileStore) -> List[str]:
+    """Copy every profile from source to target.
+
+    Returns:
+        Ids of the profiles that could not be copied or read back unchanged
+    """
+    failed = []
+    copied = []
+    for profile_id in source.list_ids():
+        try:
+            stored = source.read(profile_id)
+        except ValueError as e:
+            print(f'  skipped {profile_id}: {e}')
+            failed.append(profile_id)
+            continue
+        if stored is None:
+            continue
+        try:
+            target.write(stored[1])
+        except StorageError as e:
+            print(f'  failed to write {profile_id}: {e}')
+            failed.append(profile_id)
+            continue
+        copied.append((profile_id, stored[1]))
+
+    if not target.flush():
+        print('  some writes to the target failed')
+
+    for profile_id, profile_dict in copied:
+        stored = target.read(profile_id)
+        if stored is None or stored[1] != profile_dict:
+            print(f'  mismatch after copy: {profile_id}')
+            failed.append(profile_id)
+    print(f'Copied {len(copied)} profiles from {source.name} to {target.name}, {len(failed)} failed')
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--from', dest='source', default='json', choices=list(BACKENDS), help='backend to read')
+    parser.add_argument('--to', dest='target', required=True, choices=list(BACKENDS), help='backend to write')
+    parser.add_argument('--profiles-dir', help='JSON profile directory (default: Config.PROFILES_DIR)')
+    parser.add_argument('--db', help='SQLite database (default: Config.PROFILE_DB_PATH)')
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error('--from and --to must be different backends')
+
+    source = open_store(args.source, args.profiles_dir, args.db)
+    target = open_store(args.target, args.profiles_dir, args.db)
+    try:
+        failed = migrate(source, target)
+    finally:
+        source.close()
+        target.close()
+    if not failed:
+        print(f'Set PROFILE_STORAGE={target.name} to use the new storage')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
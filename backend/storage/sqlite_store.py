@@ -0,0 +1,474 @@
+"""
+SQLite Storage
+Profiles split into profile, scene, page and button rows in one WAL-mode database
+"""
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .base import ProfileStore, Stamp, StorageConflict, StorageError, WrittenCallback
+
+logger = logging.getLogger('vdock')
+
+# Stored in PRAGMA user_version; bump with a migration when the tables change
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    icon TEXT,
+    avatar TEXT,
+    theme TEXT NOT NULL DEFAULT 'default',
+    settings TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    revision INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scenes (
+    pk INTEGER PRIMARY KEY,
+    profile_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    icon TEXT,
+    color TEXT,
+    is_active INTEGER NOT NULL DEFAULT 0,
+    button_size REAL,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+-- scene_pk is NULL for the legacy pages stored directly on a profile
+CREATE TABLE IF NOT EXISTS pages (
+    pk INTEGER PRIMARY KEY,
+    profile_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    scene_pk INTEGER REFERENCES scenes(pk) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    grid_config TEXT,
+    background TEXT
+);
+
+-- page_pk is NULL for docked buttons; data holds the full button as JSON
+CREATE TABLE IF NOT EXISTS buttons (
+    pk INTEGER PRIMARY KEY,
+    profile_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    page_pk INTEGER REFERENCES pages(pk) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    action_type TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_scenes_profile ON scenes(profile_id, position);
+CREATE INDEX IF NOT EXISTS idx_pages_profile ON pages(profile_id, scene_pk, position);
+CREATE INDEX IF NOT EXISTS idx_pages_scene ON pages(scene_pk);
+CREATE INDEX IF NOT EXISTS idx_buttons_profile ON buttons(profile_id, page_pk, position);
+CREATE INDEX IF NOT EXISTS idx_buttons_page ON buttons(page_pk);
+CREATE INDEX IF NOT EXISTS idx_buttons_id ON buttons(id);
+CREATE INDEX IF NOT EXISTS idx_buttons_action_type ON buttons(action_type);
+'''
+
+_PROFILE_COLUMNS = 'name, description, icon, avatar, theme, settings, created_at, updated_at, revision'
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def _loads(text: Optional[str]) -> Any:
+    return None if text is None else json.loads(text)
+
+
+def _button_row(button: Dict[str, Any]) -> Tuple[str, Optional[str], str]:
+    """(id, action_type, data) columns of a button."""
+    action = button.get('action')
+    return button['id'], action.get('type') if action else None, _dumps(button)
+
+
+class SqliteProfileStore(ProfileStore):
+    """Stores profiles in an SQLite database.
+
+    Scenes, pages and buttons each get their own rows, so single-button
+    edits update one row instead of rewriting the profile, and buttons can
+    be found by id or action type through indexes. The database runs in WAL
+    mode, so readers are not blocked by a writer, and each write is a single
+    transaction. A profile's stamp is its ``revision``, taken from a
+    database-wide counter, which other processes sharing the file see too.
+    Every thread gets its own connection.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: Optional[Path] = None, busy_timeout: float = 5.0):
+        """
+        Initialize the store and create the tables if needed.
+
+        Args:
+            db_path: Database file, defaults to Config.PROFILE_DB_PATH
+            busy_timeout: Seconds to wait for another writer before failing
+        """
+        if db_path is None:
+            from config import Config
+            db_path = Config.PROFILE_DB_PATH
+        self.db_path = Path(db_path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._stats = {'reads': 0, 'writes': 0, 'button_updates': 0, 'conflicts': 0}
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+            connection = sqlite3.connect(
+                str(self.db_path), timeout=self.busy_timeout,
+                isolation_level=None, check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            # Durable at each checkpoint rather than each commit; safe with WAL
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA foreign_keys=ON')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block as one write transaction, rolling back on error."""
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _create_schema(self):
+        connection = self._connect()
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f'{self.db_path} has schema version {version}; this server supports {SCHEMA_VERSION}'
+            )
+        connection.executescript(SCHEMA)
+        connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def stamp(self, profile_id: str) -> Optional[Stamp]:
+        row = self._connect().execute(
+            'SELECT revision FROM profiles WHERE id = ?', (profile_id,)
+        ).fetchone()
+        return (row[0],) if row else None
+
+    def read(self, profile_id: str) -> Optional[Tuple[Stamp, Dict[str, Any]]]:
+        connection = self._connect()
+        # One read transaction so the rows come from a single revision
+        connection.execute('BEGIN')
+        try:
+            row = connection.execute(
+                f'SELECT {_PROFILE_COLUMNS} FROM profiles WHERE id = ?', (profile_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            scenes = connection.execute(
+                'SELECT pk, id, name, icon, color, is_active, button_size, created_at, updated_at '
+                'FROM scenes WHERE profile_id = ? ORDER BY position', (profile_id,)
+            ).fetchall()
+            pages = connection.execute(
+                'SELECT pk, scene_pk, id, name, grid_config, background '
+                'FROM pages WHERE profile_id = ? ORDER BY scene_pk, position', (profile_id,)
+            ).fetchall()
+            buttons = connection.execute(
+                'SELECT page_pk, data FROM buttons WHERE profile_id = ? ORDER BY page_pk, position',
+                (profile_id,)
+            ).fetchall()
+        finally:
+            connection.execute('COMMIT')
+
+        buttons_by_page: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for page_pk, data in buttons:
+            buttons_by_page.setdefault(page_pk, []).append(json.loads(data))
+
+        pages_by_scene: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for pk, scene_pk, page_id, name, grid_config, background in pages:
+            pages_by_scene.setdefault(scene_pk, []).append({
+                'id': page_id,
+                'name': name,
+                'buttons': buttons_by_page.get(pk, []),
+                'grid_config': _loads(grid_config),
+                'background': _loads(background)
+            })
+
+        # Same shape and key order as Scene.to_dict() and Profile.to_dict()
+        scene_dicts = []
+        for pk, scene_id, name, icon, color, is_active, button_size, created_at, updated_at in scenes:
+            scene = {
+                'id': scene_id,
+                'name': name,
+                'pages': pages_by_scene.get(pk, []),
+                'isActive': bool(is_active)
+            }
+            for key, value in (('icon', icon), ('color', color), ('buttonSize', button_size),
+                               ('created_at', created_at), ('updated_at', updated_at)):
+                if value is not None:
+                    scene[key] = value
+            scene_dicts.append(scene)
+
+        name, description, icon, avatar, theme, settings, created_at, updated_at, revision = row
+        profile = {
+            'id': profile_id,
+            'name': name,
+            'description': description,
+            'pages': pages_by_scene.get(None, []),
+            'scenes': scene_dicts,
+            'dockedButtons': buttons_by_page.get(None, []),
+            'theme': theme,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+        if icon is not None:
+            profile['icon'] = icon
+        if avatar is not None:
+            profile['avatar'] = avatar
+        if settings is not None:
+            profile['settings'] = json.loads(settings)
+
+        with self._lock:
+            self._stats['reads'] += 1
+        return (revision,), profile
+
+    def write(
+        self,
+        profile_dict: Dict[str, Any],
+        changed_buttons: Optional[List[str]] = None,
+        expected: Optional[Stamp] = None,
+        on_written: Optional[WrittenCallback] = None
+    ) -> Optional[Stamp]:
+        """Write a profile in one transaction.
+
+        With ``changed_buttons`` only the profile row and those button rows
+        are updated; otherwise every scene, page and button row of the
+        profile is replaced.
+
+        Raises:
+            StorageConflict: If ``expected`` no longer matches
+            StorageError: If the database could not be written
+        """
+        profile_id = profile_dict['id']
+        try:
+            with self._transaction() as connection:
+                current = connection.execute(
+                    'SELECT revision FROM profiles WHERE id = ?', (profile_id,)
+                ).fetchone()
+                if expected is not None and (current is None or (current[0],) != tuple(expected)):
+                    with self._lock:
+                        self._stats['conflicts'] += 1
+                    raise StorageConflict(f'Profile {profile_id} was changed by another writer')
+
+                connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+                revision = connection.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+                self._write_profile_row(connection, profile_dict, revision)
+
+                if current is None or changed_buttons is None \
+                        or not self._update_buttons(connection, profile_dict, changed_buttons):
+                    self._replace_children(connection, profile_dict)
+        except sqlite3.Error as e:
+            raise StorageError(f'Failed to write profile {profile_id}: {e}') from e
+
+        with self._lock:
+            self._stats['writes'] += 1
+            if changed_buttons is not None:
+                self._stats['button_updates'] += len(changed_buttons)
+        return (revision,)
+
+    @staticmethod
+    def _write_profile_row(connection: sqlite3.Connection, profile: Dict[str, Any], revision: int):
+        connection.execute(
+            f'INSERT INTO profiles (id, {_PROFILE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(id) DO UPDATE SET name = excluded.name, description = excluded.description, '
+            'icon = excluded.icon, avatar = excluded.avatar, theme = excluded.theme, '
+            'settings = excluded.settings, created_at = excluded.created_at, '
+            'updated_at = excluded.updated_at, revision = excluded.revision',
+            (
+                profile['id'], profile['name'], profile.get('description', ''),
+                profile.get('icon'), profile.get('avatar'), profile.get('theme', 'default'),
+                _dumps(profile.get('settings')), profile.get('created_at'),
+                profile.get('updated_at'), revision
+            )
+        )
+
+    @staticmethod
+    def _update_buttons(connection: sqlite3.Connection, profile: Dict[str, Any], pointers: List[str]) -> bool:
+        """Update the rows of buttons whose contents changed.
+
+        Returns:
+            False if a button row could not be found, in which case the
+            caller replaces every row instead
+        """
+        profile_id = profile['id']
+        updates = []
+        for pointer in pointers:
+            tokens = pointer.strip('/').split('/')
+            if tokens[0] == 'scenes':
+                scene_pos, page_pos, button_pos = int(tokens[1]), int(tokens[3]), int(tokens[5])
+                button = profile['scenes'][scene_pos]['pages'][page_pos]['buttons'][button_pos]
+                row = connection.execute(
+                    'SELECT b.pk FROM scenes s '
+                    'JOIN pages p ON p.scene_pk = s.pk AND p.position = ? '
+                    'JOIN buttons b ON b.page_pk = p.pk AND b.position = ? '
+                    'WHERE s.profile_id = ? AND s.position = ?',
+                    (page_pos, button_pos, profile_id, scene_pos)
+                ).fetchone()
+            elif tokens[0] == 'dockedButtons':
+                button_pos = int(tokens[1])
+                button = profile['dockedButtons'][button_pos]
+                row = connection.execute(
+                    'SELECT pk FROM buttons WHERE profile_id = ? AND page_pk IS NULL AND position = ?',
+                    (profile_id, button_pos)
+                ).fetchone()
+            else:
+                return False
+            if row is None:
+                return False
+            updates.append((*_button_row(button), row[0]))
+        connection.executemany('UPDATE buttons SET id = ?, action_type = ?, data = ? WHERE pk = ?', updates)
+        return True
+
+    @staticmethod
+    def _replace_children(connection: sqlite3.Connection, profile: Dict[str, Any]):
+        """Replace every scene, page and button row of a profile."""
+        profile_id = profile['id']
+        # Children first, so the cascades have nothing left to look up
+        connection.execute('DELETE FROM buttons WHERE profile_id = ?', (profile_id,))
+        connection.execute('DELETE FROM pages WHERE profile_id = ?', (profile_id,))
+        connection.execute('DELETE FROM scenes WHERE profile_id = ?', (profile_id,))
+
+        buttons = []
+
+        def insert_pages(pages: List[Dict[str, Any]], scene_pk: Optional[int]):
+            for position, page in enumerate(pages):
+                page_pk = connection.execute(
+                    'INSERT INTO pages (profile_id, scene_pk, position, id, name, grid_config, background) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (profile_id, scene_pk, position, page['id'], page['name'],
+                     _dumps(page.get('grid_config')), _dumps(page.get('background')))
+                ).lastrowid
+                buttons.extend(
+                    (profile_id, page_pk, i, *_button_row(b)) for i, b in enumerate(page.get('buttons', []))
+                )
+
+        insert_pages(profile.get('pages', []), None)
+        for position, scene in enumerate(profile.get('scenes', [])):
+            scene_pk = connection.execute(
+                'INSERT INTO scenes (profile_id, position, id, name, icon, color, is_active, button_size, '
+                'created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (profile_id, position, scene['id'], scene['name'], scene.get('icon'), scene.get('color'),
+                 int(bool(scene.get('isActive'))), scene.get('buttonSize'),
+                 scene.get('created_at'), scene.get('updated_at'))
+            ).lastrowid
+            insert_pages(scene.get('pages', []), scene_pk)
+        buttons.extend(
+            (profile_id, None, i, *_button_row(b)) for i, b in enumerate(profile.get('dockedButtons', []))
+        )
+
+        connection.executemany(
+            'INSERT INTO buttons (profile_id, page_pk, position, id, action_type, data) '
+            'VALUES (?, ?, ?, ?, ?, ?)', buttons
+        )
+
+    def delete(self, profile_id: str) -> bool:
+        try:
+            with self._transaction() as connection:
+                connection.execute('DELETE FROM buttons WHERE profile_id = ?', (profile_id,))
+                connection.execute('DELETE FROM pages WHERE profile_id = ?', (profile_id,))
+                connection.execute('DELETE FROM scenes WHERE profile_id = ?', (profile_id,))
+                connection.execute('DELETE FROM profiles WHERE id = ?', (profile_id,))
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting profile {profile_id}: {e}")
+            return False
+
+    def list_summaries(self) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            'SELECT id, name, description, theme, icon, avatar, '
+            '(SELECT COUNT(*) FROM pages WHERE pages.profile_id = profiles.id AND pages.scene_pk IS NULL) '
+            'FROM profiles ORDER BY rowid'
+        ).fetchall()
+        summaries = []
+        for profile_id, name, description, theme, icon, avatar, page_count in rows:
+            summary = {
+                'id': profile_id,
+                'name': name,
+                'description': description,
+                'theme': theme,
+                'page_count': page_count
+            }
+            # Only include optional fields if they have values
+            if icon is not None:
+                summary['icon'] = icon
+            if avatar is not None:
+                summary['avatar'] = avatar
+            summaries.append(summary)
+        return summaries
+
+    def list_ids(self) -> List[str]:
+        return [row[0] for row in self._connect().execute('SELECT id FROM profiles ORDER BY rowid')]
+
+    def find_buttons(self, button_id: Optional[str] = None, action_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find buttons through the button id and action type indexes."""
+        clauses, params = [], []
+        if button_id is not None:
+            clauses.append('id = ?')
+            params.append(button_id)
+        if action_type is not None:
+            clauses.append('action_type = ?')
+            params.append(action_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._connect().execute(f'SELECT profile_id, data FROM buttons {where}', params).fetchall()
+        return [{'profile_id': profile_id, 'button': json.loads(data)} for profile_id, data in rows]
+
+    def close(self):
+        """Close every connection opened by this store."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, Any]:
+        connection = self._connect()
+        counts = {
+            table: connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in ('profiles', 'scenes', 'pages', 'buttons')
+        }
+        with self._lock:
+            return {
+                'backend': self.name,
+                'path': str(self.db_path),
+                **self._stats,
+                'rows': counts,
+                'connections': len(self._connections)
+            }
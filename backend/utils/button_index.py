@@ -0,0 +1,177 @@
+"""
+Button Index
+In-memory map of button id -> (profile, scene, page, action) for execute-by-id presses
+"""
+import logging
+import threading
+from typing import Dict, Any, List, NamedTuple, Optional
+
+from models import Profile, Button
+
+logger = logging.getLogger(__name__)
+
+
+class ButtonEntry(NamedTuple):
+    """Where a button lives and what it does."""
+    button_id: str
+    profile_id: str
+    scene_id: Optional[str]  # None for legacy pages and docked buttons
+    page_id: Optional[str]  # None for docked buttons
+    action: Optional[Dict[str, Any]]
+    plan_key: Optional[str]  # Precomputed action key for the plan and result caches
+    enabled: bool
+
+
+class ButtonIndex:
+    """Index of every button across all profiles.
+
+    Built lazily from the profile repository on first use, then kept current
+    by replacing a single profile's entries whenever that profile is saved
+    or deleted. Button ids are only unique within a profile (duplicated
+    profiles keep their scene button ids), so lookups may need a profile id.
+    """
+
+    def __init__(self, repository=None):
+        """
+        Initialize the index.
+
+        Args:
+            repository: ProfileRepository to build from, defaults to the global one
+        """
+        self._repository = repository
+        self._entries: Dict[str, Dict[str, ButtonEntry]] = {}
+        self._profile_buttons: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            repository = self._repository
+            if repository is None:
+                from .profile_repository import get_profile_repository
+                repository = get_profile_repository()
+            for summary in repository.list_summaries():
+                try:
+                    profile_data = repository.get_dict(summary['id'])
+                except ValueError as e:
+                    logger.error(f"Error indexing profile {summary['id']}: {e}")
+                    continue
+                if profile_data:
+                    self.update_profile(profile_data)
+            self._loaded = True
+
+    @staticmethod
+    def _make_entry(
+        button: Button,
+        profile_id: str,
+        scene_id: Optional[str],
+        page_id: Optional[str]
+    ) -> ButtonEntry:
+        from actions.result_cache import make_action_key
+
+        action = button.action.to_dict() if button.action else None
+        plan_key = make_action_key(action['type'], action['config']) if action else None
+        return ButtonEntry(button.id, profile_id, scene_id, page_id, action, plan_key, button.enabled)
+
+    def update_profile(self, profile_data: Dict[str, Any]):
+        """Replace the entries for one profile.
+
+        Args:
+            profile_data: Profile dictionary as saved to disk
+        """
+        try:
+            profile = Profile.from_dict(profile_data)
+        except Exception as e:
+            logger.error(f"Error indexing profile {profile_data.get('id')}: {e}")
+            return
+
+        entries = []
+        for page in profile.pages:
+            entries.extend(self._make_entry(b, profile.id, None, page.id) for b in page.buttons)
+        for scene in profile.scenes:
+            for page in scene.pages:
+                entries.extend(self._make_entry(b, profile.id, scene.id, page.id) for b in page.buttons)
+        entries.extend(self._make_entry(b, profile.id, None, None) for b in profile.dockedButtons)
+
+        with self._lock:
+            self._remove(profile.id)
+            for entry in entries:
+                self._entries.setdefault(entry.button_id, {})[profile.id] = entry
+            self._profile_buttons[profile.id] = [entry.button_id for entry in entries]
+
+    def remove_profile(self, profile_id: str):
+        """Drop every entry belonging to a profile."""
+        with self._lock:
+            self._remove(profile_id)
+
+    def _remove(self, profile_id: str):
+        for button_id in self._profile_buttons.pop(profile_id, []):
+            by_profile = self._entries.get(button_id)
+            if by_profile is not None:
+                by_profile.pop(profile_id, None)
+                if not by_profile:
+                    del self._entries[button_id]
+
+    def resolve(self, button_id: str, profile_id: Optional[str] = None) -> Optional[ButtonEntry]:
+        """Find the button to press.
+
+        Args:
+            button_id: Button id
+            profile_id: Profile the button belongs to; only needed when
+                several profiles use the same button id
+
+        Returns:
+            The ButtonEntry, or None if no such button exists
+
+        Raises:
+            ValueError: If the id is ambiguous, or the button is disabled or has no action
+        """
+        self._ensure_loaded()
+        with self._lock:
+            by_profile = self._entries.get(button_id)
+            if not by_profile:
+                return None
+            if profile_id is not None:
+                entry = by_profile.get(profile_id)
+                if entry is None:
+                    return None
+            elif len(by_profile) == 1:
+                entry = next(iter(by_profile.values()))
+            else:
+                raise ValueError('Button id is used by several profiles; profile_id is required')
+
+        if not entry.enabled:
+            raise ValueError('Button is disabled')
+        if not entry.action:
+            raise ValueError('Button has no action')
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size."""
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                'profiles': len(self._profile_buttons),
+                'buttons': sum(len(ids) for ids in self._profile_buttons.values())
+            }
+
+
+# Global singleton instance
+_index_instance: Optional[ButtonIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_button_index() -> ButtonIndex:
+    """Get the global ButtonIndex singleton instance."""
+    global _index_instance
+
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                _index_instance = ButtonIndex()
+
+    return _index_instance
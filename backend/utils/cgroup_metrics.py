@@ -0,0 +1,269 @@
+"""
+Cgroup Metrics
+Reads container CPU quota, memory limit and pressure (PSI) straight from cgroup files
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# cgroup v1 reports "no limit" as a huge page-aligned number rather than "max"
+_V1_UNLIMITED = 1 << 60
+
+
+def _read(path: str) -> Optional[str]:
+    """Read a small cgroup file, returning None if it doesn't exist."""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_int(path: str) -> Optional[int]:
+    """Read a cgroup file holding a single integer."""
+    value = _read(path)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _read_keyed(path: str) -> Dict[str, int]:
+    """Read a flat ``key value`` cgroup file such as cpu.stat or memory.stat."""
+    result = {}
+    for line in (_read(path) or '').splitlines():
+        key, _, value = line.partition(' ')
+        try:
+            result[key] = int(value)
+        except ValueError:
+            continue
+    return result
+
+
+def _read_pressure(path: str) -> Optional[Dict[str, Dict[str, float]]]:
+    """Parse a PSI file (``some avg10=0.00 avg60=0.00 avg300=0.00 total=0``)."""
+    content = _read(path)
+    if content is None:
+        return None
+    pressure = {}
+    for line in content.splitlines():
+        kind, *fields = line.split()
+        values = {}
+        for field in fields:
+            key, _, value = field.partition('=')
+            values[key] = int(value) if key == 'total' else float(value)
+        pressure[kind] = values
+    return pressure
+
+
+class CgroupMetrics:
+    """Container resource metrics for cgroup v1 and v2.
+
+    ``psutil`` reports host-wide CPU and memory even inside a container, so
+    a 2-CPU, 512 MB container on a 32-core host looks idle while it is being
+    throttled. These readings come from the process's own cgroup instead.
+    """
+
+    def __init__(self, root: str = '/sys/fs/cgroup', proc_root: str = '/proc'):
+        """
+        Initialize and detect the cgroup layout.
+
+        Args:
+            root: cgroup filesystem mount point
+            proc_root: procfs mount point (for /proc/self/cgroup and host PSI)
+        """
+        self.root = root
+        self.proc_root = proc_root
+        self.version: Optional[int] = None
+        self.paths: Dict[str, str] = {}
+        self._previous_usage: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._detect()
+
+    def _resolve(self, mount: str, cgroup_path: str) -> str:
+        """Find the directory for a cgroup, falling back to the mount root.
+
+        Inside a container with its own cgroup namespace the listed path
+        doesn't exist under the mount; the mount root is the container's cgroup.
+        """
+        candidate = os.path.join(mount, cgroup_path.lstrip('/'))
+        return candidate if os.path.isdir(candidate) else mount
+
+    def _detect(self):
+        """Work out the cgroup version and controller directories."""
+        own_cgroups = _read(f'{self.proc_root}/self/cgroup') or ''
+
+        if os.path.exists(os.path.join(self.root, 'cgroup.controllers')):
+            self.version = 2
+            path = '/'
+            for line in own_cgroups.splitlines():
+                if line.startswith('0::'):
+                    path = line[3:]
+            directory = self._resolve(self.root, path)
+            self.paths = {'cpu': directory, 'memory': directory, 'io': directory}
+            return
+
+        controllers = {}
+        for line in own_cgroups.splitlines():
+            parts = line.split(':', 2)
+            if len(parts) == 3:
+                for name in parts[1].split(','):
+                    controllers[name] = parts[2]
+
+        for key, names in (('cpu', ('cpu', 'cpu,cpuacct')), ('cpuacct', ('cpuacct', 'cpu,cpuacct')),
+                           ('memory', ('memory',)), ('io', ('blkio',))):
+            for name in names:
+                mount = os.path.join(self.root, name)
+                if os.path.isdir(mount):
+                    controller = name.split(',')[-1] if key == 'cpuacct' else name.split(',')[0]
+                    self.paths[key] = self._resolve(mount, controllers.get(controller, '/'))
+                    break
+
+        if 'memory' in self.paths or 'cpu' in self.paths:
+            self.version = 1
+
+    @property
+    def available(self) -> bool:
+        """Whether a cgroup hierarchy was found."""
+        return self.version is not None
+
+    def _cpu_quota(self) -> Optional[float]:
+        """Get the CPU limit in cores, or None if unlimited."""
+        if self.version == 2:
+            content = _read(os.path.join(self.paths['cpu'], 'cpu.max'))
+            if not content:
+                return None
+            quota, _, period = content.partition(' ')
+            if quota == 'max':
+                return None
+            return int(quota) / int(period or 100000)
+
+        cpu_dir = self.paths.get('cpu')
+        if not cpu_dir:
+            return None
+        quota = _read_int(os.path.join(cpu_dir, 'cpu.cfs_quota_us'))
+        period = _read_int(os.path.join(cpu_dir, 'cpu.cfs_period_us'))
+        if not quota or quota < 0 or not period:
+            return None
+        return quota / period
+
+    def _cpu_usage_usec(self) -> Optional[int]:
+        """Get cumulative CPU time used by the cgroup in microseconds."""
+        if self.version == 2:
+            return _read_keyed(os.path.join(self.paths['cpu'], 'cpu.stat')).get('usage_usec')
+        cpuacct = self.paths.get('cpuacct')
+        usage_ns = _read_int(os.path.join(cpuacct, 'cpuacct.usage')) if cpuacct else None
+        return usage_ns // 1000 if usage_ns is not None else None
+
+    def get_cpu_metrics(self) -> Dict[str, Any]:
+        """Get CPU quota, usage (in cores and % of quota) and throttling."""
+        quota = self._cpu_quota()
+        usage_usec = self._cpu_usage_usec()
+        now = time.monotonic()
+
+        usage_cores = None
+        with self._lock:
+            if usage_usec is not None and self._previous_usage:
+                previous_usec, previous_time = self._previous_usage
+                elapsed = now - previous_time
+                if elapsed > 0 and usage_usec >= previous_usec:
+                    usage_cores = (usage_usec - previous_usec) / 1_000_000 / elapsed
+            if usage_usec is not None:
+                self._previous_usage = (usage_usec, now)
+
+        capacity = quota or float(os.cpu_count() or 1)
+        cpu_dir = self.paths.get('cpu')
+        stat = _read_keyed(os.path.join(cpu_dir, 'cpu.stat')) if cpu_dir else {}
+        throttled_usec = stat.get('throttled_usec')
+        if throttled_usec is None and 'throttled_time' in stat:
+            throttled_usec = stat['throttled_time'] // 1000
+
+        return {
+            'quota_cores': round(quota, 2) if quota else None,
+            'usage_cores': round(usage_cores, 3) if usage_cores is not None else None,
+            'usage_percent': round(usage_cores * 100 / capacity, 1) if usage_cores is not None else None,
+            'throttled_periods': stat.get('nr_throttled'),
+            'throttled_seconds': round(throttled_usec / 1_000_000, 2) if throttled_usec is not None else None
+        }
+
+    def get_memory_metrics(self) -> Dict[str, Any]:
+        """Get memory limit, usage and working set."""
+        memory_dir = self.paths.get('memory')
+        if not memory_dir:
+            return {}
+
+        if self.version == 2:
+            limit_raw = _read(os.path.join(memory_dir, 'memory.max'))
+            limit = int(limit_raw) if limit_raw and limit_raw != 'max' else None
+            usage = _read_int(os.path.join(memory_dir, 'memory.current'))
+            inactive_file = _read_keyed(os.path.join(memory_dir, 'memory.stat')).get('inactive_file', 0)
+        else:
+            limit = _read_int(os.path.join(memory_dir, 'memory.limit_in_bytes'))
+            if limit is not None and limit >= _V1_UNLIMITED:
+                limit = None
+            usage = _read_int(os.path.join(memory_dir, 'memory.usage_in_bytes'))
+            inactive_file = _read_keyed(os.path.join(memory_dir, 'memory.stat')).get('total_inactive_file', 0)
+
+        if usage is None:
+            return {}
+
+        # Working set excludes reclaimable page cache, matching what the OOM killer sees
+        working_set = max(0, usage - inactive_file)
+        return {
+            'limit_bytes': limit,
+            'usage_bytes': usage,
+            'working_set_bytes': working_set,
+            'limit_gb': round(limit / (1024**3), 2) if limit else None,
+            'usage_gb': round(working_set / (1024**3), 2),
+            'usage_percent': round(working_set * 100 / limit, 1) if limit else None
+        }
+
+    def get_pressure(self) -> Dict[str, Any]:
+        """Get PSI for cpu, memory and io (cgroup v2, else host-wide /proc/pressure)."""
+        pressure = {}
+        for resource in ('cpu', 'memory', 'io'):
+            values = None
+            if self.version == 2:
+                values = _read_pressure(os.path.join(self.paths[resource], f'{resource}.pressure'))
+            if values is None:
+                values = _read_pressure(f'{self.proc_root}/pressure/{resource}')
+            if values is not None:
+                pressure[resource] = values
+        return pressure
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get all container metrics."""
+        if not self.available:
+            return {'available': False, 'message': 'No cgroup hierarchy detected'}
+
+        cpu = self.get_cpu_metrics()
+        memory = self.get_memory_metrics()
+        return {
+            'available': True,
+            'version': self.version,
+            'limited': bool(cpu.get('quota_cores') or memory.get('limit_bytes')),
+            'cpu': cpu,
+            'memory': memory,
+            'pressure': self.get_pressure()
+        }
+
+
+# Global singleton instance
+_cgroup_instance: Optional[CgroupMetrics] = None
+_cgroup_lock = threading.Lock()
+
+
+def get_cgroup_metrics() -> CgroupMetrics:
+    """Get the global CgroupMetrics singleton instance."""
+    global _cgroup_instance
+
+    if _cgroup_instance is None:
+        with _cgroup_lock:
+            if _cgroup_instance is None:
+                _cgroup_instance = CgroupMetrics()
+
+    return _cgroup_instance
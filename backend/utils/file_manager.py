@@ -1,34 +1,162 @@
 """File management utilities."""
 import json
+import os
 import shutil
+import stat
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from datetime import datetime
 
 
+def _read_umask() -> int:
+    """Get the process umask without changing it where the platform allows."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    # No /proc (Windows, macOS): the umask can only be read by setting it, so briefly set
+    # the common 022 rather than 0 to keep files created meanwhile from being world-writable
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Process umask, read once; mkstemp files are 0600, so new files get 0666 minus this
+_UMASK = _read_umask()
+
+
 class FileManager:
     """Manages file operations for profiles and configurations."""
     
     @staticmethod
-    def save_json(file_path: Path, data: Dict[str, Any]) -> bool:
-        """Save data to a JSON file.
+    def dumps_json(data: Any, indent: Optional[int] = 2) -> str:
+        """Serialise data the way JSON files are stored.
+        
+        Args:
+            data: Data to serialise
+            indent: Indentation, or None for compact output. Indented output
+                is produced by the pure-Python encoder and is several times
+                slower for large documents.
+        """
+        separators = None if indent is not None else (',', ':')
+        return json.dumps(data, indent=indent, separators=separators, ensure_ascii=False)
+    
+    @staticmethod
+    def save_json(file_path: Path, data: Dict[str, Any], indent: Optional[int] = 2) -> bool:
+        """Save data to a JSON file atomically.
         
         Args:
             file_path: Path to save the file
             data: Data to save
+            indent: Indentation, or None for compact output
             
         Returns:
             True if successful, False otherwise
         """
+        try:
+            text = FileManager.dumps_json(data, indent)
+        except Exception as e:
+            print(f"Error saving JSON file {file_path}: {e}")
+            return False
+        return FileManager.write_atomic(file_path, text)
+    
+    @staticmethod
+    def save_json_deferred(
+        file_path: Path,
+        data: Dict[str, Any],
+        indent: Optional[int] = 2,
+        on_written: Optional[Callable[[bool], None]] = None
+    ) -> bool:
+        """Save data to a JSON file in the background.
+        
+        Saves of the same file within the write-behind delay are coalesced
+        into one atomic write. ``data`` is serialised when the write happens
+        and must not be modified after this call.
+        
+        Args:
+            file_path: Path to save the file
+            data: Data to save
+            indent: Indentation, or None for compact output
+            on_written: Called with whether the write succeeded
+            
+        Returns:
+            False if write-behind is disabled and the immediate write failed,
+            True otherwise
+        """
+        from .write_behind import get_write_behind
+        return get_write_behind().schedule(
+            file_path, lambda: FileManager.dumps_json(data, indent), on_written
+        )
+    
+    @staticmethod
+    def flush_writes() -> bool:
+        """Write every deferred save now.
+        
+        Returns:
+            True if all pending writes succeeded
+        """
+        from .write_behind import get_write_behind
+        return get_write_behind().flush()
+    
+    @staticmethod
+    def write_atomic(file_path: Path, text: str) -> bool:
+        """Replace a file's contents so readers see the old or new file, never a partial one.
+        
+        Writes a temporary file in the same directory, flushes it to disk,
+        renames it over the target and flushes the directory so the rename
+        survives a crash too. The file keeps the permissions of the file it
+        replaces, or gets the umask default if it is new.
+        
+        Args:
+            file_path: Path to write
+            text: New file contents
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        tmp_path = None
         try:
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            try:
+                mode = stat.S_IMODE(file_path.stat().st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f'.{file_path.name}.', suffix='.tmp', dir=file_path.parent
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, file_path)
+            FileManager._fsync_directory(file_path.parent)
             return True
         except Exception as e:
-            print(f"Error saving JSON file {file_path}: {e}")
+            print(f"Error writing file {file_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
             return False
     
+    @staticmethod
+    def _fsync_directory(directory: Path):
+        """Flush a directory entry change (such as a rename) to disk."""
+        if os.name == 'nt':
+            # Windows cannot open directories for fsync; NTFS journals the rename
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        except OSError:
+            # Some filesystems do not support fsync on directories
+            pass
+        finally:
+            os.close(fd)
+    
     @staticmethod
     def load_json(file_path: Path) -> Optional[Dict[str, Any]]:
         """Load data from a JSON file.
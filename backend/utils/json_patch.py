@@ -0,0 +1,185 @@
+"""
+JSON Patch
+RFC 6902 patches applied copy-on-write, so the patched document shares every
+untouched subtree with the original
+"""
+from typing import Any, Dict, List, Optional, Set
+
+OPERATIONS = ('add', 'remove', 'replace', 'move', 'copy', 'test')
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """Raised when a ``test`` operation does not match."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f'Invalid JSON pointer: {pointer!r}')
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f'JSON pointer must start with "/": {pointer}')
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def _array_index(array: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == '-':
+        return len(array)
+    if not token.isdigit() or (len(token) > 1 and token[0] == '0'):
+        raise JsonPatchError(f'Invalid array index: {token}')
+    index = int(token)
+    if index >= len(array) + (1 if allow_end else 0):
+        raise JsonPatchError(f'Array index out of range: {token}')
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    node = document
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_array_index(node, token)]
+        else:
+            raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+    return node
+
+
+class _Patcher:
+    """Applies operations, copying only the containers on the paths they touch."""
+
+    def __init__(self, document: Any):
+        self.root = document
+        # Containers created by this patch, which may be modified in place
+        self._owned: Set[int] = set()
+
+    def _own(self, node: Any) -> Any:
+        if id(node) in self._owned:
+            return node
+        if isinstance(node, dict):
+            node = dict(node)
+        elif isinstance(node, list):
+            node = list(node)
+        else:
+            return node
+        self._owned.add(id(node))
+        return node
+
+    def _parent(self, tokens: List[str]):
+        """Get a writable parent container of the last token."""
+        self.root = node = self._own(self.root)
+        for token in tokens[:-1]:
+            if isinstance(node, dict):
+                if token not in node:
+                    raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+                key = token
+            elif isinstance(node, list):
+                key = _array_index(node, token)
+            else:
+                raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+            child = self._own(node[key])
+            node[key] = child
+            node = child
+        if not isinstance(node, (dict, list)):
+            raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+        return node
+
+    def add(self, tokens: List[str], value: Any):
+        if not tokens:
+            self.root = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, list):
+            parent.insert(_array_index(parent, tokens[-1], allow_end=True), value)
+        else:
+            parent[tokens[-1]] = value
+
+    def remove(self, tokens: List[str]) -> Any:
+        if not tokens:
+            raise JsonPatchError('Cannot remove the whole document')
+        parent = self._parent(tokens)
+        if isinstance(parent, list):
+            return parent.pop(_array_index(parent, tokens[-1]))
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+        return parent.pop(tokens[-1])
+
+    def replace(self, tokens: List[str], value: Any):
+        if not tokens:
+            self.root = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, list):
+            parent[_array_index(parent, tokens[-1])] = value
+        else:
+            if tokens[-1] not in parent:
+                raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+            parent[tokens[-1]] = value
+
+    def apply(self, operation: Dict[str, Any]):
+        if not isinstance(operation, dict):
+            raise JsonPatchError('Each operation must be an object')
+        op = operation.get('op')
+        if op not in OPERATIONS:
+            raise JsonPatchError(f'Unknown operation: {op!r}')
+        if 'path' not in operation:
+            raise JsonPatchError(f'"{op}" operation requires "path"')
+        tokens = parse_pointer(operation['path'])
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JsonPatchError(f'"{op}" operation requires "value"')
+        if op in ('move', 'copy') and 'from' not in operation:
+            raise JsonPatchError(f'"{op}" operation requires "from"')
+
+        if op == 'add':
+            self.add(tokens, operation['value'])
+        elif op == 'remove':
+            self.remove(tokens)
+        elif op == 'replace':
+            self.replace(tokens, operation['value'])
+        elif op == 'move':
+            source = parse_pointer(operation['from'])
+            if tokens[:len(source)] == source and len(tokens) > len(source):
+                raise JsonPatchError('Cannot move a value into one of its own children')
+            self.add(tokens, self.remove(source))
+        elif op == 'copy':
+            # Shared safely: later operations copy before writing into it
+            self.add(tokens, _resolve(self.root, parse_pointer(operation['from'])))
+        elif op == 'test':
+            if _resolve(self.root, tokens) != operation['value']:
+                raise JsonPatchTestFailed(f'Test failed at {operation["path"]}')
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]], max_operations: Optional[int] = None) -> Any:
+    """Apply an RFC 6902 patch without modifying ``document``.
+
+    Only the containers on the paths being changed are copied; everything
+    else in the result is shared with the original.
+
+    Args:
+        document: JSON document (dicts, lists and scalars)
+        operations: Patch operations
+        max_operations: Reject patches with more operations than this
+
+    Returns:
+        The patched document
+
+    Raises:
+        JsonPatchError: If the patch is invalid or a path does not exist
+        JsonPatchTestFailed: If a ``test`` operation fails
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError('Patch must be a list of operations')
+    if max_operations is not None and len(operations) > max_operations:
+        raise JsonPatchError(f'A patch may contain at most {max_operations} operations')
+    patcher = _Patcher(document)
+    for operation in operations:
+        patcher.apply(operation)
+    return patcher.root
@@ -0,0 +1,266 @@
+"""
+Macro Recorder
+Captures keyboard and mouse input with pynput and compacts it into MacroAction steps
+"""
+import threading
+import time
+from typing import Dict, Any, List, NamedTuple, Optional
+
+try:
+    from pynput import keyboard, mouse
+    PYNPUT_AVAILABLE = True
+except ImportError:
+    PYNPUT_AVAILABLE = False
+
+MODIFIERS = ('ctrl', 'alt', 'shift', 'cmd')
+
+# pynput key names that differ from the names HotkeyAction accepts
+_KEY_ALIASES = {
+    'page_up': 'pageup',
+    'page_down': 'pagedown',
+    'media_volume_up': 'volume_up',
+    'media_volume_down': 'volume_down',
+    'media_volume_mute': 'volume_mute',
+}
+
+
+class RecordedEvent(NamedTuple):
+    """One captured input event."""
+    time: float  # time.monotonic() seconds
+    kind: str  # 'char', 'key' or 'click'
+    value: Any  # character, key list, or click dict
+
+
+def compact_events(
+    events: List[RecordedEvent],
+    start_time: Optional[float] = None,
+    min_delay: float = 0.05,
+    max_text_gap: float = 1.0
+) -> List[Dict[str, Any]]:
+    """Turn raw input events into MacroAction steps.
+
+    Runs of characters typed less than ``max_text_gap`` apart become one
+    ``text`` step, gaps shorter than ``min_delay`` are dropped, and the idle
+    time before the first event is ignored.
+
+    Args:
+        events: Events in time order
+        start_time: Monotonic time recording started
+        min_delay: Shortest gap in seconds kept as a ``delay`` step
+        max_text_gap: Longest pause in seconds still merged into one text step
+
+    Returns:
+        List of macro step dicts
+    """
+    steps: List[Dict[str, Any]] = []
+    last_time = start_time
+
+    for event in events:
+        gap = event.time - last_time if last_time is not None else 0.0
+        last_time = event.time
+
+        if (event.kind == 'char' and steps and steps[-1]['type'] == 'text'
+                and gap <= max_text_gap):
+            steps[-1]['text'] += event.value
+            continue
+
+        if steps and gap >= min_delay:
+            steps.append({'type': 'delay', 'delay': int(round(gap * 100)) * 10})
+
+        if event.kind == 'char':
+            steps.append({'type': 'text', 'text': event.value})
+        elif event.kind == 'key':
+            steps.append({'type': 'hotkey', 'keys': list(event.value)})
+        elif event.kind == 'click':
+            steps.append({'type': 'click', **event.value})
+
+    return steps
+
+
+class MacroRecorder:
+    """Records keyboard and mouse input into macro steps.
+
+    Only one recording runs at a time. Events stay in memory until the
+    recording is stopped and are never written to disk.
+    """
+
+    def __init__(self, max_events: int = 10000):
+        """
+        Initialize the recorder.
+
+        Args:
+            max_events: Events kept before further input is ignored
+        """
+        self.max_events = max_events
+        self.running = False
+        self.started_at: Optional[float] = None
+        self.options: Dict[str, Any] = {}
+        self._events: List[RecordedEvent] = []
+        self._modifiers: List[str] = []
+        self._listeners: list = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key_name(key) -> Optional[str]:
+        """Get the HotkeyAction name of a special key (ctrl_l -> ctrl)."""
+        name = getattr(key, 'name', None)
+        if not name:
+            return None
+        for suffix in ('_l', '_r', '_gr'):
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+                break
+        return _KEY_ALIASES.get(name, name)
+
+    def _record(self, kind: str, value: Any):
+        with self._lock:
+            if self.running and len(self._events) < self.max_events:
+                self._events.append(RecordedEvent(time.monotonic(), kind, value))
+
+    def _on_press(self, key):
+        name = self._key_name(key)
+        if name in MODIFIERS:
+            if name not in self._modifiers:
+                self._modifiers.append(name)
+            return
+
+        char = getattr(key, 'char', None)
+        held = [m for m in self._modifiers if m != 'shift']
+        if name == 'space' and not held:
+            # Keep spaces inside text runs instead of splitting them into hotkeys
+            char = ' '
+        if char and not held:
+            # Shift is already reflected in the character
+            self._record('char', char)
+            return
+
+        if char and ord(char) < 32:
+            # With ctrl held some platforms report control codes (ctrl+c -> '\x03')
+            char = chr(ord(char) + 96)
+        key_name = char.lower() if char else name
+        if key_name:
+            self._record('key', self._modifiers + [key_name])
+
+    def _on_release(self, key):
+        name = self._key_name(key)
+        if name in self._modifiers:
+            self._modifiers.remove(name)
+
+    def _on_click(self, x, y, button, pressed):
+        if not pressed:
+            return
+        click = {'position': {'x': int(x), 'y': int(y)}}
+        button_name = getattr(button, 'name', 'left')
+        if button_name != 'left':
+            click['button'] = button_name
+        self._record('click', click)
+
+    def start(self, record_keyboard: bool = True, record_mouse: bool = True,
+              min_delay_ms: int = 50, max_text_gap_ms: int = 1000):
+        """Start recording.
+
+        Args:
+            record_keyboard: Capture key presses
+            record_mouse: Capture mouse clicks
+            min_delay_ms: Shortest pause kept as a delay step
+            max_text_gap_ms: Longest pause merged into one text step
+
+        Raises:
+            RuntimeError: If pynput is unavailable or a recording is running
+        """
+        if not PYNPUT_AVAILABLE:
+            raise RuntimeError('pynput library not available')
+
+        with self._lock:
+            if self.running:
+                raise RuntimeError('A recording is already in progress')
+            self._events = []
+            self._modifiers = []
+            self.options = {
+                'record_keyboard': record_keyboard,
+                'record_mouse': record_mouse,
+                'min_delay_ms': min_delay_ms,
+                'max_text_gap_ms': max_text_gap_ms
+            }
+            self.started_at = time.monotonic()
+            self.running = True
+
+        listeners = []
+        if record_keyboard:
+            listeners.append(keyboard.Listener(on_press=self._on_press, on_release=self._on_release))
+        if record_mouse:
+            listeners.append(mouse.Listener(on_click=self._on_click))
+        self._listeners = listeners
+        try:
+            for listener in listeners:
+                listener.start()
+        except Exception:
+            for listener in listeners:
+                listener.stop()
+            self._listeners = []
+            self.running = False
+            raise
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop recording and return the compacted steps.
+
+        Returns:
+            Dict with the macro ``steps`` and recording statistics
+
+        Raises:
+            RuntimeError: If no recording is running
+        """
+        with self._lock:
+            if not self.running:
+                raise RuntimeError('No recording in progress')
+            self.running = False
+            events = self._events
+            self._events = []
+            listeners = self._listeners
+            self._listeners = []
+
+        for listener in listeners:
+            listener.stop()
+
+        steps = compact_events(
+            events,
+            start_time=self.started_at,
+            min_delay=self.options['min_delay_ms'] / 1000,
+            max_text_gap=self.options['max_text_gap_ms'] / 1000
+        )
+        return {
+            'steps': steps,
+            'events_recorded': len(events),
+            'steps_count': len(steps),
+            'duration': round(time.monotonic() - self.started_at, 2),
+            'truncated': len(events) >= self.max_events
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the recording status."""
+        with self._lock:
+            return {
+                'available': PYNPUT_AVAILABLE,
+                'running': self.running,
+                'events_recorded': len(self._events),
+                'duration': round(time.monotonic() - self.started_at, 2)
+                if self.running else None,
+                'options': self.options if self.running else {}
+            }
+
+
+# Global singleton instance
+_recorder_instance: Optional[MacroRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_macro_recorder() -> MacroRecorder:
+    """Get the global MacroRecorder singleton instance."""
+    global _recorder_instance
+
+    if _recorder_instance is None:
+        with _recorder_lock:
+            if _recorder_instance is None:
+                _recorder_instance = MacroRecorder()
+
+    return _recorder_instance
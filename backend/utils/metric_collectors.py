@@ -0,0 +1,298 @@
+"""
+Metric Collector Backends
+psutil-based collection everywhere, plus a /proc fast path on Linux
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Shapes mirror the psutil namedtuples so callers can use either backend
+VirtualMemory = namedtuple('VirtualMemory', 'total available percent used free')
+SwapMemory = namedtuple('SwapMemory', 'total used free percent')
+DiskIO = namedtuple('DiskIO', 'read_count write_count read_bytes write_bytes')
+NetIO = namedtuple(
+    'NetIO',
+    'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout'
+)
+
+# /proc/diskstats always counts 512-byte sectors, whatever the device's block size
+SECTOR_SIZE = 512
+
+
+class PsutilCollector:
+    """Portable collector backed by psutil."""
+
+    name = 'psutil'
+
+    def cpu_usage(self, interval: Optional[float] = None) -> Tuple[float, List[float]]:
+        """Get total and per-CPU usage percent."""
+        total = psutil.cpu_percent(interval=interval)
+        per_cpu = psutil.cpu_percent(interval=interval, percpu=True)
+        return total, per_cpu
+
+    def virtual_memory(self):
+        """Get RAM usage."""
+        return psutil.virtual_memory()
+
+    def swap_memory(self):
+        """Get swap usage."""
+        return psutil.swap_memory()
+
+    def disk_io_counters(self, perdisk: bool = False):
+        """Get cumulative disk IO counters."""
+        return psutil.disk_io_counters(perdisk=perdisk)
+
+    def net_io_counters(self, pernic: bool = False):
+        """Get cumulative network IO counters."""
+        return psutil.net_io_counters(pernic=pernic)
+
+
+class _ProcFile:
+    """A /proc file kept open and re-read in place with pread."""
+
+    def __init__(self, path: str, size: int = 16384):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(size)
+
+    def read(self) -> bytes:
+        """Re-read the whole file into the reusable buffer."""
+        while True:
+            length = os.preadv(self.fd, [self.buffer], 0)
+            if length < len(self.buffer):
+                return bytes(memoryview(self.buffer)[:length])
+            # Buffer was filled completely; grow it and read again
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+    def close(self):
+        """Close the file descriptor."""
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class ProcCollector:
+    """Linux collector that parses /proc directly.
+
+    The files are opened once and re-read with ``preadv`` into reusable
+    buffers, and CPU counters are kept in preallocated arrays, so a sample
+    costs one syscall per file and no psutil object construction.
+    """
+
+    name = 'proc'
+
+    MEMINFO_FIELDS = (
+        b'MemTotal', b'MemFree', b'MemAvailable', b'Buffers', b'Cached',
+        b'SwapTotal', b'SwapFree'
+    )
+
+    def __init__(self, root: str = '/proc'):
+        """
+        Initialize the collector and open the /proc files.
+
+        Args:
+            root: procfs mount point
+        """
+        self.root = root
+        self._stat = _ProcFile(f'{root}/stat')
+        self._meminfo = _ProcFile(f'{root}/meminfo')
+        self._diskstats = _ProcFile(f'{root}/diskstats')
+        self._netdev = _ProcFile(f'{root}/net/dev')
+
+        cpu_count = os.cpu_count() or 1
+        # Index 0 is the aggregate "cpu" line, 1..n are cpu0..cpuN-1
+        self._cpu_busy = array('d', [0.0]) * (cpu_count + 1)
+        self._cpu_total = array('d', [0.0]) * (cpu_count + 1)
+        self._cpu_percent = array('d', [0.0]) * (cpu_count + 1)
+        self._meminfo_values: Dict[bytes, int] = dict.fromkeys(self.MEMINFO_FIELDS, 0)
+        self._storage_devices: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self._read_cpu_times(update_percent=False)
+
+    @staticmethod
+    def available(root: str = '/proc') -> bool:
+        """Check whether the /proc fast path can be used on this host."""
+        return sys.platform.startswith('linux') and all(
+            os.access(f'{root}/{name}', os.R_OK)
+            for name in ('stat', 'meminfo', 'diskstats', 'net/dev')
+        )
+
+    def _read_cpu_times(self, update_percent: bool = True) -> int:
+        """Read /proc/stat and update the per-CPU counters in place."""
+        with self._lock:
+            return self._parse_cpu_times(self._stat.read(), update_percent)
+
+    def _parse_cpu_times(self, data: bytes, update_percent: bool) -> int:
+        """Parse /proc/stat contents into the preallocated counter arrays."""
+        count = 0
+        for line in data.split(b'\n'):
+            if not line.startswith(b'cpu'):
+                break
+            fields = line.split()
+            index = 0 if fields[0] == b'cpu' else int(fields[0][3:]) + 1
+            if index >= len(self._cpu_total):
+                continue
+            values = [int(v) for v in fields[1:9]]
+            # user nice system idle iowait irq softirq steal; guest is already in user
+            idle = values[3] + values[4]
+            total = sum(values)
+            busy = total - idle
+
+            if update_percent:
+                delta_total = total - self._cpu_total[index]
+                delta_busy = busy - self._cpu_busy[index]
+                if delta_total > 0:
+                    self._cpu_percent[index] = min(100.0, max(0.0, delta_busy * 100.0 / delta_total))
+            self._cpu_busy[index] = busy
+            self._cpu_total[index] = total
+            count = max(count, index)
+        return count
+
+    def cpu_usage(self, interval: Optional[float] = None) -> Tuple[float, List[float]]:
+        """Get total and per-CPU usage percent since the previous call.
+
+        Args:
+            interval: Seconds to block between two readings, or None to
+                compare against the previous call
+
+        Returns:
+            Tuple of total percent and per-CPU percents
+        """
+        if interval:
+            self._read_cpu_times()
+            time.sleep(interval)
+        count = self._read_cpu_times()
+        with self._lock:
+            return round(self._cpu_percent[0], 1), [round(p, 1) for p in self._cpu_percent[1:count + 1]]
+
+    def _read_meminfo(self) -> Dict[bytes, int]:
+        """Parse /proc/meminfo into the reusable dict (values in bytes)."""
+        with self._lock:
+            values = self._meminfo_values
+            for line in self._meminfo.read().split(b'\n'):
+                key, _, rest = line.partition(b':')
+                if key in values:
+                    values[key] = int(rest.split()[0]) * 1024
+            return dict(values)
+
+    def virtual_memory(self) -> VirtualMemory:
+        """Get RAM usage, with ``used`` and ``percent`` derived from MemAvailable."""
+        m = self._read_meminfo()
+        total = m[b'MemTotal']
+        free = m[b'MemFree']
+        available = m[b'MemAvailable'] or free + m[b'Buffers'] + m[b'Cached']
+        used = total - available
+        percent = (total - available) * 100.0 / total if total else 0.0
+        return VirtualMemory(total, available, round(percent, 1), used, free)
+
+    def swap_memory(self) -> SwapMemory:
+        """Get swap usage."""
+        m = self._read_meminfo()
+        total = m[b'SwapTotal']
+        free = m[b'SwapFree']
+        used = total - free
+        percent = used * 100.0 / total if total else 0.0
+        return SwapMemory(total, used, free, round(percent, 1))
+
+    def _is_storage_device(self, name: str) -> bool:
+        """Whole disks (not partitions) appear in /sys/block; cache the answer."""
+        known = self._storage_devices.get(name)
+        if known is None:
+            known = os.access(f"/sys/block/{name.replace('/', '!')}", os.F_OK)
+            self._storage_devices[name] = known
+        return known
+
+    def disk_io_counters(self, perdisk: bool = False):
+        """Get cumulative disk IO counters from /proc/diskstats.
+
+        Args:
+            perdisk: Return a dict per device instead of one total
+
+        Returns:
+            DiskIO, or a dict of device name to DiskIO
+        """
+        devices = {}
+        totals = [0, 0, 0, 0]
+        for line in self._diskstats.read().split(b'\n'):
+            fields = line.split()
+            if len(fields) < 7:
+                continue
+            name = fields[2].decode()
+            if len(fields) == 7:
+                # Older kernels report partitions with four counters
+                reads, read_sectors, writes, write_sectors = map(int, fields[3:7])
+            else:
+                reads = int(fields[3])
+                read_sectors = int(fields[5])
+                writes = int(fields[7])
+                write_sectors = int(fields[9])
+            counters = (reads, writes, read_sectors * SECTOR_SIZE, write_sectors * SECTOR_SIZE)
+            if perdisk:
+                devices[name] = DiskIO(*counters)
+            elif self._is_storage_device(name):
+                for i, value in enumerate(counters):
+                    totals[i] += value
+
+        return devices if perdisk else DiskIO(*totals)
+
+    def net_io_counters(self, pernic: bool = False):
+        """Get cumulative network IO counters from /proc/net/dev.
+
+        Args:
+            pernic: Return a dict per interface instead of one total
+
+        Returns:
+            NetIO, or a dict of interface name to NetIO
+        """
+        interfaces = {}
+        totals = [0] * 8
+        # The first two lines are column headers
+        for line in self._netdev.read().split(b'\n')[2:]:
+            name, _, data = line.partition(b':')
+            fields = data.split()
+            if len(fields) < 16:
+                continue
+            recv_bytes, recv_packets, errin, dropin = (int(v) for v in fields[0:4])
+            sent_bytes, sent_packets, errout, dropout = (int(v) for v in fields[8:12])
+            counters = (sent_bytes, recv_bytes, sent_packets, recv_packets, errin, errout, dropin, dropout)
+            if pernic:
+                interfaces[name.strip().decode()] = NetIO(*counters)
+            for i, value in enumerate(counters):
+                totals[i] += value
+
+        return interfaces if pernic else NetIO(*totals)
+
+    def close(self):
+        """Close all /proc file descriptors."""
+        for proc_file in (self._stat, self._meminfo, self._diskstats, self._netdev):
+            proc_file.close()
+
+
+def create_collector(backend: str = 'auto'):
+    """Create the metric collector for the requested backend.
+
+    Args:
+        backend: ``auto`` (proc on Linux, psutil elsewhere), ``proc`` or ``psutil``
+
+    Returns:
+        A collector; falls back to psutil when /proc is unavailable
+    """
+    backend = (backend or 'auto').lower()
+    if backend in ('auto', 'proc') and ProcCollector.available():
+        try:
+            return ProcCollector()
+        except OSError as e:
+            logger.warning(f"/proc collector unavailable, using psutil: {e}")
+    elif backend == 'proc':
+        logger.warning("/proc collector requested but not available, using psutil")
+    return PsutilCollector()
@@ -0,0 +1,243 @@
+"""
+Metrics History Store
+Fixed-memory ring buffers of sampled metrics with downsampled queries
+"""
+import math
+import re
+import threading
+import time
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+NAN = float('nan')
+
+_WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_window(window: str) -> Optional[int]:
+    """Parse a window such as ``90s``, ``15m``, ``1h`` or ``1d`` into seconds.
+
+    Args:
+        window: Window string; a bare number is read as seconds
+
+    Returns:
+        Window length in seconds, or None if the string is invalid
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', str(window).lower())
+    if not match:
+        return None
+    seconds = int(float(match.group(1)) * _WINDOW_UNITS[match.group(2) or 's'])
+    return seconds if seconds >= 1 else None
+
+
+class _Tier:
+    """One resolution level: a shared timestamp ring plus min/max/avg rings per series."""
+
+    def __init__(self, capacity: int, resolution: float):
+        self.capacity = capacity
+        self.resolution = resolution
+        self.timestamps = array('d', [0.0]) * capacity
+        self.series: Dict[str, Tuple[array, array, array]] = {}
+        self.head = 0
+        self.count = 0
+
+    def _rings(self, name: str) -> Tuple[array, array, array]:
+        rings = self.series.get(name)
+        if rings is None:
+            rings = tuple(array('d', [NAN]) * self.capacity for _ in range(3))
+            self.series[name] = rings
+        return rings
+
+    def append(self, timestamp: float, values: Dict[str, Tuple[float, float, float]]):
+        """Append one slot; series absent from ``values`` get NaN for this slot."""
+        slot = self.head
+        self.timestamps[slot] = timestamp
+        for name in values:
+            self._rings(name)
+        for name, (mins, maxs, avgs) in self.series.items():
+            mn, mx, avg = values.get(name, (NAN, NAN, NAN))
+            mins[slot] = mn
+            maxs[slot] = mx
+            avgs[slot] = avg
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def span(self) -> float:
+        """Seconds of history this tier can hold."""
+        return self.capacity * self.resolution
+
+    def slots_since(self, since: float) -> List[int]:
+        """Slot indexes with timestamps >= ``since``, oldest first."""
+        start = (self.head - self.count) % self.capacity
+        slots = []
+        for offset in range(self.count):
+            slot = (start + offset) % self.capacity
+            if self.timestamps[slot] >= since:
+                slots.append(slot)
+        return slots
+
+
+class MetricsHistory:
+    """Ring-buffer history of metric series at raw and rolled-up resolution.
+
+    Raw samples are kept at the sampler cadence for ``raw_seconds``; every
+    ``rollup_interval`` seconds they are folded into a min/max/avg rollup that
+    is kept for ``rollup_seconds``. Memory use is fixed once the series exist.
+    """
+
+    def __init__(
+        self,
+        sample_interval: float = 1.0,
+        raw_seconds: int = 3600,
+        rollup_interval: int = 60,
+        rollup_seconds: int = 86400
+    ):
+        """
+        Initialize the history store.
+
+        Args:
+            sample_interval: Seconds between recorded samples
+            raw_seconds: How long to keep raw samples
+            rollup_interval: Seconds covered by one rollup slot
+            rollup_seconds: How long to keep rollups
+        """
+        sample_interval = max(0.1, float(sample_interval))
+        self.raw = _Tier(max(1, math.ceil(raw_seconds / sample_interval)), sample_interval)
+        self.rollup = _Tier(max(1, math.ceil(rollup_seconds / rollup_interval)), rollup_interval)
+        self._bucket_start: Optional[float] = None
+        self._bucket: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _extract(self, snapshot: Dict[str, Any]) -> Dict[str, float]:
+        """Pull the tracked series out of a sampler snapshot."""
+        values: Dict[str, float] = {}
+
+        cpu = snapshot.get('cpu') or {}
+        if 'usage_percent' in cpu:
+            values['cpu'] = float(cpu['usage_percent'])
+        for index, percent in enumerate(cpu.get('per_cpu_percent') or []):
+            values[f'cpu_{index}'] = float(percent)
+
+        memory = snapshot.get('memory') or {}
+        if 'usage_percent' in memory:
+            values['memory'] = float(memory['usage_percent'])
+
+        disk_rates = ((snapshot.get('disk') or {}).get('rates') or {}).get('total') or {}
+        net_rates = ((snapshot.get('network') or {}).get('rates') or {}).get('total') or {}
+        for series, source, key in (
+            ('disk_read', disk_rates, 'read_bytes_per_sec'),
+            ('disk_write', disk_rates, 'write_bytes_per_sec'),
+            ('net_sent', net_rates, 'sent_bytes_per_sec'),
+            ('net_recv', net_rates, 'recv_bytes_per_sec'),
+        ):
+            if key in source:
+                values[series] = float(source[key])
+
+        return values
+
+    def record(self, snapshot: Dict[str, Any], timestamp: Optional[float] = None):
+        """Record one sampler snapshot.
+
+        Args:
+            snapshot: Snapshot produced by ``MetricsSampler.sample``
+            timestamp: Epoch seconds of the sample, defaults to now
+        """
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            values = self._extract(snapshot)
+            if not values:
+                return
+
+            self.raw.append(now, {name: (v, v, v) for name, v in values.items()})
+
+            bucket_start = now - (now % self.rollup.resolution)
+            if self._bucket_start is not None and bucket_start != self._bucket_start:
+                self._flush_bucket()
+            self._bucket_start = bucket_start
+            for name, value in values.items():
+                stats = self._bucket.get(name)
+                if stats is None:
+                    self._bucket[name] = [value, value, value, 1]
+                else:
+                    stats[0] = min(stats[0], value)
+                    stats[1] = max(stats[1], value)
+                    stats[2] += value
+                    stats[3] += 1
+
+    def _flush_bucket(self):
+        """Fold the current rollup bucket into the rollup tier."""
+        if self._bucket:
+            self.rollup.append(self._bucket_start, {
+                name: (mn, mx, total / count)
+                for name, (mn, mx, total, count) in self._bucket.items()
+            })
+        self._bucket = {}
+
+    def get_series_names(self) -> List[str]:
+        """Get the names of all recorded series."""
+        with self._lock:
+            return sorted(set(self.raw.series) | set(self.rollup.series))
+
+    def query(self, metric: str, window: int = 3600, points: int = 120) -> Dict[str, Any]:
+        """Get a downsampled min/max/avg series.
+
+        Args:
+            metric: Series name (``cpu``, ``cpu_0``, ``memory``, ``disk_read``...)
+            window: How many seconds back to return
+            points: Maximum number of points in the result
+
+        Returns:
+            Dict with the resolution used and a list of points, or an error dict
+        """
+        points = max(1, int(points))
+        now = time.time()
+        since = now - window
+
+        with self._lock:
+            # Raw samples cover short windows; longer ones come from rollups
+            tier = self.raw if window <= self.raw.span() else self.rollup
+            if metric not in self.raw.series and metric not in self.rollup.series:
+                return {'error': f'Unknown metric series: {metric}'}
+
+            samples = []
+            if metric in tier.series:
+                mins, maxs, avgs = tier.series[metric]
+                samples = [
+                    (tier.timestamps[s], mins[s], maxs[s], avgs[s])
+                    for s in tier.slots_since(since) if not math.isnan(avgs[s])
+                ]
+            # The newest samples are still in the unflushed bucket
+            pending = self._bucket.get(metric) if tier is self.rollup else None
+            if pending is not None and self._bucket_start >= since:
+                mn, mx, total, count = pending
+                samples.append((self._bucket_start, mn, mx, total / count))
+
+        bucket_width = window / points
+        buckets: Dict[int, List[float]] = {}
+        for timestamp, mn, mx, avg in samples:
+            index = min(points - 1, int((timestamp - since) / bucket_width))
+            stats = buckets.get(index)
+            if stats is None:
+                buckets[index] = [mn, mx, avg, 1]
+            else:
+                stats[0] = min(stats[0], mn)
+                stats[1] = max(stats[1], mx)
+                stats[2] += avg
+                stats[3] += 1
+
+        series = [
+            {
+                'timestamp': round(since + index * bucket_width, 3),
+                'min': round(mn, 2),
+                'max': round(mx, 2),
+                'avg': round(total / count, 2)
+            }
+            for index, (mn, mx, total, count) in sorted(buckets.items())
+        ]
+
+        return {
+            'metric': metric,
+            'window': window,
+            'resolution': max(tier.resolution, bucket_width),
+            'points': series
+        }
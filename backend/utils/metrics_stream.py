@@ -0,0 +1,212 @@
+"""
+Metrics Stream
+Fans the shared metrics sampler out to Socket.IO subscribers as delta pushes
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable
+
+from .system_metrics import MetricsSampler
+
+logger = logging.getLogger(__name__)
+
+EmitFunc = Callable[[str, Dict[str, Any], str], None]
+
+
+@dataclass
+class MetricSubscription:
+    """One client's metric selection and push state."""
+    sid: str
+    metrics: List[str]
+    interval: float
+    threshold: float
+    last_push: float = 0.0
+    sent: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Guards sent and last_push; pushes come from the sampler and subscribe() threads
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'metrics': self.metrics,
+            'interval': self.interval,
+            'threshold': self.threshold
+        }
+
+
+# Returned by _diff when nothing moved enough to be worth pushing
+_UNCHANGED = object()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _diff(previous: Any, current: Any, threshold: float) -> Any:
+    """Get the part of a value that changed since it was last sent.
+
+    Numbers count as changed when they moved by more than ``threshold``.
+    Dicts are compared key by key and only the changed keys are returned,
+    recursively. Lists are compared element by element with the same rules
+    and sent whole if any element changed or their length did.
+
+    Returns:
+        The changes, or ``_UNCHANGED``
+    """
+    if _is_number(current) and _is_number(previous):
+        return current if abs(current - previous) > threshold else _UNCHANGED
+    if isinstance(current, dict) and isinstance(previous, dict):
+        changes = {}
+        for key, value in current.items():
+            change = _diff(previous[key], value, threshold) if key in previous else value
+            if change is not _UNCHANGED:
+                changes[key] = change
+        return changes or _UNCHANGED
+    if isinstance(current, list) and isinstance(previous, list) and len(current) == len(previous):
+        for old, new in zip(previous, current):
+            if _diff(old, new, threshold) is not _UNCHANGED:
+                return current
+        return _UNCHANGED
+    return _UNCHANGED if current == previous else current
+
+
+def _merge(previous: Any, changes: Any) -> Any:
+    """Apply changes from ``_diff`` to the value they were taken against."""
+    if isinstance(previous, dict) and isinstance(changes, dict):
+        merged = dict(previous)
+        for key, value in changes.items():
+            merged[key] = _merge(previous[key], value) if key in previous else value
+        return merged
+    return changes
+
+
+class MetricsSubscriptions:
+    """Per-client metric subscriptions driven by one shared sampler.
+
+    Each sampler tick is checked against every subscription; clients whose
+    interval has elapsed receive a ``metrics_update`` event containing only
+    the fields that changed by more than their threshold since the last push,
+    down to individual keys of nested dicts.
+    """
+
+    DEFAULT_INTERVAL = 2.0
+    DEFAULT_THRESHOLD = 0.5
+
+    def __init__(self, sampler: MetricsSampler, emit: EmitFunc):
+        """
+        Initialize the subscription registry.
+
+        Args:
+            sampler: Shared sampler that produces snapshots
+            emit: Function called as ``emit(event, payload, sid)``
+        """
+        self.sampler = sampler
+        self.emit = emit
+        self.subscriptions: Dict[str, MetricSubscription] = {}
+        self._lock = threading.Lock()
+        self._registered = False
+
+    def subscribe(
+        self,
+        sid: str,
+        metrics: List[str],
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None
+    ) -> MetricSubscription:
+        """Subscribe a client, replacing any previous selection.
+
+        Args:
+            sid: Socket.IO session id
+            metrics: Metric names from ``MetricsSampler.COLLECTORS``
+            interval: Minimum seconds between pushes (floored at the sampler interval)
+            threshold: Minimum numeric change that counts as a change
+
+        Returns:
+            The stored subscription
+
+        Raises:
+            ValueError: If no valid metrics were requested
+        """
+        unknown = [m for m in metrics if m not in self.sampler.COLLECTORS]
+        if unknown or not metrics:
+            raise ValueError(
+                f"Unknown metrics: {', '.join(unknown)}" if unknown else 'No metrics requested'
+            )
+
+        subscription = MetricSubscription(
+            sid=sid,
+            metrics=list(dict.fromkeys(metrics)),
+            interval=max(self.sampler.interval, float(interval or self.DEFAULT_INTERVAL)),
+            threshold=max(0.0, float(self.DEFAULT_THRESHOLD if threshold is None else threshold))
+        )
+
+        with self._lock:
+            self.subscriptions[sid] = subscription
+            if not self._registered:
+                self.sampler.register_callback(self._on_snapshot)
+                self._registered = True
+
+        # Send the current values straight away so the client can render
+        self._push(subscription, self.sampler.get_snapshot(), time.monotonic())
+        return subscription
+
+    def unsubscribe(self, sid: str, metrics: Optional[List[str]] = None):
+        """Remove some or all of a client's metrics.
+
+        Args:
+            sid: Socket.IO session id
+            metrics: Metrics to drop, or None to drop the whole subscription
+        """
+        with self._lock:
+            subscription = self.subscriptions.get(sid)
+            if not subscription:
+                return
+            if metrics:
+                with subscription.lock:
+                    subscription.metrics = [m for m in subscription.metrics if m not in metrics]
+                    for metric in metrics:
+                        subscription.sent.pop(metric, None)
+            if not metrics or not subscription.metrics:
+                del self.subscriptions[sid]
+
+            if not self.subscriptions and self._registered:
+                self.sampler.unregister_callback(self._on_snapshot)
+                self._registered = False
+
+    def _on_snapshot(self, snapshot: Dict[str, Any]):
+        """Sampler callback: push deltas to every client that is due."""
+        now = time.monotonic()
+        with self._lock:
+            due = [s for s in self.subscriptions.values() if now - s.last_push >= s.interval - 0.05]
+        for subscription in due:
+            self._push(subscription, snapshot, now)
+
+    def _push(self, subscription: MetricSubscription, snapshot: Dict[str, Any], now: float):
+        """Emit the fields of a snapshot that changed for one subscription."""
+        # Held through the emit too, so a client's updates arrive in the order they were diffed
+        with subscription.lock:
+            delta: Dict[str, Dict[str, Any]] = {}
+            for metric in subscription.metrics:
+                current = snapshot.get(metric) or {}
+                previous = subscription.sent.get(metric)
+                if previous is None:
+                    changes = dict(current)
+                else:
+                    changes = _diff(previous, current, subscription.threshold)
+                if changes and changes is not _UNCHANGED:
+                    delta[metric] = changes
+                    subscription.sent[metric] = _merge(previous or {}, changes)
+
+            subscription.last_push = now
+            if not delta:
+                return
+
+            try:
+                self.emit('metrics_update', {
+                    'timestamp': snapshot.get('timestamp'),
+                    'metrics': delta
+                }, subscription.sid)
+            except Exception as e:
+                logger.error(f"Error pushing metrics to {subscription.sid}: {e}")
@@ -0,0 +1,302 @@
+"""
+Process Supervisor
+Spawns every child process for actions, with per-category limits, reaping and timeouts
+"""
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Kinds of child process, each with its own concurrency limit
+CATEGORIES = ('program', 'command', 'system')
+
+
+class ProcessLimitReached(RuntimeError):
+    """Raised when a category already has its maximum of running processes."""
+
+
+@dataclass
+class TrackedProcess:
+    """A child process the supervisor is responsible for."""
+    process: subprocess.Popen
+    category: str
+    command: str
+    started_at: float  # time.monotonic()
+    deadline: Optional[float] = None  # time.monotonic() after which it is killed
+    holds_slot: bool = True  # counts against its category's limit
+    slot_until: Optional[float] = None  # time.monotonic() at which a detached launch frees its slot
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'pid': self.process.pid,
+            'category': self.category,
+            'command': self.command[:200],
+            'runtime': round(time.monotonic() - self.started_at, 2)
+        }
+
+
+class ProcessSupervisor:
+    """Spawns and tracks child processes.
+
+    Each category may only have ``limits[category]`` processes alive at once;
+    further spawns are rejected with ``ProcessLimitReached`` rather than
+    queued, so repeated presses cannot pile up processes. Children start in
+    their own process group (session on POSIX) so a kill takes down anything
+    they started too. A background thread reaps children that exit on their
+    own, which keeps fire-and-forget launches from lingering as zombies, and
+    kills those that outlive their timeout.
+
+    Detached launches (programs the user opens and keeps open) only count
+    against the limit while they are starting, so long-running apps never
+    block further launches; they are still tracked so they get reaped.
+    """
+
+    def __init__(self, limits: Dict[str, int], reap_interval: float = 1.0, startup_seconds: float = 5.0):
+        """
+        Initialize the supervisor.
+
+        Args:
+            limits: Maximum live processes per category
+            reap_interval: Seconds between checks for exited or overdue children
+            startup_seconds: Seconds a detached launch without a timeout holds its slot
+        """
+        self.limits = dict(limits)
+        self.reap_interval = reap_interval
+        self.startup_seconds = startup_seconds
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._tracked: Dict[int, TrackedProcess] = {}
+        # Live plus in-flight spawns per category; checked against the limits
+        self._slots: Dict[str, int] = {category: 0 for category in limits}
+        self._stats = {'spawned': 0, 'exited': 0, 'timed_out': 0, 'killed': 0, 'rejected': 0, 'failed': 0}
+        self._spawn_seconds = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def spawn(
+        self,
+        command: Union[str, List[str]],
+        category: str = 'command',
+        timeout: Optional[float] = None,
+        detached: bool = False,
+        **popen_kwargs
+    ) -> subprocess.Popen:
+        """Start a tracked child process.
+
+        Args:
+            command: Argument list, or a string for ``shell=True``
+            category: One of ``CATEGORIES``
+            timeout: Seconds after which the reaper kills the process group
+            detached: The process may run indefinitely, like a launched app;
+                without a timeout it only counts against the limit for its
+                first ``startup_seconds``
+            **popen_kwargs: Passed through to ``subprocess.Popen``
+
+        Returns:
+            The started process. Owners that wait for it should call
+            ``release`` afterwards; otherwise the reaper collects it.
+
+        Raises:
+            ProcessLimitReached: If the category is at its limit
+            ValueError: If the category is unknown or the timeout is not a number
+        """
+        if category not in self.limits:
+            raise ValueError(f"Unknown process category: {category}; expected one of {', '.join(self.limits)}")
+        # Checked before a slot is taken, so a bad timeout cannot leave an untracked child behind
+        try:
+            timeout = float(timeout) if timeout else None
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid timeout: {timeout!r}')
+
+        with self._lock:
+            if self._slots[category] >= self.limits[category]:
+                self._stats['rejected'] += 1
+                raise ProcessLimitReached(
+                    f'Too many {category} processes running (limit {self.limits[category]})'
+                )
+            self._slots[category] += 1
+
+        if os.name == 'nt':
+            popen_kwargs['creationflags'] = (
+                popen_kwargs.get('creationflags', 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+            )
+        else:
+            popen_kwargs.setdefault('start_new_session', True)
+
+        started = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, **popen_kwargs)
+        except Exception:
+            with self._lock:
+                self._slots[category] -= 1
+                self._stats['failed'] += 1
+            raise
+        elapsed = time.perf_counter() - started
+
+        now = time.monotonic()
+        tracked = TrackedProcess(
+            process=process,
+            category=category,
+            command=command if isinstance(command, str) else ' '.join(map(str, command)),
+            started_at=now,
+            deadline=now + timeout if timeout else None,
+            slot_until=now + self.startup_seconds if detached and not timeout else None
+        )
+        with self._lock:
+            self._tracked[process.pid] = tracked
+            self._stats['spawned'] += 1
+            self._spawn_seconds += elapsed
+
+        self.start()
+        return process
+
+    def release(self, process: subprocess.Popen):
+        """Stop tracking a process its owner has waited for."""
+        with self._lock:
+            self._forget(process.pid)
+
+    def _forget(self, pid: int):
+        """Drop a tracked process and free its slot; caller holds the lock."""
+        tracked = self._tracked.pop(pid, None)
+        if tracked is not None:
+            self._free_slot(tracked)
+            self._stats['exited'] += 1
+
+    def _free_slot(self, tracked: TrackedProcess):
+        """Stop counting a process against its limit; caller holds the lock."""
+        if tracked.holds_slot:
+            tracked.holds_slot = False
+            self._slots[tracked.category] -= 1
+
+    def kill(self, process: subprocess.Popen, timed_out: bool = False):
+        """Kill a process together with everything in its process group.
+
+        Args:
+            process: Process started by ``spawn``
+            timed_out: Count the kill as a timeout in the stats
+        """
+        if process.poll() is not None:
+            return
+        try:
+            if os.name == 'nt':
+                # taskkill /T also ends the children the process started
+                subprocess.run(
+                    ['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=5
+                )
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError):
+            process.kill()
+        with self._lock:
+            self._stats['timed_out' if timed_out else 'killed'] += 1
+
+    def reap(self):
+        """Collect exited children and kill the ones past their deadline."""
+        now = time.monotonic()
+        with self._lock:
+            tracked = list(self._tracked.values())
+
+        for entry in tracked:
+            if entry.process.poll() is not None:
+                with self._lock:
+                    self._forget(entry.process.pid)
+                continue
+            if entry.slot_until is not None and now >= entry.slot_until:
+                # Started; a detached launch keeps running without holding a slot
+                with self._lock:
+                    self._free_slot(entry)
+                    entry.slot_until = None
+            if entry.deadline is not None and now >= entry.deadline:
+                logger.warning(f"Killing {entry.category} process {entry.process.pid} after timeout")
+                self.kill(entry.process, timed_out=True)
+
+    def _reap_loop(self):
+        """Main reaping loop that runs in a separate thread."""
+        while not self._stop_event.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Error reaping child processes: {e}")
+
+    def start(self):
+        """Start the reaper thread."""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._reap_loop, name='process-reaper', daemon=True)
+        self.thread.start()
+
+    def stop(self, kill_children: bool = False):
+        """Stop the reaper thread.
+
+        Args:
+            kill_children: Also kill every process still tracked
+        """
+        if kill_children:
+            with self._lock:
+                tracked = list(self._tracked.values())
+            for entry in tracked:
+                self.kill(entry.process)
+
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get spawn counters, live processes per category and spawn latency."""
+        with self._lock:
+            stats = dict(self._stats)
+            slots = dict(self._slots)
+            spawned = stats['spawned']
+            by_category = {category: 0 for category in self.limits}
+            for entry in self._tracked.values():
+                by_category[entry.category] += 1
+            processes = [entry.to_dict() for entry in self._tracked.values()]
+            avg_latency = self._spawn_seconds / spawned if spawned else 0.0
+        return {
+            **stats,
+            'running': len(processes),
+            'by_category': by_category,
+            'slots': slots,
+            'limits': dict(self.limits),
+            'avg_spawn_latency_ms': round(avg_latency * 1000, 3),
+            'processes': processes
+        }
+
+
+# Global singleton instance
+_supervisor_instance: Optional[ProcessSupervisor] = None
+_supervisor_lock = threading.Lock()
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """Get the global ProcessSupervisor singleton instance."""
+    global _supervisor_instance
+
+    if _supervisor_instance is None:
+        with _supervisor_lock:
+            if _supervisor_instance is None:
+                from config import Config
+                _supervisor_instance = ProcessSupervisor({
+                    'program': Config.PROCESS_LIMIT_PROGRAM,
+                    'command': Config.PROCESS_LIMIT_COMMAND,
+                    'system': Config.PROCESS_LIMIT_SYSTEM
+                }, startup_seconds=Config.PROCESS_STARTUP_SECONDS)
+
+    return _supervisor_instance
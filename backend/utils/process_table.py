@@ -0,0 +1,154 @@
+"""
+Process Table Cache
+Keeps psutil.Process handles across samples for cheap, accurate top-N queries
+"""
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, Any, List, NamedTuple, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessSample(NamedTuple):
+    """One process reading from the latest refresh."""
+    pid: int
+    name: str
+    cpu_percent: float
+    memory_percent: float
+    rss: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict shape returned by the metrics API."""
+        return {
+            'pid': self.pid,
+            'name': self.name,
+            'cpu_percent': round(self.cpu_percent, 1),
+            'memory_percent': round(self.memory_percent, 1),
+            'memory_mb': round(self.rss / (1024**2), 2)
+        }
+
+
+class ProcessTable:
+    """Incrementally maintained table of running processes.
+
+    ``psutil.Process.cpu_percent`` measures against the previous call on the
+    same handle, so fresh handles always report 0. Keeping the handles alive
+    between refreshes gives real CPU figures, and only pids that appeared or
+    vanished since the last refresh cost extra syscalls.
+    """
+
+    def __init__(self, min_refresh_interval: float = 1.0):
+        """
+        Initialize the process table.
+
+        Args:
+            min_refresh_interval: Refreshes closer together than this reuse the
+                previous readings, since CPU usage over a tiny window is noise
+        """
+        self.min_refresh_interval = min_refresh_interval
+        self._processes: Dict[int, psutil.Process] = {}
+        self._names: Dict[int, str] = {}
+        self._samples: List[ProcessSample] = []
+        self._last_refresh: Optional[float] = None
+        self._total_memory = psutil.virtual_memory().total or 1
+        self._lock = threading.Lock()
+
+    def _track(self, pid: int) -> Optional[psutil.Process]:
+        """Start tracking a newly seen pid."""
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                self._names[pid] = process.name()
+                # First call only primes the counter; it always returns 0.0
+                process.cpu_percent(None)
+            self._processes[pid] = process
+            return process
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    def _forget(self, pid: int):
+        """Stop tracking a pid."""
+        self._processes.pop(pid, None)
+        self._names.pop(pid, None)
+
+    def refresh(self, force: bool = False) -> List[ProcessSample]:
+        """Update the table by pid diff and re-read every tracked process.
+
+        Args:
+            force: Refresh even if the last refresh was very recent
+
+        Returns:
+            Readings for every live process
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self._last_refresh is not None
+                    and now - self._last_refresh < self.min_refresh_interval):
+                return self._samples
+
+            current = set(psutil.pids())
+            known = set(self._processes)
+            for pid in known - current:
+                self._forget(pid)
+            for pid in current - known:
+                self._track(pid)
+
+            samples = []
+            for pid, process in list(self._processes.items()):
+                try:
+                    with process.oneshot():
+                        cpu = process.cpu_percent(None)
+                        rss = process.memory_info().rss
+                except psutil.AccessDenied:
+                    # Still count it, like process_iter does for protected processes
+                    cpu, rss = 0.0, 0
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    self._forget(pid)
+                    continue
+                samples.append(ProcessSample(
+                    pid, self._names.get(pid, ''), cpu,
+                    rss * 100.0 / self._total_memory, rss
+                ))
+
+            self._samples = samples
+            self._last_refresh = now
+            return samples
+
+    def get_top(self, limit: int = 10) -> Dict[str, Any]:
+        """Get the top processes by CPU and by memory.
+
+        Args:
+            limit: Number of processes in each list
+
+        Returns:
+            Dict with ``total_processes``, ``top_cpu`` and ``top_memory``
+        """
+        samples = self.refresh()
+        top_cpu = heapq.nlargest(limit, samples, key=lambda p: p.cpu_percent)
+        top_memory = heapq.nlargest(limit, samples, key=lambda p: p.rss)
+        return {
+            'total_processes': len(samples),
+            'top_cpu': [p.to_dict() for p in top_cpu],
+            'top_memory': [p.to_dict() for p in top_memory]
+        }
+
+
+# Global singleton instance
+_table_instance: Optional[ProcessTable] = None
+_table_lock = threading.Lock()
+
+
+def get_process_table() -> ProcessTable:
+    """Get the global ProcessTable singleton instance."""
+    global _table_instance
+
+    if _table_instance is None:
+        with _table_lock:
+            if _table_instance is None:
+                _table_instance = ProcessTable()
+
+    return _table_instance
@@ -0,0 +1,530 @@
+"""
+Profile Repository
+Caches parsed profiles and their serialised JSON between requests on top of
+a pluggable profile store
+"""
+import copy
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from storage import ProfileStore, Stamp, StorageConflict, StorageError, create_store, summarize
+from .file_manager import FileManager
+from .json_patch import JsonPatchError, apply_patch, parse_pointer
+
+logger = logging.getLogger('vdock')
+
+MAX_PATCH_OPERATIONS = 1000
+
+# Patch paths inside a single button only need that button re-validated
+_BUTTON_PATH = re.compile(r'^(/scenes/\d+/pages/\d+/buttons/\d+|/dockedButtons/\d+)(?:/|$)')
+# Top-level fields the model stores as given
+_PLAIN_FIELDS = {'/name', '/description', '/icon', '/avatar', '/theme'}
+
+
+class ProfileVersionConflict(Exception):
+    """Raised when a conditional update's ETag no longer matches the profile."""
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _stamp_etag(stamp: Stamp) -> str:
+    return '-'.join(f'{part:x}' for part in stamp)
+
+
+class _CachedProfile:
+    """A parsed profile and what is derived from it.
+
+    ``stamp`` is None while the profile's write is still pending, during
+    which the cached copy is newer than what is stored.
+    """
+
+    __slots__ = ('stamp', 'data', 'summary', 'body', 'etag', 'checked_at')
+
+    def __init__(self, stamp: Optional[Stamp], data: Dict[str, Any], etag: Optional[str] = None):
+        self.stamp = stamp
+        self.data = data
+        self.summary = summarize(data)
+        self.body: Optional[bytes] = None
+        self.etag = etag or _stamp_etag(stamp)
+        self.checked_at = time.monotonic()
+
+
+class ProfileRepository:
+    """Reads and writes profiles, keeping parsed copies in memory.
+
+    Persistence is left to a ``ProfileStore`` (JSON files or SQLite, see
+    ``storage``). Each cached profile remembers the stamp it was stored
+    with. Reads within ``revalidate_interval`` seconds of the last check
+    are served from memory; after that the store is asked for the current
+    stamp and the profile is only re-read if it changed, so edits made
+    outside the server are still picked up. Writes go through the
+    repository and update the cache directly; when the store defers a
+    write, the cached copy is authoritative and is not revalidated until
+    the write lands.
+
+    Cached dicts and bodies are shared between requests and must not be
+    modified; use ``load`` for a Profile that can be edited and saved.
+    """
+
+    def __init__(self, store: Optional[ProfileStore] = None, revalidate_interval: float = 1.0):
+        """
+        Initialize the repository.
+
+        Args:
+            store: Profile store, defaults to the backend named by Config.PROFILE_STORAGE
+            revalidate_interval: Seconds a cached read is trusted before the store is checked again
+        """
+        if store is None:
+            from config import Config
+            store = create_store(Config.PROFILE_STORAGE)
+        self.store = store
+        self.revalidate_interval = revalidate_interval
+        self._profiles: Dict[str, _CachedProfile] = {}
+        self._list_body: Optional[bytes] = None
+        self._listed_at = 0.0
+        self._primed = False
+        self._list_count = 0
+        self._list_seconds = 0.0
+        self._last_list_seconds = 0.0
+        # Bumped on every change; with the epoch it forms the list ETag
+        self.version = 0
+        self._epoch = uuid.uuid4().hex[:8]
+        self._stats = {'hits': 0, 'revalidations': 0, 'loads': 0, 'writes': 0, 'conflicts': 0}
+        self._lock = threading.RLock()
+
+    def _read(self, profile_id: str) -> Optional[_CachedProfile]:
+        """Read a profile from the store into the cache.
+
+        Raises:
+            ValueError: If the stored profile is not a valid profile
+        """
+        stored = self.store.read(profile_id)
+        if stored is None:
+            self._drop(profile_id)
+            return None
+        entry = _CachedProfile(*stored)
+        self._stats['loads'] += 1
+        self._store(profile_id, entry)
+        return entry
+
+    def _store(self, profile_id: str, entry: _CachedProfile):
+        self._profiles[profile_id] = entry
+        self._changed()
+
+    def _drop(self, profile_id: str):
+        """Forget a profile that no longer exists."""
+        if self._profiles.pop(profile_id, None) is not None:
+            self._changed()
+
+    @staticmethod
+    def _etag(entry: _CachedProfile) -> str:
+        return entry.etag
+
+    def _changed(self):
+        self.version += 1
+        self._list_body = None
+
+    def _entry(self, profile_id: str) -> Optional[_CachedProfile]:
+        """Get the cached profile, revalidating or loading it as needed."""
+        with self._lock:
+            entry = self._profiles.get(profile_id)
+            now = time.monotonic()
+            if entry is not None and (entry.stamp is None or now - entry.checked_at < self.revalidate_interval):
+                self._stats['hits'] += 1
+                return entry
+
+            stamp = self.store.stamp(profile_id)
+            self._stats['revalidations'] += 1
+            if stamp is None:
+                self._drop(profile_id)
+                return None
+            if entry is not None and entry.stamp == stamp:
+                entry.checked_at = now
+                self._stats['hits'] += 1
+                return entry
+            return self._read(profile_id)
+
+    def get_dict(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Get a profile as a dict (shared; do not modify).
+
+        Raises:
+            ValueError: If the stored profile is not a valid profile
+        """
+        entry = self._entry(profile_id)
+        return entry.data if entry else None
+
+    def get_body(self, profile_id: str) -> Optional[Tuple[bytes, str]]:
+        """Get the serialised ``{"profile": ...}`` response and its ETag.
+
+        Raises:
+            ValueError: If the stored profile is not a valid profile
+        """
+        entry = self._entry(profile_id)
+        if entry is None:
+            return None
+        if entry.body is None:
+            entry.body = _dumps({'profile': entry.data})
+        return entry.body, self._etag(entry)
+
+    def load(self, profile_id: str):
+        """Get a Profile model that may be modified and saved.
+
+        Raises:
+            ValueError: If the stored profile is not a valid profile
+        """
+        from models import Profile
+
+        data = self.get_dict(profile_id)
+        return Profile.from_dict(copy.deepcopy(data)) if data is not None else None
+
+    def exists(self, profile_id: str) -> bool:
+        """Whether a profile exists."""
+        try:
+            return self._entry(profile_id) is not None
+        except ValueError:
+            return self.store.stamp(profile_id) is not None
+
+    def save(self, profile) -> Optional[Dict[str, Any]]:
+        """Cache a Profile and write it to the store.
+
+        Stores may write in the background; a failed deferred write is
+        logged and retried, and the profile is served from memory meanwhile.
+
+        Returns:
+            The saved profile dict, or None if the store failed to write it
+        """
+        profile_dict = profile.to_dict()
+        with self._lock:
+            try:
+                self._write(profile.id, profile_dict)
+            except StorageError as e:
+                logger.error(f"Error saving profile {profile.id}: {e}")
+                return None
+        return profile_dict
+
+    def _write(
+        self,
+        profile_id: str,
+        profile_dict: Dict[str, Any],
+        changed_buttons: Optional[List[str]] = None,
+        expected: Optional[Stamp] = None
+    ) -> _CachedProfile:
+        """Cache a profile dict and hand it to the store; caller holds the lock.
+
+        Raises:
+            StorageConflict: If ``expected`` no longer matches the stored profile
+            StorageError: If the store failed to write the profile
+        """
+        previous = self._profiles.get(profile_id)
+        entry = _CachedProfile(None, profile_dict, etag=uuid.uuid4().hex[:16])
+        # Cached before writing: a deferred write may report back immediately
+        self._store(profile_id, entry)
+        try:
+            stamp = self.store.write(
+                profile_dict, changed_buttons=changed_buttons, expected=expected,
+                on_written=lambda written: self._written(profile_id, entry, written)
+            )
+        except Exception:
+            if previous is None:
+                self._profiles.pop(profile_id, None)
+            else:
+                self._profiles[profile_id] = previous
+            self._changed()
+            raise
+        self._stats['writes'] += 1
+        if stamp is not None:
+            entry.stamp = stamp
+            entry.etag = _stamp_etag(stamp)
+        return entry
+
+    def _written(self, profile_id: str, entry: _CachedProfile, stamp: Optional[Stamp]):
+        """Record the stamp of a profile once its deferred write lands."""
+        if stamp is None:
+            # The write-behind writer retries it; keep serving the cached copy
+            return
+        with self._lock:
+            if self._profiles.get(profile_id) is not entry:
+                # Replaced or deleted since; that change has its own write
+                return
+            entry.stamp = stamp
+            entry.checked_at = time.monotonic()
+
+    def patch(
+        self,
+        profile_id: str,
+        operations: List[Dict[str, Any]],
+        if_match: Optional[Collection[str]] = None
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Apply an RFC 6902 JSON Patch to a profile and save it.
+
+        The patch is applied copy-on-write to the cached profile. When every
+        operation stays inside buttons (``/scenes/i/pages/j/buttons/k/...``
+        or ``/dockedButtons/k/...``) or plain fields such as ``/name``, only
+        the touched buttons are validated; otherwise the whole profile is.
+        If no button was added, removed or moved, the store is told which
+        buttons changed so it can update just those.
+
+        The write is conditional on the stored profile still being the one
+        the patch was applied to. If another process changed it meanwhile,
+        the patch is retried once against the new version, unless the
+        caller sent ``if_match``.
+
+        Args:
+            profile_id: Profile to patch
+            operations: Patch operations
+            if_match: ETags the profile must currently have, or None
+
+        Returns:
+            Tuple of (saved profile dict, new ETag), or None if the profile does not exist
+
+        Raises:
+            JsonPatchError: If the patch is invalid or leaves an invalid profile
+            JsonPatchTestFailed: If a ``test`` operation fails
+            ProfileVersionConflict: If ``if_match`` does not match
+            StorageError: If the store failed to write the profile
+        """
+        with self._lock:
+            for attempt in range(2):
+                entry = self._entry(profile_id)
+                if entry is None:
+                    return None
+                if if_match is not None and self._etag(entry) not in if_match:
+                    raise ProfileVersionConflict('Profile has been modified')
+
+                patched = apply_patch(entry.data, operations, max_operations=MAX_PATCH_OPERATIONS)
+                patched, changed_buttons = self._validate_patched(patched, operations)
+                if not isinstance(patched, dict) or patched.get('id') != profile_id:
+                    raise JsonPatchError('A patch may not change the profile id')
+                # The root may still be the cached dict itself (e.g. a test-only patch)
+                patched = {**patched, 'updated_at': FileManager.get_timestamp()}
+
+                try:
+                    saved = self._write(profile_id, patched, changed_buttons, expected=entry.stamp)
+                except StorageConflict:
+                    self._stats['conflicts'] += 1
+                    # Changed by another process since it was cached; read it again
+                    self._drop(profile_id)
+                    if if_match is not None or attempt:
+                        raise ProfileVersionConflict('Profile has been modified')
+                    continue
+                return patched, self._etag(saved)
+
+    @staticmethod
+    def _validate_patched(patched: Any, operations: List[Dict[str, Any]]) -> Tuple[Any, Optional[List[str]]]:
+        """Normalise what a patch changed through the models.
+
+        Returns:
+            Tuple of (normalised profile, pointers of the changed buttons), the
+            latter None if buttons were added, removed or moved, or anything
+            other than buttons and plain fields changed
+        """
+        from models import Button, Profile
+
+        # Plain fields skip the models below, so their types are checked here
+        if not isinstance(patched, dict):
+            raise JsonPatchError('Patched profile must be an object')
+        if not isinstance(patched.get('name'), str):
+            raise JsonPatchError("Patched profile is invalid: 'name' must be a string")
+        for pointer in _PLAIN_FIELDS:
+            value = patched.get(pointer[1:])
+            if value is not None and not isinstance(value, str):
+                raise JsonPatchError(f"Patched profile is invalid: '{pointer[1:]}' must be a string or null")
+
+        buttons = set()
+        structural = False
+        for operation in operations:
+            for key in ('path', 'from'):
+                pointer = operation.get(key)
+                if pointer is None or (key == 'path' and pointer in _PLAIN_FIELDS):
+                    continue
+                match = _BUTTON_PATH.match(pointer)
+                if not match:
+                    try:
+                        return Profile.from_dict(patched).to_dict(), None
+                    except Exception as e:
+                        raise JsonPatchError(f'Patched profile is invalid: {e}')
+                buttons.add(match.group(1))
+                # Adding, removing or moving a whole button shifts its siblings
+                if pointer == match.group(1) and not (
+                    operation.get('op') in ('replace', 'test') or (operation.get('op') == 'copy' and key == 'from')
+                ):
+                    structural = True
+
+        normalise = []
+        for pointer in sorted(buttons):
+            node = patched
+            for token in parse_pointer(pointer):
+                if isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                    node = node[int(token)]
+                elif isinstance(node, dict) and token in node:
+                    node = node[token]
+                else:
+                    # Removed by the patch
+                    node = None
+                    break
+            if node is None:
+                continue
+            try:
+                normalise.append({'op': 'replace', 'path': pointer, 'value': Button.from_dict(node).to_dict()})
+            except Exception as e:
+                raise JsonPatchError(f'Invalid button at {pointer}: {e}')
+        return apply_patch(patched, normalise), None if structural else sorted(buttons)
+
+    def update_button(
+        self,
+        profile_id: str,
+        scene_id: str,
+        page_id: str,
+        button_id: str,
+        changes: Dict[str, Any],
+        if_match: Optional[Collection[str]] = None
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any], str]]:
+        """Merge field changes into one scene button and save the profile.
+
+        Returns:
+            Tuple of (saved profile dict, saved button dict, new ETag), or None
+            if the profile does not exist
+
+        Raises:
+            LookupError: If the scene, page or button does not exist
+            JsonPatchError: If the changed button is invalid
+            JsonPatchTestFailed: If another writer moved the button meanwhile
+            ProfileVersionConflict: If ``if_match`` does not match
+            StorageError: If the store failed to write the profile
+        """
+        with self._lock:
+            data = self.get_dict(profile_id)
+            if data is None:
+                return None
+            pointer = None
+            for i, scene in enumerate(data.get('scenes', [])):
+                if scene.get('id') != scene_id:
+                    continue
+                for j, page in enumerate(scene.get('pages', [])):
+                    if page.get('id') != page_id:
+                        continue
+                    for k, button in enumerate(page.get('buttons', [])):
+                        if button.get('id') == button_id:
+                            pointer = f'/scenes/{i}/pages/{j}/buttons/{k}'
+            if pointer is None:
+                raise LookupError('Button not found')
+
+            # Field by field, and only if the button has not moved since it was found
+            operations = [{'op': 'test', 'path': f'{pointer}/id', 'value': button_id}]
+            operations.extend(
+                {'op': 'add', 'path': f"{pointer}/{field.replace('~', '~0').replace('/', '~1')}", 'value': value}
+                for field, value in changes.items() if field != 'id'
+            )
+            result = self.patch(profile_id, operations, if_match=if_match)
+            if result is None:
+                return None
+            profile_dict, etag = result
+            button = profile_dict
+            for token in parse_pointer(pointer):
+                button = button[int(token)] if isinstance(button, list) else button[token]
+            return profile_dict, button, etag
+
+    def delete(self, profile_id: str) -> bool:
+        """Delete a profile from the store and drop it from the cache."""
+        with self._lock:
+            if not self.store.delete(profile_id):
+                return False
+            self._stats['writes'] += 1
+            self._drop(profile_id)
+        return True
+
+    def list_summaries(self) -> List[Dict[str, Any]]:
+        """Get the summary of every readable profile."""
+        with self._lock:
+            started = time.perf_counter()
+            summaries = self.store.list_summaries()
+            listed = {summary['id'] for summary in summaries}
+            for profile_id in [p for p in self._profiles if p not in listed]:
+                self._drop(profile_id)
+
+            elapsed = time.perf_counter() - started
+            if not self._primed:
+                # The first listing builds the store's index; reported by the store
+                self._primed = True
+            else:
+                self._list_count += 1
+                self._list_seconds += elapsed
+                self._last_list_seconds = elapsed
+            return summaries
+
+    def get_list_body(self) -> Tuple[bytes, str]:
+        """Get the serialised ``{"profiles": [...]}`` response and its ETag."""
+        with self._lock:
+            now = time.monotonic()
+            if self._list_body is None or now - self._listed_at >= self.revalidate_interval:
+                body = _dumps({'profiles': self.list_summaries()})
+                if body != self._list_body:
+                    if self._list_body is not None:
+                        # Changed in the store by someone else
+                        self.version += 1
+                    self._list_body = body
+                self._listed_at = now
+            else:
+                self._stats['hits'] += 1
+            return self._list_body, f'{self._epoch}-{self.version}'
+
+    def invalidate(self, profile_id: Optional[str] = None):
+        """Forget cached profiles so the next read goes to the store.
+
+        Pending writes are flushed first so the store is current.
+        """
+        self.store.flush()
+        with self._lock:
+            if profile_id is None:
+                self._profiles.clear()
+            else:
+                self._profiles.pop(profile_id, None)
+            self._changed()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters, storage backend stats and the cost of listing."""
+        store_stats = self.store.get_stats()
+        with self._lock:
+            lists = self._list_count
+            return {
+                **self._stats,
+                'cached_profiles': len(self._profiles),
+                'unwritten_profiles': sum(1 for entry in self._profiles.values() if entry.stamp is None),
+                'version': self.version,
+                'revalidate_interval': self.revalidate_interval,
+                'storage': {key: value for key, value in store_stats.items() if key != 'index'},
+                'index': {
+                    **store_stats.get('index', {}),
+                    'listings': lists,
+                    'avg_list_ms': round(self._list_seconds / lists * 1000, 3) if lists else None,
+                    'last_list_ms': round(self._last_list_seconds * 1000, 3) if lists else None
+                }
+            }
+
+
+# Global singleton instance
+_repository_instance: Optional[ProfileRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_profile_repository() -> ProfileRepository:
+    """Get the global ProfileRepository singleton instance."""
+    global _repository_instance
+
+    if _repository_instance is None:
+        with _repository_lock:
+            if _repository_instance is None:
+                from config import Config
+                _repository_instance = ProfileRepository(
+                    revalidate_interval=Config.PROFILE_CACHE_REVALIDATE_INTERVAL
+                )
+                logger.info(f"Profile storage: {_repository_instance.store.name}")
+
+    return _repository_instance
@@ -0,0 +1,85 @@
+"""
+Counter Rate Tracker
+Turns cumulative counters (bytes, operations, packets) into smoothed per-second rates
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class RateTracker:
+    """Computes EWMA-smoothed per-second rates from monotonically increasing counters.
+
+    Each key (a disk, an interface, ``total``...) keeps its previous counters
+    and a ``time.monotonic`` timestamp. Updates closer together than
+    ``min_interval`` return the current smoothed rates unchanged so that
+    several readers polling at different cadences don't produce noisy deltas.
+    """
+
+    def __init__(self, alpha: float = 0.5, min_interval: float = 0.5):
+        """
+        Initialize the rate tracker.
+
+        Args:
+            alpha: EWMA weight of the newest sample (1.0 disables smoothing)
+            min_interval: Minimum seconds between two counter readings
+        """
+        self.alpha = min(1.0, max(0.01, alpha))
+        self.min_interval = min_interval
+        self._previous: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self._rates: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def update(
+        self,
+        key: str,
+        counters: Dict[str, float],
+        now: Optional[float] = None
+    ) -> Dict[str, float]:
+        """Feed new counter values and get the smoothed rates.
+
+        Args:
+            key: Identifier of the counter set
+            counters: Current cumulative counter values
+            now: Monotonic timestamp of the reading, defaults to now
+
+        Returns:
+            Per-second rate for each counter; empty until two readings exist
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            previous = self._previous.get(key)
+            if previous is None:
+                self._previous[key] = (now, dict(counters))
+                return {}
+
+            previous_time, previous_counters = previous
+            elapsed = now - previous_time
+            if elapsed < self.min_interval:
+                return dict(self._rates.get(key, {}))
+
+            rates = self._rates.setdefault(key, {})
+            for name, value in counters.items():
+                last = previous_counters.get(name)
+                # Counters that went backwards wrapped or were reset; skip this round
+                if last is None or value < last:
+                    continue
+                rate = (value - last) / elapsed
+                current = rates.get(name)
+                rates[name] = rate if current is None else current + self.alpha * (rate - current)
+
+            self._previous[key] = (now, dict(counters))
+            return dict(rates)
+
+    def prune(self, keys):
+        """Forget counter sets that are no longer reported (e.g. unplugged devices).
+
+        Args:
+            keys: Keys that are still alive
+        """
+        alive = set(keys)
+        with self._lock:
+            for key in list(self._previous):
+                if key not in alive:
+                    self._previous.pop(key, None)
+                    self._rates.pop(key, None)
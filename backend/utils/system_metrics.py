@@ -5,26 +5,80 @@ Collects real-time system metrics (CPU, RAM, Disk, Network, etc.)
 import psutil
 import platform
 import logging
-from typing import Dict, Any, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
+from .metrics_history import MetricsHistory
+from .process_table import get_process_table
+from .rate_tracker import RateTracker
+from .metric_collectors import create_collector
+from .cgroup_metrics import get_cgroup_metrics
 
 logger = logging.getLogger(__name__)
 
+# Counter deltas for disk and network throughput read outside the sampler; the
+# sampler keeps its own so ad-hoc reads never shorten the intervals it publishes
+_disk_rates = RateTracker()
+_network_rates = RateTracker()
+
+# Backend that reads raw counters (/proc on Linux, psutil elsewhere)
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def get_metric_collector():
+    """Get the metric collector backend selected by ``Config.METRICS_BACKEND``."""
+    global _collector
+
+    if _collector is None:
+        with _collector_lock:
+            if _collector is None:
+                from config import Config
+                _collector = create_collector(Config.METRICS_BACKEND)
+                logger.info(f"Using {_collector.name} metric collector")
+    return _collector
+
+
+# Shared pool for fanning out metric collectors, created on first use
+_collector_pool: Optional[ThreadPoolExecutor] = None
+_collector_pool_lock = threading.Lock()
+
+
+def _get_collector_pool() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for parallel metric collection."""
+    global _collector_pool
+
+    if _collector_pool is None:
+        with _collector_pool_lock:
+            if _collector_pool is None:
+                from config import Config
+                _collector_pool = ThreadPoolExecutor(
+                    max_workers=Config.METRICS_COLLECTOR_WORKERS,
+                    thread_name_prefix='metrics-collector'
+                )
+    return _collector_pool
+
 
 class SystemMetrics:
     """Collect and format system metrics"""
     
     @staticmethod
-    def get_cpu_metrics() -> Dict[str, Any]:
-        """Get CPU usage and information"""
+    def get_cpu_metrics(interval: Optional[float] = 1) -> Dict[str, Any]:
+        """Get CPU usage and information
+
+        Args:
+            interval: Seconds to block while measuring usage. ``None`` compares
+                against the previous call instead of blocking, which is how the
+                background sampler reads it.
+        """
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent, per_cpu = get_metric_collector().cpu_usage(interval)
             cpu_count = psutil.cpu_count(logical=False)
             cpu_count_logical = psutil.cpu_count(logical=True)
             cpu_freq = psutil.cpu_freq()
             
-            per_cpu = psutil.cpu_percent(interval=1, percpu=True)
-            
             return {
                 'usage_percent': round(cpu_percent, 1),
                 'cores_physical': cpu_count,
@@ -43,8 +97,9 @@ class SystemMetrics:
     def get_memory_metrics() -> Dict[str, Any]:
         """Get RAM usage and information"""
         try:
-            mem = psutil.virtual_memory()
-            swap = psutil.swap_memory()
+            collector = get_metric_collector()
+            mem = collector.virtual_memory()
+            swap = collector.swap_memory()
             
             return {
                 'total_gb': round(mem.total / (1024**3), 2),
@@ -62,8 +117,12 @@ class SystemMetrics:
             return {'error': str(e)}
     
     @staticmethod
-    def get_disk_metrics() -> Dict[str, Any]:
-        """Get disk usage for all partitions"""
+    def get_disk_metrics(rate_tracker: Optional[RateTracker] = None) -> Dict[str, Any]:
+        """Get disk usage for all partitions
+
+        Args:
+            rate_tracker: Tracker for the throughput deltas, see ``get_disk_rates``
+        """
         try:
             partitions = []
             for partition in psutil.disk_partitions():
@@ -83,24 +142,31 @@ class SystemMetrics:
                     continue
             
             # Get IO stats
-            io_counters = psutil.disk_io_counters()
+            io_counters = get_metric_collector().disk_io_counters()
             
             return {
                 'partitions': partitions,
+                'rates': SystemMetrics.get_disk_rates(rate_tracker),
                 'io_read_mb': round(io_counters.read_bytes / (1024**2), 2) if io_counters else 0,
                 'io_write_mb': round(io_counters.write_bytes / (1024**2), 2) if io_counters else 0,
                 'io_read_count': io_counters.read_count if io_counters else 0,
-                'io_write_count': io_counters.write_count if io_counters else 0
+                'io_write_count': io_counters.write_count if io_counters else 0,
+                'io_read_bytes': io_counters.read_bytes if io_counters else 0,
+                'io_write_bytes': io_counters.write_bytes if io_counters else 0
             }
         except Exception as e:
             logger.error(f"Error getting disk metrics: {e}")
             return {'error': str(e)}
     
     @staticmethod
-    def get_network_metrics() -> Dict[str, Any]:
-        """Get network statistics"""
+    def get_network_metrics(rate_tracker: Optional[RateTracker] = None) -> Dict[str, Any]:
+        """Get network statistics
+
+        Args:
+            rate_tracker: Tracker for the throughput deltas, see ``get_network_rates``
+        """
         try:
-            net_io = psutil.net_io_counters()
+            net_io = get_metric_collector().net_io_counters()
             net_if_stats = psutil.net_if_stats()
             
             # Get per-interface stats
@@ -116,6 +182,8 @@ class SystemMetrics:
             return {
                 'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
                 'bytes_recv_mb': round(net_io.bytes_recv / (1024**2), 2),
+                'bytes_sent': net_io.bytes_sent,
+                'bytes_recv': net_io.bytes_recv,
                 'packets_sent': net_io.packets_sent,
                 'packets_recv': net_io.packets_recv,
                 'errors_in': net_io.errin,
@@ -123,12 +191,87 @@ class SystemMetrics:
                 'drops_in': net_io.dropin,
                 'drops_out': net_io.dropout,
                 'interfaces': interfaces,
+                'rates': SystemMetrics.get_network_rates(rate_tracker),
                 'status': 'normal' if net_io.errin + net_io.errout < 100 else 'warning'
             }
         except Exception as e:
             logger.error(f"Error getting network metrics: {e}")
             return {'error': str(e)}
     
+    @staticmethod
+    def get_disk_rates(rate_tracker: Optional[RateTracker] = None) -> Dict[str, Any]:
+        """Get smoothed disk throughput and IOPS, in total and per device
+
+        Args:
+            rate_tracker: Tracker holding the previous counters; defaults to
+                the one shared by callers outside the sampler
+        """
+        tracker = _disk_rates if rate_tracker is None else rate_tracker
+        try:
+            def rates_for(key: str, counters) -> Dict[str, float]:
+                rates = tracker.update(key, {
+                    'read_bytes': counters.read_bytes,
+                    'write_bytes': counters.write_bytes,
+                    'read_count': counters.read_count,
+                    'write_count': counters.write_count
+                })
+                return {
+                    'read_bytes_per_sec': round(rates.get('read_bytes', 0), 1),
+                    'write_bytes_per_sec': round(rates.get('write_bytes', 0), 1),
+                    'read_iops': round(rates.get('read_count', 0), 1),
+                    'write_iops': round(rates.get('write_count', 0), 1)
+                }
+
+            collector = get_metric_collector()
+            per_disk = collector.disk_io_counters(perdisk=True) or {}
+            total = collector.disk_io_counters()
+            tracker.prune(['_total', *per_disk])
+
+            return {
+                'total': rates_for('_total', total) if total else {},
+                'devices': {name: rates_for(name, counters) for name, counters in per_disk.items()}
+            }
+        except Exception as e:
+            logger.error(f"Error getting disk rates: {e}")
+            return {'error': str(e)}
+    
+    @staticmethod
+    def get_network_rates(rate_tracker: Optional[RateTracker] = None) -> Dict[str, Any]:
+        """Get smoothed network throughput and packet rates, in total and per interface
+
+        Args:
+            rate_tracker: Tracker holding the previous counters; defaults to
+                the one shared by callers outside the sampler
+        """
+        tracker = _network_rates if rate_tracker is None else rate_tracker
+        try:
+            def rates_for(key: str, counters) -> Dict[str, float]:
+                rates = tracker.update(key, {
+                    'bytes_sent': counters.bytes_sent,
+                    'bytes_recv': counters.bytes_recv,
+                    'packets_sent': counters.packets_sent,
+                    'packets_recv': counters.packets_recv
+                })
+                return {
+                    'sent_bytes_per_sec': round(rates.get('bytes_sent', 0), 1),
+                    'recv_bytes_per_sec': round(rates.get('bytes_recv', 0), 1),
+                    'packets_sent_per_sec': round(rates.get('packets_sent', 0), 1),
+                    'packets_recv_per_sec': round(rates.get('packets_recv', 0), 1)
+                }
+
+            collector = get_metric_collector()
+            per_nic = collector.net_io_counters(pernic=True) or {}
+            total = collector.net_io_counters()
+            tracker.prune(['_total', *per_nic])
+
+            return {
+                'total': rates_for('_total', total) if total else {},
+                'interfaces': {name: rates_for(name, counters) for name, counters in per_nic.items()}
+            }
+        except Exception as e:
+            logger.error(f"Error getting network rates: {e}")
+            return {'error': str(e)}
+    
     @staticmethod
     def get_temperature_metrics() -> Dict[str, Any]:
         """Get system temperature (if available)"""
@@ -192,33 +335,20 @@ class SystemMetrics:
             logger.error(f"Error getting battery metrics: {e}")
             return {'available': False, 'error': str(e)}
     
+    @staticmethod
+    def get_container_metrics() -> Dict[str, Any]:
+        """Get cgroup CPU quota usage, memory limit/usage and pressure (PSI)"""
+        try:
+            return get_cgroup_metrics().get_metrics()
+        except Exception as e:
+            logger.error(f"Error getting container metrics: {e}")
+            return {'available': False, 'error': str(e)}
+    
     @staticmethod
     def get_process_metrics(limit: int = 10) -> Dict[str, Any]:
         """Get top processes by CPU and memory usage"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'memory_info']):
-                try:
-                    processes.append({
-                        'pid': proc.info['pid'],
-                        'name': proc.info['name'],
-                        'cpu_percent': round(proc.info['cpu_percent'] or 0, 1),
-                        'memory_percent': round(proc.info['memory_percent'] or 0, 1),
-                        'memory_mb': round(proc.info['memory_info'].rss / (1024**2), 2) if proc.info['memory_info'] else 0
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            # Sort by CPU usage
-            top_cpu = sorted(processes, key=lambda x: x['cpu_percent'], reverse=True)[:limit]
-            # Sort by memory usage
-            top_memory = sorted(processes, key=lambda x: x['memory_percent'], reverse=True)[:limit]
-            
-            return {
-                'total_processes': len(processes),
-                'top_cpu': top_cpu,
-                'top_memory': top_memory
-            }
+            return get_process_table().get_top(limit)
         except Exception as e:
             logger.error(f"Error getting process metrics: {e}")
             return {'error': str(e)}
@@ -246,19 +376,81 @@ class SystemMetrics:
             return {'error': str(e)}
     
     @staticmethod
-    def get_all_metrics() -> Dict[str, Any]:
-        """Get all system metrics at once"""
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'cpu': SystemMetrics.get_cpu_metrics(),
-            'memory': SystemMetrics.get_memory_metrics(),
-            'disk': SystemMetrics.get_disk_metrics(),
-            'network': SystemMetrics.get_network_metrics(),
-            'temperature': SystemMetrics.get_temperature_metrics(),
-            'battery': SystemMetrics.get_battery_metrics(),
-            'processes': SystemMetrics.get_process_metrics(),
-            'system_info': SystemMetrics.get_system_info()
-        }
+    def collect_parallel(
+        collectors: Dict[str, Callable[[], Dict[str, Any]]],
+        timeout: Optional[float] = None,
+        partial: bool = True
+    ) -> Dict[str, Any]:
+        """Run metric collectors concurrently on the shared collector pool
+
+        Args:
+            collectors: Map of result key to collector function
+            timeout: Seconds each collector may take, measured from submission.
+                Defaults to ``Config.METRICS_COLLECTOR_TIMEOUT``.
+            partial: Return without collectors that miss their timeout instead
+                of waiting for them
+
+        Returns:
+            Collector results keyed by name, plus ``timings_ms``, ``timed_out``
+            and ``partial`` entries describing the run
+        """
+        if timeout is None:
+            from config import Config
+            timeout = Config.METRICS_COLLECTOR_TIMEOUT
+
+        timings: Dict[str, float] = {}
+
+        def timed(name: str, collector: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                return collector()
+            finally:
+                timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+        pool = _get_collector_pool()
+        submitted = time.monotonic()
+        futures = {name: pool.submit(timed, name, collector) for name, collector in collectors.items()}
+
+        results: Dict[str, Any] = {}
+        timed_out: List[str] = []
+        for name, future in futures.items():
+            try:
+                if partial:
+                    remaining = max(0.0, submitted + timeout - time.monotonic())
+                    results[name] = future.result(timeout=remaining)
+                else:
+                    results[name] = future.result()
+            except FutureTimeoutError:
+                # Leave the collector running; its result is simply dropped
+                timed_out.append(name)
+                results[name] = {'error': f'Timed out after {timeout}s', 'timed_out': True}
+            except Exception as e:
+                logger.error(f"Error collecting {name} metrics: {e}")
+                results[name] = {'error': str(e)}
+
+        results['timings_ms'] = {name: timings.get(name) for name in collectors}
+        results['timed_out'] = timed_out
+        results['partial'] = bool(timed_out)
+        return results
+
+    @staticmethod
+    def get_all_metrics(timeout: Optional[float] = None, partial: bool = True) -> Dict[str, Any]:
+        """Get all system metrics at once
+
+        Sampled metrics come from the background sampler's snapshot; process
+        and system info, which it does not sample, are collected in parallel.
+
+        Args:
+            timeout: Per-collector timeout in seconds
+            partial: Return what finished in time rather than waiting for slow
+                collectors such as huge process tables
+        """
+        snapshot = get_metrics_sampler().get_snapshot()
+        collected = SystemMetrics.collect_parallel({
+            'processes': SystemMetrics.get_process_metrics,
+            'system_info': SystemMetrics.get_system_info
+        }, timeout=timeout, partial=partial)
+        return {**snapshot, **collected}
     
     @staticmethod
     def get_metric_by_type(metric_type: str) -> Dict[str, Any]:
@@ -271,6 +463,7 @@ class SystemMetrics:
             'network': SystemMetrics.get_network_metrics,
             'temperature': SystemMetrics.get_temperature_metrics,
             'battery': SystemMetrics.get_battery_metrics,
+            'container': SystemMetrics.get_container_metrics,
             'processes': SystemMetrics.get_process_metrics,
             'system': SystemMetrics.get_system_info,
             'all': SystemMetrics.get_all_metrics
@@ -281,3 +474,215 @@ class SystemMetrics:
         else:
             return {'error': f'Unknown metric type: {metric_type}'}
 
+
+
+class MetricsSampler:
+    """Background service that keeps a shared snapshot of system metrics.
+
+    Collecting CPU usage accurately means waiting between two readings, so
+    instead of blocking every request the sampler polls on a fixed cadence
+    and readers get the latest snapshot straight from memory.
+    """
+
+    # Metrics collected on every tick and the collector used for each; disk and
+    # network are collected with the sampler's own rate trackers instead
+    COLLECTORS: Dict[str, Callable[[], Dict[str, Any]]] = {
+        'cpu': lambda: SystemMetrics.get_cpu_metrics(interval=None),
+        'memory': SystemMetrics.get_memory_metrics,
+        'disk': SystemMetrics.get_disk_metrics,
+        'network': SystemMetrics.get_network_metrics,
+        'temperature': SystemMetrics.get_temperature_metrics,
+        'battery': SystemMetrics.get_battery_metrics,
+        'container': SystemMetrics.get_container_metrics,
+    }
+
+    def __init__(self, interval: float = 2.0, history: Optional[MetricsHistory] = None):
+        """
+        Initialize the metrics sampler.
+
+        Args:
+            interval: How often to refresh the snapshot (seconds)
+            history: History store fed with every snapshot
+        """
+        self.interval = max(0.1, float(interval))
+        self.history = history or MetricsHistory(sample_interval=self.interval)
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        self.last_sample_duration = 0.0
+        self.sample_count = 0
+        self._snapshot: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # Only this sampler feeds these, so its rates always span whole intervals
+        self._disk_rates = RateTracker()
+        self._network_rates = RateTracker()
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {
+            **self.COLLECTORS,
+            'disk': lambda: SystemMetrics.get_disk_metrics(self._disk_rates),
+            'network': lambda: SystemMetrics.get_network_metrics(self._network_rates),
+        }
+
+    def sample(self) -> Dict[str, Any]:
+        """Collect every metric once and publish the result as the new snapshot."""
+        started = time.perf_counter()
+        snapshot: Dict[str, Any] = {}
+        for name, collector in self._collectors.items():
+            try:
+                snapshot[name] = collector()
+            except Exception as e:
+                logger.error(f"Error sampling {name} metrics: {e}")
+                snapshot[name] = {'error': str(e)}
+        snapshot['timestamp'] = datetime.now().isoformat()
+
+        with self._lock:
+            self._snapshot = snapshot
+            self.last_sample_duration = time.perf_counter() - started
+            self.sample_count += 1
+
+        self.history.record(snapshot)
+
+        for callback in list(self.callbacks):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Error in metrics sampler callback: {e}")
+
+        return snapshot
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Get the latest full snapshot, collecting one if none exists yet."""
+        with self._lock:
+            snapshot = self._snapshot
+        if not snapshot:
+            snapshot = self.sample()
+        return snapshot
+
+    def get_metric(self, metric_type: str) -> Dict[str, Any]:
+        """Get a single metric from the latest snapshot.
+
+        Args:
+            metric_type: One of the keys in ``COLLECTORS``
+
+        Returns:
+            Metric data, or an error dict for unknown metric types
+        """
+        if metric_type not in self.COLLECTORS:
+            return {'error': f'Unknown metric type: {metric_type}'}
+        return self.get_snapshot().get(metric_type, {})
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get sampler state for diagnostics."""
+        with self._lock:
+            timestamp = self._snapshot.get('timestamp')
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'sample_count': self.sample_count,
+            'last_sample_ms': round(self.last_sample_duration * 1000, 2),
+            'last_sample_at': timestamp
+        }
+
+    def register_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback to be called with every new snapshot.
+
+        Args:
+            callback: Function that takes the snapshot dict as parameter
+        """
+        self.callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Unregister a callback.
+
+        Args:
+            callback: Function to remove from callbacks
+        """
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    def _sample_loop(self):
+        """Main sampling loop that runs in a separate thread."""
+        logger.info(f"Metrics sampler started (interval {self.interval}s)")
+
+        # Give the primed CPU counters a moment before the first reading
+        next_run = time.monotonic() + min(self.interval, 0.5)
+        self._stop_event.wait(min(self.interval, 0.5))
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error in metrics sampler loop: {e}")
+
+            # Schedule against the previous deadline so slow samples don't drift
+            next_run += self.interval
+            delay = next_run - time.monotonic()
+            if delay < 0:
+                next_run = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+        logger.info("Metrics sampler stopped")
+
+    def start(self):
+        """Start the sampler in a background thread."""
+        if self.running:
+            return
+
+        # Prime the CPU counters so the first non-blocking read is meaningful
+        get_metric_collector().cpu_usage(None)
+
+        self.running = True
+        self._stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._sample_loop, name='metrics-sampler', daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop the sampler."""
+        if not self.running:
+            return
+
+        self.running = False
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+
+# Global singleton instance
+_sampler_instance: Optional[MetricsSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_metrics_sampler(interval: Optional[float] = None) -> MetricsSampler:
+    """Get the global MetricsSampler, starting it on first use."""
+    global _sampler_instance
+
+    if _sampler_instance is None:
+        with _sampler_lock:
+            if _sampler_instance is None:
+                from config import Config
+                if interval is None:
+                    interval = Config.METRICS_SAMPLE_INTERVAL
+                history = MetricsHistory(
+                    sample_interval=interval,
+                    raw_seconds=Config.METRICS_HISTORY_SECONDS,
+                    rollup_interval=Config.METRICS_ROLLUP_INTERVAL,
+                    rollup_seconds=Config.METRICS_ROLLUP_HISTORY_SECONDS
+                )
+                sampler = MetricsSampler(interval, history)
+                sampler.start()
+                _sampler_instance = sampler
+
+    return _sampler_instance
+
+
+def stop_metrics_sampler():
+    """Stop the global metrics sampler."""
+    global _sampler_instance
+
+    if _sampler_instance:
+        _sampler_instance.stop()
+        _sampler_instance = None
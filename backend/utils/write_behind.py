@@ -0,0 +1,273 @@
+"""
+Write-Behind Writer
+Debounces file saves so bursts of edits to the same file become one atomic write
+"""
+import atexit
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called once a save has been written (or failed to be), outside the writer's locks
+WrittenCallback = Callable[[bool], None]
+
+
+class _PendingWrite:
+    """The latest unsaved contents of one file."""
+
+    __slots__ = ('render', 'on_written', 'first_at', 'due_at', 'saves')
+
+    def __init__(self, render: Callable[[], str], on_written: Optional[WrittenCallback], now: float):
+        self.render = render
+        self.on_written = on_written
+        self.first_at = now
+        self.due_at = now
+        self.saves = 0
+
+
+class WriteBehind:
+    """Background writer that coalesces repeated saves of the same file.
+
+    A save is held for ``delay`` seconds; saving the same path again in that
+    window replaces the pending contents and restarts the wait, so a drag
+    that saves twenty times produces one write. A file is never held longer
+    than ``max_delay`` after its first unsaved change. Contents are rendered
+    only when written, which moves serialisation off the caller's thread,
+    so anything passed in must not be modified afterwards.
+
+    Every write goes through ``FileManager.write_atomic`` (temporary file,
+    fsync, rename), so a crash leaves either the previous or the new file.
+    With a ``delay`` of 0 saves are written immediately on the caller's
+    thread.
+    """
+
+    def __init__(self, delay: float = 0.5, max_delay: float = 5.0):
+        """
+        Initialize the writer.
+
+        Args:
+            delay: Seconds of quiet after the last save before a file is written
+            max_delay: Longest a file may stay unwritten after its first pending save
+        """
+        self.delay = delay
+        self.max_delay = max(max_delay, delay)
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._pending: Dict[Path, _PendingWrite] = {}
+        self._stats = {'saves': 0, 'coalesced': 0, 'writes': 0, 'failed': 0}
+        self._flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+        self._write_seconds = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Held while writing so a path's writes happen in the order they were scheduled
+        self._write_lock = threading.Lock()
+
+    def schedule(self, file_path: Path, render: Callable[[], str], on_written: Optional[WrittenCallback] = None) -> bool:
+        """Save a file later, replacing any pending save of the same path.
+
+        Args:
+            file_path: File to write
+            render: Produces the file contents when the write happens
+            on_written: Called after the write, replacing the previous save's callback
+
+        Returns:
+            True if the save was queued or written, False if an immediate
+            write (``delay`` of 0) failed; the caller must report that, as
+            nothing retries it
+        """
+        file_path = Path(file_path)
+        if self.delay <= 0:
+            with self._lock:
+                self._stats['saves'] += 1
+            pending = _PendingWrite(render, on_written, time.monotonic())
+            with self._write_lock:
+                ok = self._write(file_path, pending)
+            self._notify(file_path, pending, ok)
+            return ok
+
+        now = time.monotonic()
+        with self._lock:
+            self._stats['saves'] += 1
+            pending = self._pending.get(file_path)
+            if pending is None:
+                pending = self._pending[file_path] = _PendingWrite(render, on_written, now)
+            else:
+                self._stats['coalesced'] += 1
+                pending.render = render
+                pending.on_written = on_written
+            pending.saves += 1
+            pending.due_at = min(now + self.delay, pending.first_at + self.max_delay)
+            self._wakeup.notify()
+        self.start()
+        return True
+
+    def is_pending(self, file_path: Path) -> bool:
+        """Whether a file has a save that has not been written yet."""
+        with self._lock:
+            return Path(file_path) in self._pending
+
+    def discard(self, file_path: Path) -> bool:
+        """Drop a pending save, e.g. because the file is being deleted.
+
+        Waits for a write of the file already in progress to finish.
+
+        Returns:
+            True if a pending save was dropped
+        """
+        with self._write_lock, self._lock:
+            return self._pending.pop(Path(file_path), None) is not None
+
+    def flush(self, file_path: Optional[Path] = None) -> bool:
+        """Write pending saves now on the caller's thread.
+
+        Args:
+            file_path: Only flush this file, or None for all of them
+
+        Returns:
+            True if every flushed write succeeded
+        """
+        with self._write_lock:
+            with self._lock:
+                if file_path is None:
+                    due = list(self._pending.items())
+                    self._pending.clear()
+                else:
+                    path = Path(file_path)
+                    pending = self._pending.pop(path, None)
+                    due = [(path, pending)] if pending is not None else []
+            results = [(path, pending, self._write(path, pending)) for path, pending in due]
+        for path, pending, ok in results:
+            self._notify(path, pending, ok)
+        return all(ok for _, _, ok in results)
+
+    def _write(self, file_path: Path, pending: _PendingWrite) -> bool:
+        """Render and atomically write one file; caller holds the write lock.
+
+        Callbacks are left to ``_notify`` once the write lock is released, so
+        they may take their own locks without risking a deadlock with
+        ``discard``.
+        """
+        from .file_manager import FileManager
+
+        started = time.perf_counter()
+        try:
+            ok = FileManager.write_atomic(file_path, pending.render())
+        except Exception as e:
+            logger.error(f"Error rendering {file_path}: {e}")
+            ok = False
+        finished = time.perf_counter()
+        # Measured from the first unsaved change, i.e. how long the disk lagged behind
+        lag = time.monotonic() - pending.first_at
+
+        with self._lock:
+            if ok:
+                self._stats['writes'] += 1
+                self._write_seconds += finished - started
+                self._flush_seconds += lag
+                self._max_flush_seconds = max(self._max_flush_seconds, lag)
+            else:
+                self._stats['failed'] += 1
+                # Retry later unless a newer save has replaced it
+                if self.running and file_path not in self._pending:
+                    pending.due_at = time.monotonic() + self.max_delay
+                    self._pending[file_path] = pending
+                    self._wakeup.notify()
+                    logger.warning(f"Write of {file_path} failed; retrying in {self.max_delay}s")
+        return ok
+
+    @staticmethod
+    def _notify(file_path: Path, pending: _PendingWrite, ok: bool):
+        if pending.on_written:
+            try:
+                pending.on_written(ok)
+            except Exception as e:
+                logger.error(f"Error in write callback for {file_path}: {e}")
+
+    def _write_loop(self):
+        """Main writer loop that runs in a separate thread."""
+        while True:
+            with self._lock:
+                while self.running:
+                    now = time.monotonic()
+                    next_due = min((p.due_at for p in self._pending.values()), default=None)
+                    if next_due is not None and next_due <= now:
+                        break
+                    self._wakeup.wait(None if next_due is None else next_due - now)
+                if not self.running:
+                    return
+
+            with self._write_lock:
+                with self._lock:
+                    now = time.monotonic()
+                    due = [(path, p) for path, p in self._pending.items() if p.due_at <= now]
+                    for path, _ in due:
+                        del self._pending[path]
+                results = [(path, pending, self._write(path, pending)) for path, pending in due]
+            for path, pending, ok in results:
+                self._notify(path, pending, ok)
+
+    def start(self):
+        """Start the writer thread."""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._write_loop, name='write-behind', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the writer thread and write everything still pending."""
+        with self._lock:
+            was_running = self.running
+            self.running = False
+            self._wakeup.notify_all()
+        if was_running and self.thread:
+            self.thread.join(timeout=5)
+        if not self.flush():
+            logger.error("Some pending file writes could not be saved")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get save and write counters, pending files and flush latency."""
+        with self._lock:
+            stats = dict(self._stats)
+            now = time.monotonic()
+            writes = stats['writes']
+            oldest = min((p.first_at for p in self._pending.values()), default=None)
+            return {
+                **stats,
+                'pending': len(self._pending),
+                'pending_files': sorted(path.name for path in self._pending)[:50],
+                'oldest_pending_ms': round((now - oldest) * 1000, 1) if oldest is not None else None,
+                'avg_flush_latency_ms': round(self._flush_seconds / writes * 1000, 3) if writes else None,
+                'max_flush_latency_ms': round(self._max_flush_seconds * 1000, 3) if writes else None,
+                'avg_write_ms': round(self._write_seconds / writes * 1000, 3) if writes else None,
+                'delay': self.delay,
+                'max_delay': self.max_delay
+            }
+
+
+# Global singleton instance
+_write_behind_instance: Optional[WriteBehind] = None
+_write_behind_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehind:
+    """Get the global WriteBehind singleton instance."""
+    global _write_behind_instance
+
+    if _write_behind_instance is None:
+        with _write_behind_lock:
+            if _write_behind_instance is None:
+                from config import Config
+                _write_behind_instance = WriteBehind(
+                    delay=Config.WRITE_BEHIND_DELAY,
+                    max_delay=Config.WRITE_BEHIND_MAX_DELAY
+                )
+                # Pending saves must reach disk before the process exits
+                atexit.register(_write_behind_instance.stop)
+
+    return _write_behind_instance